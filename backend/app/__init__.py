@@ -1,17 +1,24 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Depends, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from loguru import logger
 from sqlalchemy import func
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import Config
-from app.core.db import get_session, init_db
+from app.core.log import RequestLogMiddleware
+from app.core.db import engine, get_session, init_db
+from app.core import metrics, queries
 from app.api.v1.api import api_router
+from app.services.deals import deals_service
+from app.services.embeddings import embeddings
+from app.services import llm
 
 
 @asynccontextmanager
@@ -22,12 +29,19 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database initialization complete.")
 
+    # Runs once the worker is serving, so it never delays startup.
+    warm_up = asyncio.create_task(llm.warm_up()) if Config.LLM_WARM_UP else None
+
     logger.trace("Yielding control to the application...")
     yield
     logger.trace("Control returned from application. Starting shutdown sequence.")
 
     # On Shutdown
     logger.info("Application lifespan shutting down...")
+    if warm_up is not None:
+        warm_up.cancel()
+    await deals_service.close()
+    embeddings.close()
     logger.success("Application shutdown complete.")
 
 
@@ -43,6 +57,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# One timed log line per request, sampled on the high-volume read routes
+app.add_middleware(
+    RequestLogMiddleware,
+    sampled_paths=Config.REQUEST_LOG_SAMPLED_PATHS,
+    sample_rate=Config.REQUEST_LOG_SAMPLE_RATE,
+    slow_ms=Config.REQUEST_LOG_SLOW_MS,
+)
+
+if Config.METRICS_ENABLED:
+    logger.info("Adding metrics middleware and database statement hooks.")
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument_engine(engine)
+
+if Config.QUERY_ACCOUNTING:
+    logger.info("Adding query accounting (N+1 warnings).")
+    app.add_middleware(queries.QueryAccountingMiddleware, threshold=Config.N_PLUS_ONE_THRESHOLD)
+    queries.instrument_engine(engine)
+
+# Compress large responses (transaction lists, dashboard) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Exception handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -82,13 +117,14 @@ async def get_db_version(session: AsyncSession = Depends(get_session)):
     logger.info("Request received for '/api/db-version' endpoint.")
     try:
         query = select(func.version())
-        logger.debug(f"Executing query to get database version: {query}")
+        # Compiling the statement to text is only worth it if debug is on.
+        logger.opt(lazy=True).debug("Executing query to get database version: {}", lambda: str(query))
         result = await session.exec(query)
         version = result.one_or_none()
 
         if version:
             logger.info(f"Successfully retrieved database version: {version}")
-            logger.trace(f"Returning database version in response.")
+            logger.trace("Returning database version in response.")
             return {"db_version": version}
         else:
             logger.warning("Database version query returned no result.")
@@ -97,3 +133,14 @@ async def get_db_version(session: AsyncSession = Depends(get_session)):
     except Exception as e:
         logger.error(f"Database connection failed at '/api/db-version': {e}", exc_info=True)
         return {"error": f"Database connection failed: {e}"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    This worker's metrics in the Prometheus text format. Each worker keeps
+    its own, so scrape every worker (or run one per container).
+    """
+    if not Config.METRICS_ENABLED:
+        return PlainTextResponse("# Metrics are disabled (METRICS_ENABLED=false)\n", status_code=404)
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
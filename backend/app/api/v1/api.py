@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import users, expenses, goals, transactions, gamification, accounts, uploads, chat
+from app.api.v1.endpoints import users, expenses, goals, transactions, gamification, accounts, uploads, chat, dashboard, deals, analytics, budget
 from app.core.users import auth_backend, fastapi_users
 from app.models.user import UserRead, UserCreate
 
@@ -23,3 +23,7 @@ api_router.include_router(transactions.router, prefix="/transactions", tags=["tr
 api_router.include_router(gamification.router, prefix="/gamification", tags=["gamification"])
 api_router.include_router(accounts.router, prefix="/accounts", tags=["accounts"])
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(deals.router, prefix="/deals", tags=["deals"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(budget.router, prefix="/budget", tags=["budget"])
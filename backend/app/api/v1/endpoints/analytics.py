@@ -0,0 +1,42 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_db
+from app.core.users import current_active_user
+from app.models.user import User
+from app.services import analytics
+from app.services.analytics import Interval, SpendingSeries
+
+router = APIRouter()
+
+DEFAULT_RANGE_DAYS = 365
+MAX_DAILY_BUCKETS = 1000
+
+
+@router.get("/spending", response_model=SpendingSeries)
+async def read_spending(
+    db: AsyncSession = Depends(get_db),
+    interval: Interval = "month",
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    merchant_limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(current_active_user),
+) -> SpendingSeries:
+    """
+    Spending over time, in total and by category and merchant.
+    ``until`` is exclusive and defaults to tomorrow; ``since`` defaults to a
+    year before it.
+    """
+    until = until or datetime.utcnow().date() + timedelta(days=1)
+    since = since or until - timedelta(days=DEFAULT_RANGE_DAYS)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if interval == "day" and (until - since).days > MAX_DAILY_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Daily series are limited to {MAX_DAILY_BUCKETS} days")
+
+    return await analytics.spending_series(
+        db, current_user.id, interval, since, until, merchant_limit=merchant_limit
+    )
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_db
+from app.core.users import current_active_user
+from app.models.user import User
+from app.services import budget
+from app.services.budget import BudgetStatus
+
+router = APIRouter()
+
+
+@router.get("/status", response_model=BudgetStatus)
+async def read_budget_status(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_active_user),
+) -> BudgetStatus:
+    """
+    Month-to-date spending against planned budgets, by category, with a
+    burn-rate projection to month end.
+    """
+    return await budget.status(db, current_user.id)
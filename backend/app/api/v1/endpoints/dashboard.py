@@ -0,0 +1,101 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_db
+from app.core.users import current_active_user
+from app.crud import account as crud_account
+from app.crud import expense as crud_expense
+from app.crud import goal as crud_goal
+from app.crud import transaction as crud_transaction
+from app.models.gamification import Achievement, ShopItem
+from app.models.user import User, UserReadWithRelations
+
+router = APIRouter()
+
+
+class DashboardSection(BaseModel):
+    etag: str
+    data: Optional[Any] = None  # Omitted when the client's ETag still matches
+
+
+class DashboardResponse(BaseModel):
+    sections: Dict[str, DashboardSection]
+
+
+def _parse_section_etags(header: Optional[str]) -> Dict[str, str]:
+    """Parse ``X-Section-ETags: user="abc", goals="def"`` into a dict."""
+    etags = {}
+    for part in (header or "").split(","):
+        name, _, etag = part.partition("=")
+        if name.strip() and etag.strip():
+            etags[name.strip()] = etag.strip().strip('"')
+    return etags
+
+
+def _etag(data: Any) -> str:
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+@router.get("/", response_model=DashboardResponse, response_model_exclude_unset=True)
+async def read_dashboard(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_active_user),
+    transactions_limit: int = 1000,
+    x_section_etags: Optional[str] = Header(None),
+) -> DashboardResponse:
+    """
+    Everything the dashboard needs on load in one request.
+    Sections are read one after another on the request's session: each is a
+    short indexed query, and reading them concurrently would take a pooled
+    connection per section. Pass the ETags from a previous response in the
+    X-Section-ETags header to skip sections that have not changed.
+    """
+    user_id = current_user.id
+
+    async def read_user(session: AsyncSession) -> Any:
+        statement = select(User).where(User.id == user_id).options(
+            selectinload(User.achievements),
+            selectinload(User.items)
+        )
+        result = await session.exec(statement)
+        return UserReadWithRelations.model_validate(result.one(), from_attributes=True)
+
+    async def read_achievements(session: AsyncSession) -> Any:
+        result = await session.exec(select(Achievement).limit(100))
+        return result.all()
+
+    async def read_shop(session: AsyncSession) -> Any:
+        result = await session.exec(select(ShopItem).limit(100))
+        return result.all()
+
+    readers = {
+        "user": read_user,
+        "expenses": lambda session: crud_expense.get_multi_by_user(session, user_id=user_id),
+        "goals": lambda session: crud_goal.get_multi_by_user(session, user_id=user_id),
+        "accounts": lambda session: crud_account.get_multi_by_user(session, user_id=user_id),
+        "transactions": lambda session: crud_transaction.get_rows_by_user(
+            session, user_id=user_id, limit=transactions_limit
+        ),
+        "achievements": read_achievements,
+        "shop": read_shop,
+    }
+
+    known_etags = _parse_section_etags(x_section_etags)
+    sections = {}
+    for name, reader in readers.items():
+        data = jsonable_encoder(await reader(db))
+        etag = _etag(data)
+        if known_etags.get(name) == etag:
+            sections[name] = DashboardSection(etag=etag)
+        else:
+            sections[name] = DashboardSection(etag=etag, data=data)
+    return DashboardResponse(sections=sections)
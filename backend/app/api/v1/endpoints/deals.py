@@ -0,0 +1,25 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.users import current_active_user
+from app.models.user import User
+from app.services.deals import DealsUpstreamError, deals_service
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[Dict[str, Any]])
+async def find_deals(
+    q: str = Query(..., min_length=1, max_length=500),
+    current_price: float = Query(..., gt=0),
+    current_user: User = Depends(current_active_user),
+) -> Any:
+    """
+    Cheaper offers for a product, best first.
+    Popular products are answered from the shared price cache.
+    """
+    try:
+        return await deals_service.find_deals(q, current_price)
+    except DealsUpstreamError as e:
+        raise HTTPException(status_code=502, detail=str(e))
@@ -1,6 +1,8 @@
 from typing import List, Any
 import uuid
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlmodel import select, delete
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -35,6 +37,7 @@ async def seed_achievements(
         Achievement(name="First Steps", description="Complete onboarding", icon="Egg", xp_reward=50),
         Achievement(name="Week Warrior", description="7 day streak", icon="Flame", xp_reward=100),
         Achievement(name="First $100", description="Save your first $100", icon="Coins", xp_reward=150),
+        Achievement(name="Budget Tracker", description="Log 25 transactions", icon="Target", xp_reward=100),
     ]
     for a in achievements:
         db.add(a)
@@ -86,13 +89,8 @@ async def clear_shop_items(
     db: AsyncSession = Depends(deps.get_db),
 ) -> dict:
     """Clear all shop items from the database"""
-    existing_items_result = await db.exec(select(ShopItem))
-    existing_items = existing_items_result.all()
-    count = len(existing_items)
-    
-    for item in existing_items:
-        await db.delete(item)
-    
+    result = await db.exec(delete(ShopItem))
+    count = result.rowcount
     await db.commit()
     return {"message": f"Deleted {count} shop items"}
 
@@ -101,11 +99,8 @@ async def reseed_shop(
     db: AsyncSession = Depends(deps.get_db),
 ) -> List[ShopItem]:
     """Clear all shop items and reseed with fresh data"""
-    # Clear all existing items
-    existing_items_result = await db.exec(select(ShopItem))
-    existing_items = existing_items_result.all()
-    for item in existing_items:
-        await db.delete(item)
+    # Clear all existing items in one statement, not one DELETE per row
+    await db.exec(delete(ShopItem))
     await db.commit()
     
     # Now seed fresh items
@@ -220,7 +215,7 @@ async def purchase_item(
         raise HTTPException(status_code=400, detail="Not enough coins")
         
     current_user.coins -= item.price
-    user_item = UserItem(user_id=current_user.id, item_id=id, is_equipped=False)
+    user_item = UserItem(user_id=current_user.id, item_id=id, is_equipped=False, category=item.category)
     
     db.add(current_user)
     db.add(user_item)
@@ -228,6 +223,59 @@ async def purchase_item(
     
     return {"message": "Purchased", "remaining_coins": current_user.coins}
 
+# Each retry sees every equip committed before it, so conflicts only
+# persist under a steady stream of equips in one category
+EQUIP_ATTEMPTS = 5
+DEADLOCK_DETECTED = "40P01"
+
+def _is_equip_conflict(error: DBAPIError) -> bool:
+    """
+    A concurrent equip in the same category got there first: it committed
+    the row our snapshot missed (unique index), or locked the rows we need
+    in the opposite order (deadlock). Either clears on retry.
+    """
+    return isinstance(error, IntegrityError) or getattr(error.orig, "sqlstate", None) == DEADLOCK_DETECTED
+
+def _equip_statement(user_id: uuid.UUID, item_id: uuid.UUID):
+    """
+    Build a single statement that unequips the user's current item in the
+    target item's category and equips the target.
+
+    The unequip runs as a data-modifying CTE that the main UPDATE consumes via
+    a scalar subquery, so Postgres finishes it before flipping the target row
+    and the partial unique index never sees two equipped rows.
+    """
+    category = (
+        select(UserItem.category)
+        .where(UserItem.user_id == user_id, UserItem.item_id == item_id)
+        .scalar_subquery()
+    )
+    unequipped = (
+        update(UserItem)
+        .where(
+            UserItem.user_id == user_id,
+            UserItem.category == category,
+            UserItem.is_equipped == True,
+            UserItem.item_id != item_id,
+        )
+        .values(is_equipped=False)
+        .returning(UserItem.item_id)
+        .cte("unequipped")
+    )
+    return (
+        update(UserItem)
+        .where(
+            UserItem.user_id == user_id,
+            UserItem.item_id == item_id,
+            select(func.count()).select_from(unequipped).scalar_subquery() >= 0,
+        )
+        .values(is_equipped=True)
+        .returning(UserItem.item_id)
+        # No UserItem objects are loaded in the session to keep in step, and the
+        # ORM's default sync can't follow the CTE (the result comes back closed)
+        .execution_options(synchronize_session=False)
+    )
+
 @router.post("/shop/{id}/equip")
 async def equip_item(
     *,
@@ -235,33 +283,21 @@ async def equip_item(
     id: uuid.UUID,
     current_user: User = Depends(current_active_user),
 ) -> Any:
-    # Check if user owns the item
-    user_item = await db.get(UserItem, (current_user.id, id))
-    if not user_item:
+    statement = _equip_statement(current_user.id, id)
+    for _ in range(EQUIP_ATTEMPTS):
+        try:
+            result = await db.exec(statement)
+            equipped = result.first()
+            await db.commit()
+            break
+        except DBAPIError as e:
+            await db.rollback()
+            if not _is_equip_conflict(e):
+                raise
+    else:
+        raise HTTPException(status_code=409, detail="Item is being equipped concurrently, try again")
+
+    if not equipped:
         raise HTTPException(status_code=400, detail="Item not owned")
-        
-    # Get the item details to know the category
-    item = await db.get(ShopItem, id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found") # Should not happen if foreign key holds
-        
-    # Unequip other items in the same category
-    # Find all user items for this user
-    statement = select(UserItem, ShopItem).join(ShopItem).where(
-        UserItem.user_id == current_user.id,
-        ShopItem.category == item.category,
-        UserItem.is_equipped == True
-    )
-    results = await db.exec(statement)
-    
-    for u_item, _ in results:
-        u_item.is_equipped = False
-        db.add(u_item)
-        
-    # Equip the new item
-    user_item.is_equipped = True
-    db.add(user_item)
-    
-    await db.commit()
-    
+
     return {"message": "Equipped"}
@@ -1,7 +1,7 @@
 import uuid
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.deps import get_db
@@ -9,6 +9,14 @@ from app.core.users import current_active_user
 from app.crud import goal as crud_goal
 from app.models.goal import Goal, GoalCreate, GoalUpdate
 from app.models.user import User
+from app.services.forecast import (
+    CashFlowForecast,
+    DEFAULT_HORIZON_MONTHS,
+    DEFAULT_PATHS,
+    MAX_HORIZON_MONTHS,
+    MAX_PATHS,
+    forecast_goals,
+)
 
 router = APIRouter()
 
@@ -27,6 +35,18 @@ async def read_goals(
     )
     return goals
 
+@router.get("/forecast", response_model=CashFlowForecast)
+async def read_goal_forecast(
+    db: AsyncSession = Depends(get_db),
+    paths: int = Query(DEFAULT_PATHS, ge=100, le=MAX_PATHS),
+    horizon_months: int = Query(DEFAULT_HORIZON_MONTHS, ge=1, le=MAX_HORIZON_MONTHS),
+    current_user: User = Depends(current_active_user),
+) -> CashFlowForecast:
+    """
+    Project completion dates for the user's goals from their cash flow.
+    """
+    return await forecast_goals(db, current_user, paths=paths, horizon_months=horizon_months)
+
 @router.post("/", response_model=Goal)
 async def create_goal(
     *,
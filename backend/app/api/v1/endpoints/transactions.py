@@ -1,17 +1,37 @@
+import math
 import uuid
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File, Form
+from pydantic import BaseModel, Field
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.deps import get_db
+from app.core.ratelimit import enforce, rate_limited
 from app.core.users import current_active_user
 from app.crud import transaction as crud_transaction
-from app.models.transaction import Transaction, TransactionCreate, TransactionUpdate
+from app.models.transaction import (
+    Transaction,
+    TransactionCreate,
+    TransactionRead,
+    TransactionSearchResult,
+    TransactionUpdate,
+)
 from app.models.user import User
 from app.services.receipt_analysis import analyze_receipt_image, ReceiptItem, ReceiptAnalysisResponse
 from app.services.cart_analysis import analyze_cart_screenshot, CartItem, CartAnalysisResponse
+from app.services.cart_checkout import (
+    CartCheckoutResponse,
+    InvalidConfirmationToken,
+    issue_confirmation_token,
+    read_confirmation_token,
+)
+from app.services.categorize import CategorySuggestion, suggest as suggest_categories
+from app.services.cart_prefetch import PrefetchLimitExceeded, cart_key_for, cart_prefetch
+from app.services.llm_gateway import LLMUnavailable
+from app.services.merchants import normalize
+from app.services.search import MAX_QUERY_LENGTH, search_transactions
+from app.utils.responses import FastJSONResponse
 
 
 class CartConfirmItem(BaseModel):
@@ -28,9 +48,91 @@ class CartConfirmRequest(BaseModel):
     date: str
 
 
+class CategorizeRequest(BaseModel):
+    """Merchant strings to categorize."""
+    merchants: List[str] = Field(min_length=1, max_length=100)
+
+
+class CartCheckoutConfirmRequest(BaseModel):
+    """Request body for confirming a cart analyzed by the checkout endpoint."""
+    confirmation_token: str
+
+
+def _cart_transactions(items: List[CartConfirmItem | CartItem], date: str) -> List[TransactionCreate]:
+    transactions = []
+    for item in items:
+        store, category, icon = normalize(item.merchant, item.category)
+        transactions.append(TransactionCreate(
+            merchant=f"{store}: {item.item_name[:40]}",  # Include item name in merchant field
+            amount=-abs(item.amount),  # Expenses are negative
+            category=category,
+            date=date,
+            icon=icon,
+        ))
+    return transactions
+
+
+def _busy(e: LLMUnavailable) -> HTTPException:
+    """503 with a Retry-After, for when the LLM gateway fails fast."""
+    return HTTPException(
+        status_code=503,
+        detail=f"Analysis is temporarily unavailable: {e}",
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+
+
+def _hourly_rate(user: User) -> Optional[float]:
+    # Calculate hourly rate for time cost
+    if user.hourly_rate:
+        return user.hourly_rate
+    if user.annual_salary:
+        return user.annual_salary / 2080
+    return None
+
+
+async def _analyze_cart(
+    user: User, response: Response, file: Optional[UploadFile], cart_key: Optional[str]
+) -> CartAnalysisResponse:
+    """
+    Return the speculative analysis for this cart if one was prefetched,
+    otherwise analyze the uploaded screenshot now.
+
+    The extension sends only the ``cart_key`` its prefetch returned: keys are
+    the server's hash of the prefetched screenshot and entries are kept per
+    user, so a key can only name an image this user had analyzed. Answers 404
+    when that analysis is gone, and the extension falls back to uploading a
+    screenshot, which is looked up by its own hash. Only a fresh analysis
+    takes a token from the cart rate limit; the prefetch already paid for it.
+    """
+    contents = None
+    if file is not None:
+        if not file.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="File must be an image.")
+        contents = await file.read()
+
+    key = cart_key_for(contents) if contents is not None else cart_key
+    if key:
+        speculative = await cart_prefetch.result(user.id, key)
+        if speculative is not None:
+            return speculative
+
+    if contents is None:
+        if cart_key:
+            raise HTTPException(status_code=404, detail="No pre-analysis for this cart; upload a screenshot instead.")
+        raise HTTPException(status_code=400, detail="A cart screenshot is required when no pre-analysis is available.")
+
+    await enforce("cart", user, response)
+    try:
+        return await analyze_cart_screenshot(contents, hourly_rate=_hourly_rate(user))
+    except LLMUnavailable as e:
+        raise _busy(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to analyze cart: {str(e)}")
+
+
 router = APIRouter()
 
-@router.post("/analyze", response_model=ReceiptAnalysisResponse)
+@router.post("/analyze", response_model=ReceiptAnalysisResponse, dependencies=[Depends(rate_limited("receipt"))])
 async def analyze_receipt(
     file: UploadFile = File(...),
     current_user: User = Depends(current_active_user),
@@ -45,23 +147,60 @@ async def analyze_receipt(
     try:
         response = await analyze_receipt_image(contents)
         return response
+    except LLMUnavailable as e:
+        raise _busy(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to analyze receipt: {str(e)}")
 
-@router.get("/", response_model=List[Transaction])
+@router.get("/", response_model=List[TransactionRead], response_class=FastJSONResponse)
 async def read_transactions(
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 1000,
     current_user: User = Depends(current_active_user),
-) -> List[Transaction]:
+) -> FastJSONResponse:
     """
     Retrieve transactions.
+    Rows are encoded straight from the query result, without ORM instances or
+    per-row validation.
     """
-    transactions = await crud_transaction.get_multi_by_user(
+    rows = await crud_transaction.get_rows_by_user(
         db, user_id=current_user.id, skip=skip, limit=limit
     )
-    return transactions
+    return FastJSONResponse(rows)
+
+@router.get("/search", response_model=List[TransactionSearchResult])
+async def search(
+    db: AsyncSession = Depends(get_db),
+    q: Optional[str] = Query(None, max_length=MAX_QUERY_LENGTH),
+    merchant: Optional[str] = Query(None, max_length=MAX_QUERY_LENGTH),
+    category: Optional[str] = Query(None, max_length=MAX_QUERY_LENGTH),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(current_active_user),
+) -> List[TransactionSearchResult]:
+    """
+    Fuzzy search over merchant and category, best matches first.
+    Tolerates typos and partial names ("amzn", "starbuck").
+    """
+    results = await search_transactions(
+        db, current_user.id, q=q, merchant=merchant, category=category, limit=limit
+    )
+    return [
+        TransactionSearchResult(**transaction.model_dump(), score=score)
+        for transaction, score in results
+    ]
+
+@router.post("/categorize", response_model=List[CategorySuggestion])
+async def categorize_merchants(
+    request: CategorizeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_active_user),
+) -> List[CategorySuggestion]:
+    """
+    Suggest a category per merchant from the user's most similar past
+    transactions, falling back to known merchants and then the LLM.
+    """
+    return await suggest_categories(db, current_user.id, request.merchants)
 
 @router.post("/", response_model=Transaction)
 async def create_transaction(
@@ -114,32 +253,43 @@ async def delete_transaction(
     return transaction
 
 
-@router.post("/analyze-cart", response_model=CartAnalysisResponse)
-async def analyze_cart(
+@router.post("/analyze-cart/prefetch", status_code=202, dependencies=[Depends(rate_limited("cart"))])
+async def prefetch_cart_analysis(
     file: UploadFile = File(...),
     current_user: User = Depends(current_active_user),
-) -> CartAnalysisResponse:
+) -> dict:
     """
-    Analyze a shopping cart screenshot and return cart contents.
-    Used by the Chrome extension for checkout interception.
+    Start analyzing a shopping cart screenshot in the background.
+    Called by the Chrome extension as soon as a cart page is detected; a later
+    checkout call with the returned cart key attaches to the result.
     """
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image.")
-    
+
     contents = await file.read()
-    
-    # Calculate hourly rate for time cost
-    hourly_rate = None
-    if current_user.hourly_rate:
-        hourly_rate = current_user.hourly_rate
-    elif current_user.annual_salary:
-        hourly_rate = current_user.annual_salary / 2080
-    
+    key = cart_key_for(contents)
+
     try:
-        response = await analyze_cart_screenshot(contents, hourly_rate=hourly_rate)
-        return response
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to analyze cart: {str(e)}")
+        task = cart_prefetch.start(current_user.id, key, contents, hourly_rate=_hourly_rate(current_user))
+    except PrefetchLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return {"cart_key": key, "status": "ready" if task.done() else "pending"}
+
+
+@router.post("/analyze-cart", response_model=CartAnalysisResponse)
+async def analyze_cart(
+    response: Response,
+    file: Optional[UploadFile] = File(None),
+    cart_key: Optional[str] = Form(None),
+    current_user: User = Depends(current_active_user),
+) -> CartAnalysisResponse:
+    """
+    Analyze a shopping cart screenshot and return cart contents.
+    Used by the Chrome extension for checkout interception.
+    Reuses a prefetched analysis for the same cart when one exists.
+    """
+    return await _analyze_cart(current_user, response, file, cart_key)
 
 
 @router.post("/confirm-cart", response_model=List[Transaction])
@@ -153,33 +303,47 @@ async def confirm_cart(
     Confirm cart items and track them as transactions.
     Called when user confirms purchase in Chrome extension.
     """
-    # Map categories to icons
-    category_icons = {
-        "Shopping": "🛍️",
-        "Groceries": "🛒",
-        "Food & Drink": "🍔",
-        "Entertainment": "🎬",
-        "Health": "💊",
-        "Utilities": "💡",
-        "Transport": "🚗",
-    }
-    
-    created_transactions = []
-    
-    for item in request.items:
-        icon = category_icons.get(item.category, "💳")
-        
-        transaction_in = TransactionCreate(
-            merchant=f"{item.merchant}: {item.item_name[:40]}",  # Include item name in merchant field
-            amount=-abs(item.amount),  # Expenses are negative
-            category=item.category,
-            date=request.date,
-            icon=icon,
-        )
-        transaction = await crud_transaction.create(
-            db, obj_in=transaction_in, user_id=current_user.id
-        )
-        created_transactions.append(transaction)
-    
-    return created_transactions
+    return await crud_transaction.create_multi(
+        db, objs_in=_cart_transactions(request.items, request.date), user_id=current_user.id
+    )
+
+
+@router.post("/checkout", response_model=CartCheckoutResponse)
+async def checkout_cart(
+    response: Response,
+    file: Optional[UploadFile] = File(None),
+    cart_key: Optional[str] = Form(None),
+    current_user: User = Depends(current_active_user),
+) -> CartCheckoutResponse:
+    """
+    Analyze a shopping cart screenshot and return the analysis together with a
+    signed, short-lived confirmation token.
+    The extension confirms with the token alone, without re-uploading.
+    Reuses a prefetched analysis for the same cart when one exists.
+    """
+    analysis = await _analyze_cart(current_user, response, file, cart_key)
+    return issue_confirmation_token(current_user.id, analysis)
 
+
+@router.post("/checkout/confirm", response_model=List[Transaction])
+async def confirm_checkout(
+    *,
+    db: AsyncSession = Depends(get_db),
+    request: CartCheckoutConfirmRequest,
+    current_user: User = Depends(current_active_user),
+) -> List[Transaction]:
+    """
+    Track the items of a cart analyzed by /checkout as transactions.
+    Confirming the same token twice does not create duplicates.
+    """
+    try:
+        cart = read_confirmation_token(request.confirmation_token, current_user.id)
+    except InvalidConfirmationToken as e:
+        raise HTTPException(status_code=400, detail=f"Invalid confirmation token: {str(e)}")
+
+    return await crud_transaction.create_multi(
+        db,
+        objs_in=_cart_transactions(cart.items, cart.date),
+        user_id=current_user.id,
+        ids=cart.transaction_ids(),
+    )
@@ -3,19 +3,23 @@ import io
 from typing import Any
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from loguru import logger
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.deps import get_db
+from app.core import metrics
+from app.core.ratelimit import rate_limited
 from app.core.users import current_active_user
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.account import Account, AccountCreate
 from app.crud import transaction as crud_transaction
 from app.crud import account as crud_account
+from app.services import achievements, budget, categorize, merchants
 
 router = APIRouter()
 
-@router.post("/csv")
+@router.post("/csv", dependencies=[Depends(rate_limited("upload"))])
 async def upload_csv(
     *,
     db: AsyncSession = Depends(get_db),
@@ -49,6 +53,7 @@ async def upload_csv(
     accounts_found = {} 
 
     transactions_created = 0
+    new_transactions = []
 
     for row in reader:
         try:
@@ -71,8 +76,7 @@ async def upload_csv(
 
             # 2. Handle Transaction
             date_str = row.get("Date")
-            merchant = row.get("Merchant")
-            category = row.get("Category")
+            merchant, category, icon_name = merchants.normalize(row.get("Merchant"), row.get("Category"))
             amount_val = float(row.get("Amount", 0))
             trans_type = row.get("Type", "expense").lower()
 
@@ -91,20 +95,6 @@ async def upload_csv(
             except:
                 date_obj = datetime.utcnow()
 
-            # Simple icon mapping
-            icon_name = category
-            cat_lower = category.lower()
-            if "food" in cat_lower or "dining" in cat_lower or "chipotle" in cat_lower or "starbucks" in cat_lower:
-                icon_name = "Pizza"
-            elif "rent" in cat_lower or "housing" in cat_lower:
-                icon_name = "Home"
-            elif "transport" in cat_lower or "uber" in cat_lower or "gas" in cat_lower:
-                icon_name = "Car"
-            elif "sub" in cat_lower or "netflix" in cat_lower or "spotify" in cat_lower:
-                icon_name = "RefreshCw"
-            elif "shop" in cat_lower or "amazon" in cat_lower:
-                icon_name = "ShoppingBag"
-
             new_trans = Transaction(
                 user_id=user_id,
                 merchant=merchant,
@@ -114,12 +104,18 @@ async def upload_csv(
                 icon=icon_name
             )
             db.add(new_trans)
+            new_transactions.append(new_trans)
             transactions_created += 1
 
         except Exception as e:
-            print(f"Skipping row due to error: {e}")
+            logger.warning("Skipping row due to error: {}", e)
             continue
 
+    # Embed the import, then let its labelled rows categorize the rest.
+    await db.flush()
+    with metrics.span("upload_categorize"):
+        vectors = await categorize.index(db, user_id, new_transactions)
+        unresolved = await categorize.label(db, user_id, new_transactions, vectors)
     await db.commit()
 
     # 3. Detect and seed recurring expenses automatically for the user
@@ -147,5 +143,11 @@ async def upload_csv(
                 icon="RefreshCw" if is_fixed else "Pizza"
             ))
     
+    # Rows were bulk-added outside CRUD, so resync this user's counters.
+    await achievements.backfill(db, user_ids=[user_id])
+    await budget.rebuild(db, user_ids=[user_id])
+    await achievements.record(db, user_id, data_version=1)
     await db.commit()
+    # After the counters are rebuilt, in the background, so neither the upload nor a connection waits on the LLM
+    categorize.schedule_relabel(user_id, unresolved)
     return {"message": f"Successfully processed {transactions_created} transactions"}
@@ -1,6 +1,7 @@
 import os
 
 from app.core.constants import Constants
+from app.core.log import configure_logging
 from loguru import logger
 
 
@@ -11,6 +12,20 @@ class Config:
     """
     DEBUG: bool = os.getenv("DEBUG", Constants.DEBUG) == "true"
 
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", Constants.DEFAULT_LOG_LEVEL).upper()
+    LOG_JSON: bool = os.getenv("LOG_JSON", Constants.DEFAULT_LOG_JSON) == "true"
+    REQUEST_LOG_SAMPLED_PATHS: list[str] = [
+        path for path in os.getenv(
+            "REQUEST_LOG_SAMPLED_PATHS", Constants.DEFAULT_REQUEST_LOG_SAMPLED_PATHS
+        ).split(",") if path
+    ]
+    REQUEST_LOG_SAMPLE_RATE: float = float(
+        os.getenv("REQUEST_LOG_SAMPLE_RATE", Constants.DEFAULT_REQUEST_LOG_SAMPLE_RATE)
+    )
+    REQUEST_LOG_SLOW_MS: float = float(
+        os.getenv("REQUEST_LOG_SLOW_MS", Constants.DEFAULT_REQUEST_LOG_SLOW_MS)
+    )
+
     POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", Constants.DEFAULT_POSTGRES_HOST)
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", Constants.DEFAULT_POSTGRES_PORT)
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", Constants.DEFAULT_POSTGRES_USER)
@@ -22,13 +37,82 @@ class Config:
     POSTGRES_URL: str = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
     OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY", "")
+    # Any OpenAI-compatible endpoint; the benchmarks point it at a local stub
+    LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", Constants.DEFAULT_LLM_BASE_URL)
+
+    PRICES_API_URL: str = os.getenv("PRICES_API_URL", Constants.DEFAULT_PRICES_API_URL)
+    PRICES_API_KEY: str = os.getenv("PRICES_API_KEY", "")
+    DEALS_CACHE_TTL_SECONDS: int = int(
+        os.getenv("DEALS_CACHE_TTL_SECONDS", Constants.DEFAULT_DEALS_CACHE_TTL_SECONDS)
+    )
+
+    EMBEDDING_WORKERS: int = int(os.getenv("EMBEDDING_WORKERS", Constants.DEFAULT_EMBEDDING_WORKERS))
+    EMBEDDING_BATCH_SIZE: int = int(
+        os.getenv("EMBEDDING_BATCH_SIZE", Constants.DEFAULT_EMBEDDING_BATCH_SIZE)
+    )
+    CATEGORY_SIMILARITY_THRESHOLD: float = float(
+        os.getenv("CATEGORY_SIMILARITY_THRESHOLD", Constants.DEFAULT_CATEGORY_SIMILARITY_THRESHOLD)
+    )
+
+    # "auto": a worker that finds the schema out of date bootstraps it (under
+    # an advisory lock); "off": it refuses to start until scripts/bootstrap_db.py has run.
+    DB_BOOTSTRAP: str = os.getenv("DB_BOOTSTRAP", Constants.DEFAULT_DB_BOOTSTRAP)
+    # Latency histograms and DB statement timing, served at /metrics (per worker)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", Constants.DEFAULT_METRICS_ENABLED) == "true"
+    # Fingerprint each request's statements and warn when one repeats
+    # N_PLUS_ONE_THRESHOLD times or more (a query per row). Meant for development.
+    QUERY_ACCOUNTING: bool = os.getenv("QUERY_ACCOUNTING", Constants.DEFAULT_QUERY_ACCOUNTING) == "true"
+    N_PLUS_ONE_THRESHOLD: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", Constants.DEFAULT_N_PLUS_ONE_THRESHOLD))
+    LLM_WARM_UP: bool = os.getenv("LLM_WARM_UP", Constants.DEFAULT_LLM_WARM_UP) == "true"
+
+    # LLM gateway: every model call gets LLM_DEADLINE_SECONDS (queueing and
+    # retries included; a chat turn's calls share CHAT_DEADLINE_SECONDS), and
+    # in-flight calls per worker adapt between the MIN and MAX concurrency,
+    # backing off when calls take longer than LLM_TARGET_LATENCY_SECONDS.
+    LLM_DEADLINE_SECONDS: float = float(os.getenv("LLM_DEADLINE_SECONDS", Constants.DEFAULT_LLM_DEADLINE_SECONDS))
+    CHAT_DEADLINE_SECONDS: float = float(
+        os.getenv("CHAT_DEADLINE_SECONDS", Constants.DEFAULT_CHAT_DEADLINE_SECONDS)
+    )
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", Constants.DEFAULT_LLM_MAX_RETRIES))
+    LLM_CONCURRENCY_INITIAL: int = int(
+        os.getenv("LLM_CONCURRENCY_INITIAL", Constants.DEFAULT_LLM_CONCURRENCY_INITIAL)
+    )
+    LLM_CONCURRENCY_MIN: int = int(os.getenv("LLM_CONCURRENCY_MIN", Constants.DEFAULT_LLM_CONCURRENCY_MIN))
+    LLM_CONCURRENCY_MAX: int = int(os.getenv("LLM_CONCURRENCY_MAX", Constants.DEFAULT_LLM_CONCURRENCY_MAX))
+    LLM_TARGET_LATENCY_SECONDS: float = float(
+        os.getenv("LLM_TARGET_LATENCY_SECONDS", Constants.DEFAULT_LLM_TARGET_LATENCY_SECONDS)
+    )
+    LLM_MAX_WAITING: int = int(os.getenv("LLM_MAX_WAITING", Constants.DEFAULT_LLM_MAX_WAITING))
+    # Waiting calls are served round-robin across users; one user can't queue more than this
+    LLM_MAX_WAITING_PER_USER: int = int(
+        os.getenv("LLM_MAX_WAITING_PER_USER", Constants.DEFAULT_LLM_MAX_WAITING_PER_USER)
+    )
+    # Provider failures in a row that open the circuit, and how long it stays open
+    LLM_BREAKER_FAILURES: int = int(os.getenv("LLM_BREAKER_FAILURES", Constants.DEFAULT_LLM_BREAKER_FAILURES))
+    LLM_BREAKER_COOLDOWN_SECONDS: float = float(
+        os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", Constants.DEFAULT_LLM_BREAKER_COOLDOWN_SECONDS)
+    )
+
+    # Per-user token buckets on the expensive endpoints, as "<class>=<requests>/<seconds>":
+    # a user can burst <requests>, then gets them back evenly over <seconds>.
+    # "memory" keeps the buckets per worker; "postgres" shares them across workers.
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", Constants.DEFAULT_RATE_LIMIT_ENABLED) == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", Constants.DEFAULT_RATE_LIMIT_BACKEND)
+    RATE_LIMITS: dict[str, str] = dict(
+        part.split("=", 1) for part in os.getenv("RATE_LIMITS", Constants.DEFAULT_RATE_LIMITS).split(",") if part
+    )
+
 
+configure_logging(Config.LOG_LEVEL, Config.LOG_JSON, Config.DEBUG)
 
 logger.info("Loading application configuration...")
 logger.info(f"DEBUG mode: {Config.DEBUG}")
+logger.info(f"Log level: {Config.LOG_LEVEL}")
 logger.info(f"Database host: {Config.POSTGRES_HOST}:{Config.POSTGRES_PORT}")
 logger.info(f"Database user: {Config.POSTGRES_USER}")
 logger.info(f"Database name: {Config.POSTGRES_DB}")
+logger.info(f"Prices API: {Config.PRICES_API_URL}")
+logger.info(f"LLM API: {Config.LLM_BASE_URL}")
 
 if Config.POSTGRES_PASSWORD:
     logger.debug("POSTGRES_PASSWORD is set.")
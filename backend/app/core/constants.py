@@ -7,7 +7,16 @@ class Constants:
     This class provides default configurations and settings that are used
     across the application, ensuring consistency and ease of maintenance.
     """
-    DEBUG = "true"
+    DEBUG = "false"  # Tracebacks show local variables when on; opt in for development only
+
+    DEFAULT_LOG_LEVEL: str = "INFO"
+    DEFAULT_LOG_JSON: str = "false"
+    # Read-heavy routes the dashboard polls; the rest are always logged.
+    DEFAULT_REQUEST_LOG_SAMPLED_PATHS: str = (
+        "/api/v1/dashboard,/api/v1/transactions,/api/v1/users/me,/api/v1/gamification,/api/v1/budget"
+    )
+    DEFAULT_REQUEST_LOG_SAMPLE_RATE: str = "0.1"
+    DEFAULT_REQUEST_LOG_SLOW_MS: str = "1000"
 
     DEFAULT_POSTGRES_HOST: str = "localhost"
     DEFAULT_POSTGRES_PORT: str = "5432"
@@ -15,5 +24,36 @@ class Constants:
     DEFAULT_POSTGRES_PASSWORD: str = "password"
     DEFAULT_POSTGRES_DB: str = "db"
 
+    DEFAULT_PRICES_API_URL: str = "https://api.pricesapi.io/api/v1"
+    DEFAULT_LLM_BASE_URL: str = "https://openrouter.ai/api/v1"
+    DEFAULT_DEALS_CACHE_TTL_SECONDS: str = "21600"
+
+    DEFAULT_EMBEDDING_WORKERS: str = "2"
+    DEFAULT_EMBEDDING_BATCH_SIZE: str = "512"
+    DEFAULT_CATEGORY_SIMILARITY_THRESHOLD: str = "0.6"
+
+    DEFAULT_LLM_WARM_UP: str = "true"
+    DEFAULT_LLM_DEADLINE_SECONDS: str = "45"
+    DEFAULT_CHAT_DEADLINE_SECONDS: str = "90"
+    DEFAULT_LLM_MAX_RETRIES: str = "2"
+    DEFAULT_LLM_CONCURRENCY_INITIAL: str = "8"
+    DEFAULT_LLM_CONCURRENCY_MIN: str = "2"
+    DEFAULT_LLM_CONCURRENCY_MAX: str = "64"
+    DEFAULT_LLM_TARGET_LATENCY_SECONDS: str = "20"
+    DEFAULT_LLM_MAX_WAITING: str = "200"
+    DEFAULT_LLM_MAX_WAITING_PER_USER: str = "20"
+    DEFAULT_LLM_BREAKER_FAILURES: str = "5"
+    DEFAULT_LLM_BREAKER_COOLDOWN_SECONDS: str = "30"
+
+    DEFAULT_RATE_LIMIT_ENABLED: str = "true"
+    DEFAULT_RATE_LIMIT_BACKEND: str = "memory"
+    DEFAULT_RATE_LIMITS: str = "chat=10/60,receipt=10/60,cart=20/60,upload=5/300"
+
+    DEFAULT_DB_BOOTSTRAP: str = "auto"
+
+    DEFAULT_METRICS_ENABLED: str = "true"
+    DEFAULT_QUERY_ACCOUNTING: str = "false"
+    DEFAULT_N_PLUS_ONE_THRESHOLD: str = "5"
+
 
 logger.info("Application constants defined.")
@@ -1,12 +1,20 @@
-from typing import AsyncGenerator
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncGenerator, Optional, Tuple
 
 from loguru import logger
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlmodel import SQLModel, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import SQLModel, select, text
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import Config
 import app.models # noqa: F401
+from app.models.schema_version import SchemaVersion
 
 logger.trace("Attempting to create database engine.")
 # Hiding password in the log
@@ -16,31 +24,194 @@ engine = create_async_engine(Config.POSTGRES_URL)
 logger.success("Database engine created successfully.")
 
 
-async def init_db() -> None:
+# Any constant works; it only has to be the same for every process.
+SCHEMA_LOCK_KEY = 0x70656E6E79
+
+EXTENSIONS = (
+    "vector",     # pgvector, for embeddings
+    "pg_trgm",    # Trigram and btree_gin power the per-user fuzzy
+    "btree_gin",  # transaction search indexes
+)
+
+# Columns added to tables that may already exist, with the statements that
+# add and fill them in. create_all never alters an existing table, so every
+# new column on an old table needs an entry here. They run in order under
+# the bootstrap lock, before tables and indexes are created, whenever the
+# table exists; each statement must be safe to run again.
+COLUMN_MIGRATIONS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("userstats", (
+        "ALTER TABLE userstats ADD COLUMN IF NOT EXISTS data_version INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE userstats ALTER COLUMN data_version DROP DEFAULT",
+    )),
+    ("useritem", (
+        "ALTER TABLE useritem ADD COLUMN IF NOT EXISTS category VARCHAR",
+        "UPDATE useritem SET category = shopitem.category FROM shopitem"
+        " WHERE shopitem.id = useritem.item_id AND useritem.category IS NULL",
+        # Keep one equipped item per category, so the partial unique index can be built
+        "UPDATE useritem SET is_equipped = false WHERE is_equipped AND (user_id, item_id) NOT IN ("
+        " SELECT DISTINCT ON (user_id, category) user_id, item_id FROM useritem"
+        " WHERE is_equipped ORDER BY user_id, category, item_id)",
+        "ALTER TABLE useritem ALTER COLUMN category SET NOT NULL",
+    )),
+    ("chatfact", (
+        # The epoch never matches the current month, so existing facts are rebuilt
+        "ALTER TABLE chatfact ADD COLUMN IF NOT EXISTS month DATE NOT NULL DEFAULT '1970-01-01'",
+        "ALTER TABLE chatfact ALTER COLUMN month DROP DEFAULT",
+    )),
+)
+
+
+# Indexes removed from the models. create_all never drops anything, so they
+# are dropped by name when the schema is bootstrapped.
+DROPPED_INDEXES: Tuple[str, ...] = (
+    # Shared by every user: with the user filter applied after the graph
+    # search, it returned too few of a user's own neighbours
+    "ix_transactionembedding_embedding_hnsw",
+    # Retrieval orders by pinned first and filters by user, which the graph
+    # search can't serve; it only slowed every fact upsert
+    "ix_chatfact_embedding_hnsw",
+)
+
+
+class SchemaDriftError(RuntimeError):
+    """Existing tables lack columns the models have, and no migration added them."""
+
+
+@lru_cache(maxsize=1)
+def schema_fingerprint() -> str:
     """
-    Initializes the database by creating tables and enabling necessary extensions.
+    Hash of the DDL the models generate. Changes whenever a table, column or
+    index does, so there is no version number to remember to bump.
+    """
+    dialect = postgresql.dialect()
+    digest = hashlib.sha256()
+    for table in SQLModel.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    # A new migration has to run even where the DDL above was already applied
+    for table, statements in COLUMN_MIGRATIONS:
+        digest.update(table.encode())
+        for statement in statements:
+            digest.update(statement.encode())
+    for name in DROPPED_INDEXES:
+        digest.update(name.encode())
+    return digest.hexdigest()
+
+
+async def _applied_fingerprint(conn: AsyncConnection) -> Optional[str]:
+    try:
+        result = await conn.execute(select(SchemaVersion.fingerprint).where(SchemaVersion.id == 1))
+    except ProgrammingError:  # Fresh database: no schemaversion table yet
+        await conn.rollback()
+        return None
+    return result.scalar_one_or_none()
+
+
+async def _migrate_columns(conn: AsyncConnection) -> None:
+    for table, statements in COLUMN_MIGRATIONS:
+        exists = (await conn.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table})).scalar()
+        if not exists:
+            continue  # create_all makes it with every column
+        for statement in statements:
+            await conn.execute(text(statement))
+        logger.info(f"Migrated columns of {table}.")
+
+
+def _create_schema(conn) -> None:
+    SQLModel.metadata.create_all(conn)
 
-    It enables the 'vector' extension for pgvector support and creates all tables
-    defined by SQLModel metadata.
+    # Recording the fingerprint over missing columns would hide them from every later check
+    existing = set(conn.execute(text(
+        "SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = current_schema()"
+    )).all())
+    missing = [
+        f"{table.name}.{column.name}"
+        for table in SQLModel.metadata.sorted_tables
+        for column in table.columns
+        if (table.name, column.name) not in existing
+    ]
+    if missing:
+        raise SchemaDriftError(
+            f"Existing tables lack columns: {', '.join(missing)}. Add them to COLUMN_MIGRATIONS in app/core/db.py."
+        )
+
+    # create_all skips existing tables entirely, including indexes added to them later.
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    for name in DROPPED_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+async def bootstrap_db() -> None:
+    """
+    Brings the schema up to date: extensions, column migrations, tables and
+    indexes (dropping removed ones), then records the fingerprint. Fails without recording it if an
+    existing table still lacks a column the models have.
+
+    Serialized across processes by a transaction-scoped advisory lock; a
+    process that gets the lock after another one finished finds the
+    fingerprint current and does nothing.
 
     :return: None
     :rtype: None
     """
-    logger.info("Starting database initialization...")
-    try:
-        async with engine.begin() as conn:
-            logger.debug("Transaction started for database initialization.")
+    expected = schema_fingerprint()
+    logger.info("Bootstrapping database schema...")
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        logger.debug("Acquired schema bootstrap lock.")
+        # The table may not exist yet; check without aborting this transaction.
+        exists = (await conn.execute(text("SELECT to_regclass('schemaversion') IS NOT NULL"))).scalar()
+        if exists:
+            current = (await conn.execute(
+                select(SchemaVersion.fingerprint).where(SchemaVersion.id == 1)
+            )).scalar_one_or_none()
+            if current == expected:
+                logger.info("Schema was bootstrapped by another process.")
+                return
+
+        for extension in EXTENSIONS:
+            await conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+        logger.info(f"Ensured extensions are enabled: {', '.join(EXTENSIONS)}.")
+
+        await _migrate_columns(conn)
+        await conn.run_sync(_create_schema)
+        logger.info("All tables and indexes created or verified successfully.")
 
-            logger.trace("Executing command: CREATE EXTENSION IF NOT EXISTS vector")
-            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-            logger.info("Ensured 'vector' extension is enabled.")
+        statement = insert(SchemaVersion).values(id=1, fingerprint=expected, applied_at=datetime.utcnow())
+        await conn.execute(statement.on_conflict_do_update(
+            index_elements=[SchemaVersion.id],
+            set_={"fingerprint": expected, "applied_at": statement.excluded.applied_at},
+        ))
+    logger.success(f"Database schema bootstrapped ({expected[:12]}).")
 
-            logger.debug("Creating all tables based on SQLModel metadata...")
-            await conn.run_sync(SQLModel.metadata.create_all)
-            logger.info("All tables created or verified successfully.")
 
-            logger.debug("Committing transaction for database initialization.")
-        logger.success("Database initialization complete.")
+async def init_db() -> None:
+    """
+    Checks on worker startup that the database schema matches the models.
+
+    This is a single query when the schema is current, however many workers
+    start. Otherwise, depending on ``Config.DB_BOOTSTRAP``, the schema is
+    bootstrapped (see ``bootstrap_db``) or startup fails.
+
+    :return: None
+    :rtype: None
+    """
+    logger.info("Checking database schema version...")
+    try:
+        async with engine.connect() as conn:
+            applied = await _applied_fingerprint(conn)
+        if applied == schema_fingerprint():
+            logger.success("Database schema is up to date.")
+            return
+        if Config.DB_BOOTSTRAP != "auto":
+            raise RuntimeError(
+                "Database schema is missing or out of date; run scripts/bootstrap_db.py before starting workers."
+            )
+        logger.warning("Database schema is missing or out of date; bootstrapping it now.")
+        await bootstrap_db()
     except Exception as e:
         logger.error(f"Failed during database initialization: {e}", exc_info=True)
         raise
@@ -52,26 +223,21 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 
     It creates a new AsyncSession for each call, yields it for use in a `with` block,
     and ensures that the session is properly closed (or rolled back on error) after use.
+    Runs on every request, so it only logs when something goes wrong.
 
     :return: An asynchronous generator yielding a database session.
     :rtype: AsyncGenerator[AsyncSession, None]
     """
-    logger.debug("Request for a new database session received.")
     session: AsyncSession | None = None
     try:
-        logger.trace("Creating new AsyncSession from engine.")
         session = AsyncSession(engine, expire_on_commit=False)
-        logger.debug("New database session created. Yielding to context.")
         yield session
-        logger.trace("Context finished. Session is about to be closed.")
     except Exception as e:
-        logger.error(f"An exception occurred within the session context: {e}", exc_info=True)
+        logger.error("An exception occurred within the session context: {}", e, exc_info=True)
         if session:
             logger.warning("Rolling back the transaction due to an exception.")
             await session.rollback()
         raise
     finally:
         if session:
-            logger.debug("Closing database session.")
             await session.close()
-            logger.trace("Session closed.")
@@ -0,0 +1,79 @@
+import random
+import sys
+import time
+from typing import Sequence
+
+from loguru import logger
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+
+def configure_logging(level: str, json: bool, debug: bool) -> None:
+    """
+    Replace loguru's default sink with one configured for the environment.
+
+    Records are handed to a background thread (``enqueue``), so writing to
+    the sink never blocks the event loop. ``json`` emits one JSON object per
+    line, with ``bind`` fields under ``record.extra``.
+    """
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level=level,
+        format=TEXT_FORMAT,
+        serialize=json,
+        enqueue=True,
+        backtrace=debug,
+        diagnose=debug,  # Variable values in tracebacks; never in production
+    )
+
+
+class RequestLogMiddleware:
+    """
+    One structured log line per HTTP request: method, path, status and
+    duration.
+
+    Requests under one of ``sampled_paths`` are logged at ``sample_rate``;
+    errors and requests slower than ``slow_ms`` are always logged.
+    """
+
+    def __init__(self, app, sampled_paths: Sequence[str], sample_rate: float, slow_ms: float):
+        self.app = app
+        self.sampled_paths = tuple(sampled_paths)
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            path = scope["path"]
+            if (
+                status >= 500
+                or duration_ms >= self.slow_ms
+                or not path.startswith(self.sampled_paths)
+                or random.random() < self.sample_rate
+            ):
+                logger.bind(
+                    method=scope["method"], path=path, status=status, duration_ms=round(duration_ms, 2)
+                ).log(
+                    "WARNING" if status >= 500 else "INFO",
+                    "{} {} {} {:.1f}ms", scope["method"], path, status, duration_ms,
+                )
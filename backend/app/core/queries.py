@@ -0,0 +1,123 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),               # String literals
+    (re.compile(r"\$\d+|%\(\w+\)s|\b\d+(?:\.\d+)?\b"), "?"),  # Placeholders and numbers
+    (re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)"), "(?)"),  # IN (?, ?, ?) and one VALUES row
+    (re.compile(r"(?:\(\?\)\s*,\s*)+\(\?\)"), "(?)"),     # Multi-row VALUES
+    (re.compile(r"\s+"), " "),
+)
+
+
+def fingerprint(statement: str) -> str:
+    """
+    ``statement`` with literals, bound parameters and list lengths erased, so
+    the same query issued for different rows reads the same.
+    """
+    for pattern, replacement in _NORMALIZE:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryLog:
+    """Statements executed while the log is current, in order."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    def record(self, statement: str) -> None:
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        """Fingerprints executed at least ``threshold`` times, most frequent first."""
+        counts = Counter(fingerprint(s) for s in self.statements)
+        return [(fp, n) for fp, n in counts.most_common() if n >= threshold]
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries"]
+        lines += [f"  {n}x {fp}" for fp, n in self.repeated()]
+        return "\n".join(lines)
+
+
+# The log statements are charged to. SQLAlchemy's async greenlets inherit
+# the task's context, so the engine hook sees the caller's log.
+current_queries: ContextVar[Optional[QueryLog]] = ContextVar("current_queries", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryLog]:
+    """Collect the statements executed inside the block (nested blocks see only their own)."""
+    log = QueryLog()
+    token = current_queries.set(log)
+    try:
+        yield log
+    finally:
+        current_queries.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "block") -> Iterator[QueryLog]:
+    """
+    Fail with ``QueryBudgetExceeded`` if the block runs more than ``limit``
+    statements::
+
+        with assert_max_queries(2, "GET /users/me"):
+            await client.get("/api/v1/users/me")
+    """
+    with track_queries() as log:
+        yield log
+    if log.count > limit:
+        raise QueryBudgetExceeded(f"{label}: {log.count} queries, budget is {limit}\n{log.report()}")
+
+
+class QueryAccountingMiddleware:
+    """
+    Tracks the statements of each HTTP request and warns when one statement
+    shape repeats ``threshold`` times or more, the usual sign of a query
+    issued per row in a loop.
+    """
+
+    def __init__(self, app, threshold: int):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as log:
+            await self.app(scope, receive, send)
+
+        for statement, count in log.repeated(self.threshold):
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            logger.bind(method=scope["method"], route=route, queries=log.count, repeats=count).warning(
+                "Possible N+1 in {} {}: {} of {} queries are {}",
+                scope["method"], route, count, log.count, statement[:300],
+            )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Record every statement the engine executes in the current ``QueryLog``, if any."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        log = current_queries.get()
+        if log is not None:
+            log.record(statement)
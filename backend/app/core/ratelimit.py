@@ -0,0 +1,194 @@
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Response
+from loguru import logger
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import metrics
+from app.core.config import Config
+from app.core.db import engine
+from app.core.users import current_active_user
+from app.models.rate_limit import RateLimitBucket
+from app.models.user import User
+
+# Above this many buckets, the in-process backend drops the full ones
+MAX_MEMORY_BUCKETS = 100_000
+
+RATE_LIMITED = metrics.registry.counter(
+    "rate_limited_total", "Requests refused by the per-user rate limits.", ("route_class",)
+)
+
+# Who the current request is for, set by rate_limited(); the LLM gateway
+# queues calls per client so that one user's backlog can't starve the rest.
+current_client: ContextVar[Optional[str]] = ContextVar("rate_limit_client", default=None)
+
+
+@dataclass(frozen=True)
+class Quota:
+    """``capacity`` requests in a burst, given back evenly over ``period`` seconds."""
+    capacity: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Quota":
+        capacity, _, period = value.partition("/")
+        return cls(capacity=int(capacity), period=float(period))
+
+    @property
+    def interval(self) -> float:
+        """Seconds to earn back one request."""
+        return self.period / self.capacity
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    quota: Quota
+    remaining: int
+    reset: float  # Seconds until the bucket is full again
+    retry_after: float = 0.0
+
+    def headers(self) -> Dict[str, str]:
+        """The RateLimit header fields (IETF httpapi draft), plus Retry-After when refused."""
+        headers = {
+            "RateLimit-Limit": str(self.quota.capacity),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset)),
+            "RateLimit-Policy": f"{self.quota.capacity};w={self.quota.period:g}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+def _refused(quota: Quota, backlog: float) -> Decision:
+    return Decision(
+        allowed=False, quota=quota, remaining=0, reset=backlog,
+        retry_after=max(0.0, backlog + quota.interval - quota.period),
+    )
+
+
+def _decide(quota: Quota, backlog: float) -> Decision:
+    """
+    A bucket is kept as its backlog: how long until it is full again. Each
+    request adds one ``interval``; a request that would push it past
+    ``period`` (an empty bucket) is refused.
+    """
+    backlog = max(0.0, backlog)
+    if backlog + quota.interval > quota.period + 1e-9:
+        return _refused(quota, backlog)
+    backlog += quota.interval
+    remaining = int((quota.period - backlog) / quota.interval + 1e-9)
+    return Decision(allowed=True, quota=quota, remaining=remaining, reset=backlog)
+
+
+class MemoryBackend:
+    """Buckets in this worker's memory: each worker enforces the quotas on its own."""
+
+    def __init__(self):
+        self._full_at: Dict[str, float] = {}
+
+    async def take(self, key: str, quota: Quota) -> Decision:
+        now = time.monotonic()
+        decision = _decide(quota, self._full_at.get(key, now) - now)
+        if decision.allowed:
+            self._full_at[key] = now + decision.reset
+            if len(self._full_at) > MAX_MEMORY_BUCKETS:
+                # A full bucket is the same as no bucket
+                self._full_at = {k: at for k, at in self._full_at.items() if at > now}
+        return decision
+
+
+class PostgresBackend:
+    """
+    Buckets in a table shared by every worker. A request takes a token with
+    one upsert that only applies if the bucket isn't empty.
+    """
+
+    async def take(self, key: str, quota: Quota) -> Decision:
+        now = datetime.utcnow()
+        interval = timedelta(seconds=quota.interval)
+        full_at = func.greatest(RateLimitBucket.full_at, now) + interval
+        statement = insert(RateLimitBucket).values(key=key, full_at=now + interval)
+        statement = statement.on_conflict_do_update(
+            index_elements=[RateLimitBucket.key],
+            set_={"full_at": full_at},
+            where=full_at <= now + timedelta(seconds=quota.period),
+        ).returning(RateLimitBucket.full_at)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            taken = (await session.exec(statement)).scalar_one_or_none()
+            if taken is not None:
+                await session.commit()
+                return _decide(quota, (taken - now).total_seconds() - quota.interval)
+            # Empty bucket: nothing was written, read it for Retry-After
+            result = await session.exec(select(RateLimitBucket.full_at).where(RateLimitBucket.key == key))
+            return _refused(quota, (result.one() - now).total_seconds())
+
+
+class RateLimiter:
+    def __init__(self, quotas: Dict[str, Quota], shared: Optional[PostgresBackend] = None):
+        self.quotas = quotas
+        self.memory = MemoryBackend()
+        self.shared = shared
+
+    async def take(self, route_class: str, client: str) -> Decision:
+        quota = self.quotas[route_class]
+        key = f"{route_class}:{client}"
+        if self.shared is not None:
+            try:
+                return await self.shared.take(key, quota)
+            except Exception as e:
+                # Don't turn a database hiccup into refusing everyone; fall back to this worker's buckets
+                logger.warning("Shared rate limit backend failed ({}), using in-process buckets", e)
+        return await self.memory.take(key, quota)
+
+
+rate_limiter = RateLimiter(
+    quotas={route_class: Quota.parse(value) for route_class, value in Config.RATE_LIMITS.items()},
+    shared=PostgresBackend() if Config.RATE_LIMIT_BACKEND == "postgres" else None,
+)
+
+
+async def enforce(route_class: str, user: User, response: Optional[Response] = None) -> None:
+    """
+    Take a token from the user's ``route_class`` bucket (see
+    Config.RATE_LIMITS), raising 429 with Retry-After once it's empty. For
+    routes that only charge for some requests; the rest use ``rate_limited``.
+    """
+    client = str(user.id)
+    current_client.set(client)
+    if not Config.RATE_LIMIT_ENABLED:
+        return
+    decision = await rate_limiter.take(route_class, client)
+    if not decision.allowed:
+        RATE_LIMITED.inc(route_class=route_class)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many {route_class} requests; try again in {math.ceil(decision.retry_after)}s.",
+            headers=decision.headers(),
+        )
+    if response is not None:
+        response.headers.update(decision.headers())
+
+
+def rate_limited(route_class: str):
+    """
+    Dependency taking a token from the user's ``route_class`` bucket (see
+    Config.RATE_LIMITS); answers 429 with Retry-After once it's empty.
+    """
+    if route_class not in rate_limiter.quotas:
+        raise ValueError(f"No quota configured for route class '{route_class}'")
+
+    async def dependency(response: Response, user: User = Depends(current_active_user)) -> None:
+        await enforce(route_class, user, response)
+
+    return dependency
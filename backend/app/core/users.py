@@ -9,6 +9,7 @@ from fastapi_users.authentication import (
     JWTStrategy,
 )
 from fastapi_users.db import SQLAlchemyUserDatabase
+from loguru import logger
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.user import User
@@ -25,7 +26,7 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     verification_token_secret = SECRET
 
     async def on_after_register(self, user: User, request: Optional[Request] = None):
-        print(f"User {user.id} has registered. Seeding default expenses.")
+        logger.info("User {} has registered. Seeding default expenses.", user.id)
         async for session in get_db():
             default_expenses = [
                 Expense(user_id=user.id, category="Housing", name="Rent/Mortgage", amount=1500.0, is_fixed=True, icon="Home"),
@@ -42,12 +43,13 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     async def on_after_forgot_password(
         self, user: User, token: str, request: Optional[Request] = None
     ):
-        print(f"User {user.id} has forgot their password. Reset token: {token}")
+        # The token grants a password reset, so it never goes to the logs
+        logger.info("User {} requested a password reset.", user.id)
 
     async def on_after_request_verify(
         self, user: User, token: str, request: Optional[Request] = None
     ):
-        print(f"Verification requested for user {user.id}. Verification token: {token}")
+        logger.info("Verification requested for user {}.", user.id)
 
 async def get_user_manager(user_db=Depends(get_user_db)):
     yield UserManager(user_db)
@@ -4,6 +4,7 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.expense import Expense, ExpenseCreate, ExpenseUpdate
+from app.services import achievements
 
 class CRUDExpense:
     async def get(self, session: AsyncSession, id: uuid.UUID) -> Optional[Expense]:
@@ -19,6 +20,7 @@ class CRUDExpense:
     async def create(self, session: AsyncSession, *, obj_in: ExpenseCreate, user_id: uuid.UUID) -> Expense:
         db_obj = Expense.model_validate(obj_in, update={"user_id": user_id})
         session.add(db_obj)
+        await achievements.record(session, user_id, data_version=1)
         await session.commit()
         await session.refresh(db_obj)
         return db_obj
@@ -35,6 +37,7 @@ class CRUDExpense:
             setattr(db_obj, key, value)
             
         session.add(db_obj)
+        await achievements.record(session, db_obj.user_id, data_version=1)
         await session.commit()
         await session.refresh(db_obj)
         return db_obj
@@ -43,6 +46,7 @@ class CRUDExpense:
         obj = await session.get(Expense, id)
         if obj:
             await session.delete(obj)
+            await achievements.record(session, obj.user_id, data_version=1)
             await session.commit()
         return obj
 
@@ -4,6 +4,7 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.goal import Goal, GoalCreate, GoalUpdate
+from app.services import achievements, streaks
 
 class CRUDGoal:
     async def get(self, session: AsyncSession, id: uuid.UUID) -> Optional[Goal]:
@@ -19,6 +20,8 @@ class CRUDGoal:
     async def create(self, session: AsyncSession, *, obj_in: GoalCreate, user_id: uuid.UUID) -> Goal:
         db_obj = Goal.model_validate(obj_in, update={"user_id": user_id})
         session.add(db_obj)
+        await achievements.record(session, user_id, total_saved=db_obj.saved_amount, data_version=1)
+        await streaks.record_activity(session, user_id)
         await session.commit()
         await session.refresh(db_obj)
         return db_obj
@@ -31,10 +34,15 @@ class CRUDGoal:
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
             
+        saved_before = db_obj.saved_amount
         for key, value in update_data.items():
             setattr(db_obj, key, value)
             
         session.add(db_obj)
+        await achievements.record(
+            session, db_obj.user_id, total_saved=db_obj.saved_amount - saved_before, data_version=1
+        )
+        await streaks.record_activity(session, db_obj.user_id)
         await session.commit()
         await session.refresh(db_obj)
         return db_obj
@@ -43,6 +51,7 @@ class CRUDGoal:
         obj = await session.get(Goal, id)
         if obj:
             await session.delete(obj)
+            await achievements.record(session, obj.user_id, total_saved=-obj.saved_amount, data_version=1)
             await session.commit()
         return obj
 
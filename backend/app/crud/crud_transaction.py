@@ -1,10 +1,12 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import uuid
+from sqlalchemy.dialects.postgresql import insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.transaction import Transaction, TransactionCreate, TransactionUpdate
+from app.models.transaction import Transaction, TransactionCreate, TransactionRead, TransactionUpdate
 from app.models.transaction_split import TransactionSplit
+from app.services import achievements, budget, categorize, streaks
 
 class CRUDTransaction:
     async def get(self, session: AsyncSession, id: uuid.UUID) -> Optional[Transaction]:
@@ -17,6 +19,19 @@ class CRUDTransaction:
         result = await session.exec(statement)
         return result.all()
 
+    async def get_rows_by_user(
+        self, session: AsyncSession, user_id: uuid.UUID, skip: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Same rows as ``get_multi_by_user`` as plain dicts shaped like
+        ``TransactionRead``, skipping ORM instances entirely.
+        """
+        columns = [getattr(Transaction, name) for name in TransactionRead.model_fields]
+        statement = select(*columns).where(Transaction.user_id == user_id).order_by(Transaction.date.desc()).offset(skip).limit(limit)
+        result = await session.exec(statement)
+        keys = list(TransactionRead.model_fields)
+        return [dict(zip(keys, row)) for row in result]
+
     async def create(self, session: AsyncSession, *, obj_in: TransactionCreate, user_id: uuid.UUID) -> Transaction:
         # Separate splits from transaction data
         splits_in = obj_in.splits
@@ -28,24 +43,74 @@ class CRUDTransaction:
         db_obj = Transaction.model_validate(transaction_data, update={"user_id": user_id})
         
         session.add(db_obj)
-        await session.commit()
-        await session.refresh(db_obj)
+        await session.flush()
+        vectors = await categorize.index(session, user_id, [db_obj])
+        unresolved = await categorize.label(session, user_id, [db_obj], vectors)
+        await achievements.record(session, user_id, transaction_count=1, data_version=1)
+        await budget.apply(session, user_id, [(db_obj.date, db_obj.category, db_obj.amount)])
+        await streaks.record_activity(session, user_id)
 
-        # Create splits
-        if splits_in:
-            for split in splits_in:
-                db_split = TransactionSplit(
-                    transaction_id=db_obj.id,
-                    category=split.category,
-                    amount=split.amount,
-                    note=split.note
-                )
-                session.add(db_split)
-            await session.commit()
-            await session.refresh(db_obj) # Refresh to load splits relationship
+        # Splits go in the same commit; the id is known since the flush above
+        for split in splits_in or []:
+            session.add(TransactionSplit(
+                transaction_id=db_obj.id,
+                category=split.category,
+                amount=split.amount,
+                note=split.note
+            ))
+        await session.commit()
+        # The LLM is only asked once the transaction is committed, in the background
+        categorize.schedule_relabel(user_id, unresolved)
+        await session.refresh(db_obj)  # One refresh, after the splits, to load them too
 
         return db_obj
 
+    async def create_multi(
+        self,
+        session: AsyncSession,
+        *,
+        objs_in: List[TransactionCreate],
+        user_id: uuid.UUID,
+        ids: Optional[List[uuid.UUID]] = None,
+    ) -> List[Transaction]:
+        """
+        Insert many transactions with a single statement.
+
+        Splits are not inserted. When ``ids`` are given, rows whose id already
+        exists are skipped, which makes replaying the same batch idempotent.
+        """
+        if not objs_in:
+            return []
+
+        rows = []
+        for index, obj_in in enumerate(objs_in):
+            row = Transaction.model_validate(
+                obj_in.model_dump(exclude={"splits"}), update={"user_id": user_id}
+            ).model_dump()
+            if ids is not None:
+                row["id"] = ids[index]
+            rows.append(row)
+
+        statement = (
+            insert(Transaction)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[Transaction.id])
+            .returning(Transaction)
+        )
+        result = await session.exec(statement)
+        created = result.scalars().all()
+
+        unresolved = []
+        if created:
+            vectors = await categorize.index(session, user_id, created)
+            unresolved = await categorize.label(session, user_id, created, vectors)
+            await achievements.record(session, user_id, transaction_count=len(created), data_version=1)
+            await budget.apply(session, user_id, [(t.date, t.category, t.amount) for t in created])
+            await streaks.record_activity(session, user_id)
+        await session.commit()
+        categorize.schedule_relabel(user_id, unresolved)
+        return created
+
     async def update(
         self, session: AsyncSession, *, db_obj: Transaction, obj_in: TransactionUpdate | dict
     ) -> Transaction:
@@ -54,10 +119,18 @@ class CRUDTransaction:
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
             
+        before = (db_obj.date, db_obj.category, db_obj.amount)
         for key, value in update_data.items():
             setattr(db_obj, key, value)
             
         session.add(db_obj)
+        if "merchant" in update_data:
+            await categorize.index(session, db_obj.user_id, [db_obj])
+        await achievements.record(session, db_obj.user_id, data_version=1)
+        after = (db_obj.date, db_obj.category, db_obj.amount)
+        if after != before:
+            await budget.apply(session, db_obj.user_id, [before], sign=-1)
+            await budget.apply(session, db_obj.user_id, [after])
         await session.commit()
         await session.refresh(db_obj)
         return db_obj
@@ -66,6 +139,8 @@ class CRUDTransaction:
         obj = await session.get(Transaction, id)
         if obj:
             await session.delete(obj)
+            await achievements.record(session, obj.user_id, transaction_count=-1, data_version=1)
+            await budget.apply(session, obj.user_id, [(obj.date, obj.category, obj.amount)], sign=-1)
             await session.commit()
         return obj
 
@@ -1,6 +1,12 @@
 from .user import User, UserCreate, UserUpdate
 from .expense import Expense, ExpenseCreate, ExpenseUpdate
 from .goal import Goal, GoalCreate, GoalUpdate
-from .transaction import Transaction, TransactionCreate, TransactionUpdate
-from .gamification import Achievement, UserAchievement, ShopItem, UserItem
-from .account import Account, AccountCreate, AccountUpdate
\ No newline at end of file
+from .transaction import Transaction, TransactionCreate, TransactionRead, TransactionUpdate
+from .gamification import Achievement, UserAchievement, UserStats, UserActivity, ShopItem, UserItem
+from .account import Account, AccountCreate, AccountUpdate
+from .deals import PriceCache
+from .rate_limit import RateLimitBucket
+from .budget import CategorySpend
+from .embedding import TransactionEmbedding
+from .chat_fact import ChatFact
+from .schema_version import SchemaVersion
@@ -0,0 +1,16 @@
+import uuid
+from datetime import date
+
+from sqlmodel import Field, SQLModel
+
+
+class CategorySpend(SQLModel, table=True):
+    """
+    Spending per user, month and category, maintained incrementally on
+    transaction writes so budget status never scans transaction history.
+    """
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    month: date = Field(primary_key=True)  # First day of the month (UTC)
+    category: str = Field(primary_key=True)
+    spent: float = Field(default=0.0)
+    count: int = Field(default=0)
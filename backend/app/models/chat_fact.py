@@ -0,0 +1,28 @@
+import uuid
+from datetime import date
+from typing import Any
+
+from sqlalchemy import Column
+from sqlmodel import Field, SQLModel
+
+from app.models.embedding import EMBEDDING_DIM
+from app.utils.vector import Vector
+
+
+class ChatFact(SQLModel, table=True):
+    """
+    One short, self-contained statement about a user's finances (a monthly
+    rollup, a merchant summary, a goal...), embedded for retrieval into the
+    chat prompt. Rebuilt whenever the user's data version moves past
+    ``version``, or a new month starts after ``month``. A user has a few
+    hundred at most, so retrieval scans them exactly; no vector index.
+    """
+
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    key: str = Field(primary_key=True)  # e.g. "month:2026-09", "merchant:Starbucks"
+    kind: str
+    text: str
+    pinned: bool = Field(default=False)  # Always included, whatever the question
+    version: int
+    month: date  # First day of the month the facts were built in
+    embedding: Any = Field(sa_column=Column(Vector(EMBEDDING_DIM), nullable=False))
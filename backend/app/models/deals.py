@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import Column
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+class PriceCache(SQLModel, table=True):
+    """Upstream prices API responses shared by every worker until they expire."""
+    key: str = Field(primary_key=True)  # e.g. "search:iphone 15 pro" or "offers:<product id>"
+    payload: Dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
+    expires_at: datetime = Field(index=True)
@@ -0,0 +1,26 @@
+import uuid
+from typing import Any
+
+from sqlalchemy import Column, ForeignKey, Uuid
+from sqlmodel import Field, SQLModel
+
+from app.utils.vector import Vector
+
+EMBEDDING_DIM = 256
+
+
+class TransactionEmbedding(SQLModel, table=True):
+    """
+    Embedding of a transaction's normalized merchant and description.
+
+    Kept beside the transaction rather than on it so that loading
+    transactions never drags the vector along. Lookups are always for one
+    user's rows, so they go through the ``user_id`` index and compare
+    exactly; an approximate index over every user's vectors would apply the
+    user filter only after picking candidates, and miss neighbours.
+    """
+    transaction_id: uuid.UUID = Field(
+        sa_column=Column(Uuid, ForeignKey("transaction.id", ondelete="CASCADE"), primary_key=True)
+    )
+    user_id: uuid.UUID = Field(foreign_key="user.id", index=True)
+    embedding: Any = Field(sa_column=Column(Vector(EMBEDDING_DIM), nullable=False))
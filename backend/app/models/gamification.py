@@ -1,6 +1,7 @@
 from typing import Optional, List, TYPE_CHECKING
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 from pydantic import validator
 
@@ -42,6 +43,29 @@ class UserAchievement(SQLModel, table=True):
             return v.astimezone(timezone.utc).replace(tzinfo=None)
         return v
 
+class UserStats(SQLModel, table=True):
+    """
+    Per-user counters maintained incrementally on writes so achievement rules
+    can be evaluated without re-scanning history.
+    """
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    transaction_count: int = Field(default=0)
+    total_saved: float = Field(default=0.0)
+    # Bit i is set once rule i in app.services.achievements.RULES has fired.
+    unlocked_mask: int = Field(default=0)
+    # Bumped on every transaction, goal and expense write; keys cached
+    # analytics and forecasts.
+    data_version: int = Field(default=0)
+
+class UserActivity(SQLModel, table=True):
+    """
+    One row per day a user was active. Frozen rows are days bridged by a
+    Streak Freeze rather than real activity.
+    """
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    frozen: bool = Field(default=False)
+
 # --- Shop Items ---
 class ShopItemBase(SQLModel):
     name: str
@@ -57,9 +81,25 @@ class ShopItem(ShopItemBase, table=True):
     user_links: List["UserItem"] = Relationship(back_populates="item")
 
 class UserItem(SQLModel, table=True):
+    # At most one equipped item per (user, category). Partial so unequipped
+    # rows never collide; this is what makes equipping race-free.
+    __table_args__ = (
+        Index(
+            "ix_useritem_one_equipped_per_category",
+            "user_id",
+            "category",
+            unique=True,
+            postgresql_where=text("is_equipped"),
+        ),
+    )
+
     user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
     item_id: uuid.UUID = Field(foreign_key="shopitem.id", primary_key=True)
     is_equipped: bool = Field(default=False)
+    # Denormalized from ShopItem.category at purchase time so the equip
+    # update and the unique index above don't need a join. Never NULL: the
+    # unique index ignores NULLs, so an unset row could stay equipped twice.
+    category: str
     
     user: "User" = Relationship(back_populates="items")
     item: "ShopItem" = Relationship(back_populates="user_links")
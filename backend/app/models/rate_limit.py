@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class RateLimitBucket(SQLModel, table=True):
+    """
+    A token bucket shared by every worker (RATE_LIMIT_BACKEND=postgres),
+    stored as the moment it will be full again; earlier means full already.
+    """
+    key: str = Field(primary_key=True)  # "<route class>:<user id>"
+    full_at: datetime
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class SchemaVersion(SQLModel, table=True):
+    """
+    Single row recording which schema the database was last bootstrapped
+    to, so workers can check it with one query instead of running DDL.
+    """
+    id: int = Field(default=1, primary_key=True)
+    fingerprint: str  # Hash of the DDL generated from the models
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
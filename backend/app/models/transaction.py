@@ -1,6 +1,7 @@
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, timezone
 import uuid
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 from pydantic import validator
 
@@ -32,12 +33,38 @@ class TransactionBase(SQLModel):
         return v
 
 class Transaction(TransactionBase, table=True):
+    # Trigram GIN indexes led by user_id (via btree_gin) so fuzzy and
+    # substring search only touch the searching user's rows.
+    __table_args__ = (
+        Index(
+            "ix_transaction_user_merchant_trgm", "user_id", "merchant",
+            postgresql_using="gin", postgresql_ops={"merchant": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_transaction_user_category_trgm", "user_id", "category",
+            postgresql_using="gin", postgresql_ops={"category": "gin_trgm_ops"},
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id")
     
     user: "User" = Relationship(back_populates="transactions")
     splits: List["TransactionSplit"] = Relationship(back_populates="transaction", sa_relationship_kwargs={"cascade": "all, delete"})
 
+class TransactionRead(SQLModel):
+    """Flat transaction row for list responses, built straight from columns."""
+    id: uuid.UUID
+    user_id: uuid.UUID
+    merchant: str
+    category: str
+    amount: float
+    date: datetime
+    icon: str
+
+class TransactionSearchResult(TransactionRead):
+    score: float
+
 # Need to import this late or use forward ref for Pydantic if defined in same file? 
 # Better to define a Pydantic model for input that includes splits.
 from .transaction_split import TransactionSplitCreate, TransactionSplit
@@ -0,0 +1,262 @@
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import func, literal, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.gamification import Achievement, UserAchievement, UserStats
+from app.models.goal import Goal
+from app.models.transaction import Transaction
+from app.models.user import User
+
+
+XP_PER_LEVEL = 500
+
+
+@dataclass(frozen=True)
+class AchievementRule:
+    """A threshold rule that unlocks an achievement once a counter reaches it."""
+    achievement: str  # Achievement.name
+    counter: str      # Key in the counters mapping (see COUNTER_COLUMNS)
+    threshold: float
+
+
+# Order matters: a rule's position is its bit in UserStats.unlocked_mask, so
+# only ever append to this tuple.
+RULES: Tuple[AchievementRule, ...] = (
+    AchievementRule("First $100", "total_saved", 100),
+    AchievementRule("Week Warrior", "streak", 7),
+    AchievementRule("Budget Tracker", "transaction_count", 25),
+)
+
+# SQL source of each counter, used by the bulk backfill.
+COUNTER_COLUMNS = {
+    "transaction_count": UserStats.transaction_count,
+    "total_saved": UserStats.total_saved,
+    "streak": User.streak,
+}
+
+
+def _compile(rules: Sequence[AchievementRule]) -> Dict[str, List[Tuple[int, AchievementRule]]]:
+    """Index rules by the counter they watch, paired with their mask bit."""
+    compiled: Dict[str, List[Tuple[int, AchievementRule]]] = {}
+    for position, rule in enumerate(rules):
+        compiled.setdefault(rule.counter, []).append((1 << position, rule))
+    return compiled
+
+
+_RULES_BY_COUNTER = _compile(RULES)
+
+
+def _pending(counters: Mapping[str, float], unlocked_mask: int) -> List[Tuple[int, AchievementRule]]:
+    """Rules watching one of the given counters that are satisfied but not yet unlocked."""
+    return [
+        (bit, rule)
+        for counter, value in counters.items()
+        for bit, rule in _RULES_BY_COUNTER.get(counter, ())
+        if not unlocked_mask & bit and value is not None and value >= rule.threshold
+    ]
+
+
+async def _grant_xp(session: AsyncSession, user_ids: Iterable[uuid.UUID], xp: int) -> None:
+    user_ids = list(user_ids)
+    if not user_ids or not xp:
+        return
+    await session.exec(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(xp=User.xp + xp, level=(User.xp + xp) // XP_PER_LEVEL + 1)
+    )
+
+
+async def _unlock(
+    session: AsyncSession, user_id: uuid.UUID, pending: List[Tuple[int, AchievementRule]]
+) -> None:
+    names = [rule.achievement for _, rule in pending]
+    result = await session.exec(select(Achievement).where(Achievement.name.in_(names)))
+    by_name = {a.name: a for a in result.all()}
+
+    # Rules whose achievement hasn't been seeded yet stay pending.
+    ready = [(bit, by_name[rule.achievement]) for bit, rule in pending if rule.achievement in by_name]
+    if not ready:
+        return
+
+    inserted = await session.exec(
+        insert(UserAchievement)
+        .values([{"user_id": user_id, "achievement_id": a.id} for _, a in ready])
+        .on_conflict_do_nothing()
+        .returning(UserAchievement.achievement_id)
+    )
+    new_ids = set(inserted.scalars().all())
+    xp = sum(a.xp_reward for _, a in ready if a.id in new_ids)
+    await _grant_xp(session, [user_id], xp)
+
+    bits = 0
+    for bit, _ in ready:
+        bits |= bit
+    await session.exec(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(unlocked_mask=UserStats.unlocked_mask.op("|")(bits))
+    )
+    if new_ids:
+        logger.info("User {} unlocked {} achievement(s), +{} XP", user_id, len(new_ids), xp)
+
+
+async def record(session: AsyncSession, user_id: uuid.UUID, **deltas: float) -> None:
+    """
+    Apply counter deltas for a user and unlock any achievements they satisfy.
+
+    Runs inside the caller's transaction; the caller commits.
+
+    :param session: The database session.
+    :param user_id: The user whose counters changed.
+    :param deltas: Counter increments, e.g. ``transaction_count=1``.
+    """
+    statement = (
+        insert(UserStats)
+        .values(user_id=user_id, **{name: max(value, 0) for name, value in deltas.items()})
+        .on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={name: getattr(UserStats, name) + value for name, value in deltas.items()},
+        )
+        .returning(UserStats.unlocked_mask, *(getattr(UserStats, name) for name in deltas))
+    )
+    result = await session.exec(statement)
+    row = result.one()._mapping
+    counters = {name: row[name] for name in deltas}
+    pending = _pending(counters, row["unlocked_mask"])
+    if pending:
+        await _unlock(session, user_id, pending)
+
+
+async def evaluate(session: AsyncSession, user_id: uuid.UUID, counters: Mapping[str, float]) -> None:
+    """
+    Unlock achievements for counters maintained elsewhere (e.g. ``streak``).
+
+    :param session: The database session.
+    :param user_id: The user to evaluate.
+    :param counters: Current counter values keyed by counter name.
+    """
+    if not any(counter in _RULES_BY_COUNTER for counter in counters):
+        return
+    stats = await session.get(UserStats, user_id)
+    if stats is None:
+        stats = UserStats(user_id=user_id)
+        session.add(stats)
+        await session.flush()
+    pending = _pending(counters, stats.unlocked_mask)
+    if pending:
+        await _unlock(session, user_id, pending)
+
+
+async def backfill(session: AsyncSession, user_ids: Optional[Sequence[uuid.UUID]] = None) -> int:
+    """
+    Recompute counters from history and evaluate every rule in bulk.
+
+    Each step is a set-based statement over the whole batch, so the cost is a
+    handful of queries per rule regardless of how many users are in it, and
+    only the batch's own transactions and goals are read.
+
+    :param session: The database session.
+    :param user_ids: Restrict to these users; ``None`` means everyone.
+    :return: Number of achievements newly unlocked.
+    """
+    tx_counts = select(Transaction.user_id, func.count().label("n")).group_by(Transaction.user_id)
+    saved = select(Goal.user_id, func.sum(Goal.saved_amount).label("saved")).group_by(Goal.user_id)
+    users = select(User.id)
+    if user_ids is not None:
+        # Filter inside the aggregates too: Postgres doesn't push an IN list
+        # through the outer joins, so each batch would scan everyone's rows.
+        tx_counts = tx_counts.where(Transaction.user_id.in_(user_ids))
+        saved = saved.where(Goal.user_id.in_(user_ids))
+        users = users.where(User.id.in_(user_ids))
+    tx_counts = tx_counts.subquery()
+    saved = saved.subquery()
+    source = (
+        users.add_columns(
+            func.coalesce(tx_counts.c.n, 0),
+            func.coalesce(saved.c.saved, 0.0),
+        )
+        .outerjoin(tx_counts, tx_counts.c.user_id == User.id)
+        .outerjoin(saved, saved.c.user_id == User.id)
+    )
+
+    upsert = insert(UserStats).from_select(
+        ["user_id", "transaction_count", "total_saved"], source
+    )
+    await session.exec(
+        upsert.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={
+                "transaction_count": upsert.excluded.transaction_count,
+                "total_saved": upsert.excluded.total_saved,
+            },
+        )
+    )
+
+    unlocked = await evaluate_bulk(session, user_ids)
+    logger.info("Achievement backfill unlocked {} achievement(s)", unlocked)
+    return unlocked
+
+
+async def evaluate_bulk(
+    session: AsyncSession,
+    user_ids: Optional[Sequence[uuid.UUID]] = None,
+    counters: Optional[Iterable[str]] = None,
+) -> int:
+    """
+    Evaluate rules set-based over the stored counters of many users.
+
+    :param session: The database session.
+    :param user_ids: Restrict to these users; ``None`` means everyone.
+    :param counters: Only evaluate rules watching these counters.
+    :return: Number of achievements newly unlocked.
+    """
+    rules = [
+        (position, rule) for position, rule in enumerate(RULES)
+        if counters is None or rule.counter in counters
+    ]
+    if not rules:
+        return 0
+
+    result = await session.exec(
+        select(Achievement).where(Achievement.name.in_([rule.achievement for _, rule in rules]))
+    )
+    by_name = {a.name: a for a in result.all()}
+
+    unlocked = 0
+    for position, rule in rules:
+        achievement = by_name.get(rule.achievement)
+        if achievement is None:
+            continue
+        bit = 1 << position
+        eligible = (
+            select(UserStats.user_id, literal(achievement.id))
+            .join(User, User.id == UserStats.user_id)
+            .where(COUNTER_COLUMNS[rule.counter] >= rule.threshold)
+        )
+        if user_ids is not None:
+            eligible = eligible.where(UserStats.user_id.in_(user_ids))
+
+        inserted = await session.exec(
+            insert(UserAchievement)
+            .from_select(["user_id", "achievement_id"], eligible)
+            .on_conflict_do_nothing()
+            .returning(UserAchievement.user_id)
+        )
+        new_users = inserted.scalars().all()
+        await _grant_xp(session, new_users, achievement.xp_reward)
+        unlocked += len(new_users)
+
+        await session.exec(
+            update(UserStats)
+            .where(UserStats.user_id.in_(eligible.with_only_columns(UserStats.user_id).scalar_subquery()))
+            .values(unlocked_mask=UserStats.unlocked_mask.op("|")(bit))
+        )
+
+    return unlocked
@@ -0,0 +1,165 @@
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Literal
+
+from pydantic import BaseModel
+from sqlalchemy import func, literal_column, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.gamification import UserStats
+from app.models.transaction import Transaction
+from app.utils.cache import VersionedCache
+
+
+Interval = Literal["day", "week", "month"]
+
+OTHER_MERCHANTS = "Other"
+
+
+class SpendingSeries(BaseModel):
+    """
+    Spending per time bucket in columnar form: every list is aligned with
+    ``buckets``, and buckets with no spending are zero-filled.
+    """
+    interval: Interval
+    version: int
+    buckets: List[date]
+    total: List[float]
+    count: List[int]
+    by_category: Dict[str, List[float]]
+    by_merchant: Dict[str, List[float]]
+
+
+# Keyed by (user, interval, since, until, merchant_limit)
+_cache: VersionedCache[SpendingSeries] = VersionedCache()
+
+
+def _truncate(day: date, interval: Interval) -> date:
+    if interval == "week":
+        return day - timedelta(days=day.weekday())  # date_trunc('week') starts on Monday
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next(bucket: date, interval: Interval) -> date:
+    if interval == "day":
+        return bucket + timedelta(days=1)
+    if interval == "week":
+        return bucket + timedelta(weeks=1)
+    return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _buckets(since: date, until: date, interval: Interval) -> List[date]:
+    buckets = []
+    bucket = _truncate(since, interval)
+    while bucket < until:
+        buckets.append(bucket)
+        bucket = _next(bucket, interval)
+    return buckets
+
+
+async def data_version(session: AsyncSession, user_id: uuid.UUID) -> int:
+    """Current data version for a user (0 before their first write)."""
+    result = await session.exec(select(UserStats.data_version).where(UserStats.user_id == user_id))
+    return result.first() or 0
+
+
+async def _query(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    interval: Interval,
+    since: date,
+    until: date,
+    merchant_limit: int,
+    version: int,
+) -> SpendingSeries:
+    # The interval is a validated literal; inlining it keeps the select and
+    # GROUP BY expressions identical, which Postgres requires.
+    bucket = func.date_trunc(literal_column(f"'{interval}'"), Transaction.date)
+    spent = func.sum(func.abs(Transaction.amount))
+    statement = (
+        select(
+            bucket,
+            Transaction.category,
+            Transaction.merchant,
+            spent,
+            func.count(),
+            func.grouping(Transaction.category, Transaction.merchant),
+        )
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.category != "Income",
+            Transaction.date >= since,
+            Transaction.date < until,
+        )
+        .group_by(func.grouping_sets(
+            tuple_(bucket),
+            tuple_(bucket, Transaction.category),
+            tuple_(bucket, Transaction.merchant),
+        ))
+    )
+    result = await session.exec(statement)
+
+    buckets = _buckets(since, until, interval)
+    position = {bucket: i for i, bucket in enumerate(buckets)}
+    total = [0.0] * len(buckets)
+    count = [0] * len(buckets)
+    by_category: Dict[str, List[float]] = {}
+    by_merchant: Dict[str, List[float]] = {}
+
+    for bucket_start, category, merchant, amount, n, grouping in result.all():
+        i = position.get(bucket_start.date() if isinstance(bucket_start, datetime) else bucket_start)
+        if i is None:
+            continue
+        amount = round(amount, 2)
+        if grouping == 3:
+            total[i] = amount
+            count[i] = n
+        elif grouping == 1:
+            by_category.setdefault(category, [0.0] * len(buckets))[i] = amount
+        else:
+            by_merchant.setdefault(merchant, [0.0] * len(buckets))[i] = amount
+
+    if len(by_merchant) > merchant_limit:
+        ranked = sorted(by_merchant, key=lambda name: sum(by_merchant[name]), reverse=True)
+        other = [0.0] * len(buckets)
+        for name in ranked[merchant_limit:]:
+            for i, amount in enumerate(by_merchant.pop(name)):
+                other[i] += amount
+        by_merchant[OTHER_MERCHANTS] = [round(amount, 2) for amount in other]
+
+    return SpendingSeries(
+        interval=interval,
+        version=version,
+        buckets=buckets,
+        total=total,
+        count=count,
+        by_category=by_category,
+        by_merchant=by_merchant,
+    )
+
+
+async def spending_series(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    interval: Interval,
+    since: date,
+    until: date,
+    merchant_limit: int = 10,
+) -> SpendingSeries:
+    """
+    Spending over ``[since, until)`` bucketed by ``interval``, in total and
+    per category and merchant, computed in one grouping-sets query.
+
+    Results are cached per worker and keyed by the user's data version, so
+    any write invalidates them; a cache hit costs one primary-key lookup.
+    """
+    version = await data_version(session, user_id)
+    key = (user_id, interval, since, until, merchant_limit)
+    series = _cache.get(key, version)
+    if series is None:
+        series = await _query(session, user_id, interval, since, until, merchant_limit, version)
+        _cache.put(key, version, series)
+    return series
@@ -0,0 +1,194 @@
+import calendar
+import uuid
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import Date, cast, delete, func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.budget import CategorySpend
+from app.models.expense import Expense
+from app.models.transaction import Transaction
+
+
+INCOME_CATEGORY = "Income"
+
+BudgetState = Literal["on_track", "at_risk", "over", "unbudgeted"]
+
+
+class CategoryBudget(BaseModel):
+    category: str
+    planned: float
+    spent: float
+    count: int
+    remaining: float
+    fixed: bool  # Budgeted only by fixed (bill-like) expenses
+    projected: float  # Month-end spending at the current burn rate
+    daily_allowance: float  # What can still be spent per remaining day
+    state: BudgetState
+
+
+class BudgetStatus(BaseModel):
+    month: date
+    day_of_month: int
+    days_in_month: int
+    planned: float
+    spent: float
+    projected: float
+    categories: List[CategoryBudget]
+
+
+def _month_of(when: datetime) -> date:
+    return date(when.year, when.month, 1)
+
+
+async def apply(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    rows: Iterable[Tuple[datetime, str, float]],
+    sign: int = 1,
+) -> None:
+    """
+    Add (or with ``sign=-1`` remove) transactions to the monthly counters.
+
+    Runs inside the caller's transaction; the caller commits.
+
+    :param session: The database session.
+    :param user_id: The owner of the transactions.
+    :param rows: ``(date, category, amount)`` per transaction.
+    :param sign: 1 when transactions are added, -1 when they are removed.
+    """
+    totals: Dict[Tuple[date, str], Tuple[float, int]] = {}
+    for when, category, amount in rows:
+        if category == INCOME_CATEGORY:
+            continue
+        key = (_month_of(when), category)
+        spent, count = totals.get(key, (0.0, 0))
+        totals[key] = (spent + sign * abs(amount), count + sign)
+    if not totals:
+        return
+
+    # One row per key: ON CONFLICT can't touch the same row twice in a statement.
+    statement = insert(CategorySpend).values([
+        {"user_id": user_id, "month": month, "category": category, "spent": spent, "count": count}
+        for (month, category), (spent, count) in totals.items()
+    ])
+    await session.exec(
+        statement.on_conflict_do_update(
+            index_elements=[CategorySpend.user_id, CategorySpend.month, CategorySpend.category],
+            set_={
+                "spent": CategorySpend.spent + statement.excluded.spent,
+                "count": CategorySpend.count + statement.excluded.count,
+            },
+        )
+    )
+
+
+async def rebuild(session: AsyncSession, user_ids: Sequence[uuid.UUID]) -> None:
+    """
+    Recompute the monthly counters of these users from their transactions,
+    for rows written outside the CRUD layer (e.g. CSV import).
+    """
+    await session.exec(delete(CategorySpend).where(CategorySpend.user_id.in_(user_ids)))
+    month = func.date_trunc(literal_column("'month'"), Transaction.date)
+    source = (
+        select(
+            Transaction.user_id,
+            cast(month, Date),
+            Transaction.category,
+            func.sum(func.abs(Transaction.amount)),
+            func.count(),
+        )
+        .where(Transaction.user_id.in_(user_ids), Transaction.category != INCOME_CATEGORY)
+        .group_by(Transaction.user_id, month, Transaction.category)
+    )
+    await session.exec(
+        insert(CategorySpend).from_select(["user_id", "month", "category", "spent", "count"], source)
+    )
+
+
+def _state(planned: float, spent: float, projected: float) -> BudgetState:
+    if planned <= 0:
+        return "unbudgeted"
+    if spent > planned:
+        return "over"
+    if projected > planned:
+        return "at_risk"
+    return "on_track"
+
+
+async def status(session: AsyncSession, user_id: uuid.UUID, today: Optional[date] = None) -> BudgetStatus:
+    """
+    Month-to-date spending against planned budgets, per category, with a
+    linear burn-rate projection to month end for variable categories.
+
+    One query over the user's budgets and this month's counters, so the cost
+    depends on the number of categories, not on transaction history.
+    """
+    today = today or datetime.utcnow().date()
+    month = today.replace(day=1)
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    days_left = days_in_month - today.day + 1
+
+    planned = (
+        select(
+            Expense.category,
+            func.sum(Expense.amount).label("planned"),
+            func.bool_and(Expense.is_fixed).label("fixed"),
+        )
+        .where(Expense.user_id == user_id)
+        .group_by(Expense.category)
+        .subquery()
+    )
+    actual = (
+        select(CategorySpend.category, CategorySpend.spent, CategorySpend.count)
+        .where(CategorySpend.user_id == user_id, CategorySpend.month == month)
+        .subquery()
+    )
+    statement = (
+        select(
+            func.coalesce(planned.c.category, actual.c.category),
+            func.coalesce(planned.c.planned, 0.0),
+            func.coalesce(actual.c.spent, 0.0),
+            func.coalesce(actual.c.count, 0),
+            func.coalesce(planned.c.fixed, False),
+        )
+        .select_from(planned.join(actual, planned.c.category == actual.c.category, full=True))
+        .order_by(func.coalesce(planned.c.category, actual.c.category))
+    )
+    result = await session.exec(statement)
+
+    categories = []
+    for category, planned_amount, spent, count, fixed in result.all():
+        if count == 0 and planned_amount == 0:
+            continue
+        if fixed:
+            # Bills land once a month; extrapolating them would overshoot.
+            projected = max(spent, planned_amount)
+        else:
+            projected = spent / today.day * days_in_month
+        remaining = planned_amount - spent
+        categories.append(CategoryBudget(
+            category=category,
+            planned=round(planned_amount, 2),
+            spent=round(spent, 2),
+            count=count,
+            fixed=fixed,
+            remaining=round(remaining, 2),
+            projected=round(projected, 2),
+            daily_allowance=round(max(remaining, 0.0) / days_left, 2),
+            state=_state(planned_amount, spent, projected),
+        ))
+
+    return BudgetStatus(
+        month=month,
+        day_of_month=today.day,
+        days_in_month=days_in_month,
+        planned=round(sum(c.planned for c in categories), 2),
+        spent=round(sum(c.spent for c in categories), 2),
+        projected=round(sum(c.projected for c in categories), 2),
+        categories=categories,
+    )
@@ -0,0 +1,94 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import jwt
+from fastapi_users.jwt import decode_jwt, generate_jwt
+
+from app.core.users import SECRET
+from app.services.cart_analysis import CartAnalysisResponse, CartItem
+
+
+CONFIRMATION_AUDIENCE = "penny:cart-confirm"
+CONFIRMATION_TOKEN_LIFETIME_SECONDS = 600
+
+
+class CartCheckoutResponse(CartAnalysisResponse):
+    """Cart analysis plus a token that confirms it without re-uploading."""
+    confirmation_token: str
+    expires_at: datetime
+
+
+class InvalidConfirmationToken(Exception):
+    """Raised when a confirmation token is expired, tampered with or not the caller's."""
+
+
+@dataclass
+class ConfirmedCart:
+    """Cart contents recovered from a verified confirmation token."""
+    token_id: uuid.UUID
+    merchant: str
+    date: str
+    items: List[CartItem]
+
+    def transaction_ids(self) -> List[uuid.UUID]:
+        """Stable ids per item so confirming the same token twice inserts nothing new."""
+        return [uuid.uuid5(self.token_id, str(index)) for index in range(len(self.items))]
+
+
+def issue_confirmation_token(user_id: uuid.UUID, analysis: CartAnalysisResponse) -> CartCheckoutResponse:
+    """
+    Sign the analyzed cart into a short-lived token bound to the user.
+
+    The token carries the items themselves, so confirmation is stateless and
+    works on any worker.
+    """
+    token = generate_jwt(
+        {
+            "sub": str(user_id),
+            "aud": CONFIRMATION_AUDIENCE,
+            "jti": uuid.uuid4().hex,
+            "merchant": analysis.merchant,
+            "date": analysis.date,
+            "items": [
+                [item.merchant, item.category, item.amount, item.item_name]
+                for item in analysis.raw_items
+            ],
+        },
+        SECRET,
+        lifetime_seconds=CONFIRMATION_TOKEN_LIFETIME_SECONDS,
+    )
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=CONFIRMATION_TOKEN_LIFETIME_SECONDS)
+    return CartCheckoutResponse(
+        **analysis.model_dump(),
+        confirmation_token=token,
+        expires_at=expires_at,
+    )
+
+
+def read_confirmation_token(token: str, user_id: uuid.UUID) -> ConfirmedCart:
+    """
+    Verify a confirmation token and recover the cart it was issued for.
+
+    :raises InvalidConfirmationToken: If the token is invalid, expired or
+        belongs to another user.
+    """
+    try:
+        payload = decode_jwt(token, SECRET, [CONFIRMATION_AUDIENCE])
+    except jwt.PyJWTError as e:
+        raise InvalidConfirmationToken(str(e)) from e
+
+    if payload.get("sub") != str(user_id):
+        raise InvalidConfirmationToken("Token was issued to a different user")
+
+    return ConfirmedCart(
+        token_id=uuid.UUID(hex=payload["jti"]),
+        merchant=payload["merchant"],
+        date=payload["date"],
+        items=[
+            CartItem(merchant=merchant, category=category, amount=amount, item_name=item_name)
+            for merchant, category, amount, item_name in payload["items"]
+        ],
+    )
+
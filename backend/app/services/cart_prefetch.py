@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.services.cart_analysis import CartAnalysisResponse, analyze_cart_screenshot
+
+
+MAX_PENDING_PER_USER = 2
+RESULT_TTL_SECONDS = 300
+
+
+class PrefetchLimitExceeded(Exception):
+    """Raised when a user already has the maximum number of speculative analyses running."""
+
+
+@dataclass
+class _Prefetch:
+    task: "asyncio.Task[CartAnalysisResponse]"
+    started_at: float = field(default_factory=time.monotonic)
+
+
+def _failed(task: "asyncio.Task") -> bool:
+    return task.done() and (task.cancelled() or task.exception() is not None)
+
+
+def cart_key_for(image_bytes: bytes) -> str:
+    """Cart key: a hash of the screenshot, so it always names the image analyzed."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+class CartPrefetchRegistry:
+    """
+    Speculative cart analyses keyed by (user, cart).
+
+    Lives in the worker process: a later analyze call that lands on another
+    worker simply misses and analyzes from scratch.
+    """
+
+    def __init__(self, max_pending_per_user: int = MAX_PENDING_PER_USER, ttl_seconds: float = RESULT_TTL_SECONDS):
+        self.max_pending_per_user = max_pending_per_user
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple[uuid.UUID, str], _Prefetch] = {}
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry.task.done() and now - entry.started_at > self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    def _pending_for(self, user_id: uuid.UUID) -> int:
+        return sum(
+            1 for (owner, _), entry in self._entries.items()
+            if owner == user_id and not entry.task.done()
+        )
+
+    def start(
+        self,
+        user_id: uuid.UUID,
+        cart_key: str,
+        image_bytes: bytes,
+        hourly_rate: Optional[float] = None,
+    ) -> "asyncio.Task[CartAnalysisResponse]":
+        """
+        Start analyzing a cart in the background, or return the analysis
+        already running or finished for the same user and cart.
+
+        :raises PrefetchLimitExceeded: If the user is at their concurrency cap.
+        """
+        self._prune()
+        key = (user_id, cart_key)
+        existing = self._entries.get(key)
+        if existing is not None and not _failed(existing.task):
+            return existing.task
+
+        if self._pending_for(user_id) >= self.max_pending_per_user:
+            raise PrefetchLimitExceeded(
+                f"At most {self.max_pending_per_user} cart analyses may run at once"
+            )
+
+        task = asyncio.create_task(analyze_cart_screenshot(image_bytes, hourly_rate=hourly_rate))
+        task.add_done_callback(self._log_failure)
+        self._entries[key] = _Prefetch(task=task)
+        logger.debug("Started speculative cart analysis {} for user {}", cart_key[:12], user_id)
+        return task
+
+    def get(self, user_id: uuid.UUID, cart_key: str) -> Optional["asyncio.Task[CartAnalysisResponse]"]:
+        """Return the pending or completed analysis for this cart, if there is a usable one."""
+        self._prune()
+        entry = self._entries.get((user_id, cart_key))
+        if entry is None:
+            return None
+        if _failed(entry.task):
+            del self._entries[(user_id, cart_key)]
+            return None
+        return entry.task
+
+    async def result(self, user_id: uuid.UUID, cart_key: str) -> Optional[CartAnalysisResponse]:
+        """
+        Attach to a speculative analysis and wait for it.
+
+        Returns ``None`` if there is none or it failed, so the caller can fall
+        back to analyzing directly.
+        """
+        task = self.get(user_id, cart_key)
+        if task is None:
+            return None
+        try:
+            # Shield so a client disconnect doesn't cancel the shared task.
+            return await asyncio.shield(task)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _log_failure(task: "asyncio.Task[CartAnalysisResponse]") -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Speculative cart analysis failed: {}", task.exception())
+
+
+cart_prefetch = CartPrefetchRegistry()
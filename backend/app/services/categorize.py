@@ -0,0 +1,289 @@
+import asyncio
+import uuid
+from typing import Dict, List, Literal, Sequence, Set, Tuple
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel, Field
+from sqlalchemy import Text, cast, func, literal, true
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import Config
+from app.core.db import engine
+from app.models.embedding import TransactionEmbedding
+from app.models.transaction import Transaction
+from app.services import achievements, budget
+from app.services.embeddings import embeddings
+from app.services.llm import chat_model
+from app.services.merchants import DEFAULT_CATEGORY, icon_for, normalize_merchant
+from app.utils.vector import format_vector
+
+
+NEIGHBOURS = 5
+STORE_BATCH_SIZE = 1000  # Rows per upsert, well under asyncpg's parameter limit
+LLM_BATCH_SIZE = 50  # Merchants per categorization prompt
+CATEGORIES = (
+    "Food & Drink", "Shopping", "Groceries", "Transport", "Entertainment",
+    "Health", "Utilities", "Housing", "Subscriptions", "Income", "Other",
+)
+# Categories that say nothing about the transaction; they're predicted, and
+# never used as labels for neighbours.
+UNLABELLED = {"", "other", "uncategorized", "unknown"}
+
+# Background relabels, referenced until they finish so they aren't collected
+_relabelling: Set["asyncio.Task[None]"] = set()
+
+CategorySource = Literal["neighbours", "merchant", "llm", "default"]
+
+
+class CategorySuggestion(BaseModel):
+    category: str
+    similarity: float  # Cosine similarity of the deciding neighbours, 0 if none
+    source: CategorySource
+
+
+class _LLMCategories(BaseModel):
+    categories: List[str] = Field(description="One category per merchant, in the same order")
+
+
+def is_labelled(category: str) -> bool:
+    return (category or "").strip().casefold() not in UNLABELLED
+
+
+def embedding_text(merchant: str) -> str:
+    """
+    Text embedded for a transaction: the normalized merchant plus any
+    description after it (cart rows are stored as ``"Store: item"``).
+    """
+    store, _, description = (merchant or "").partition(": ")
+    return f"{normalize_merchant(store).name} {description}".strip()
+
+
+async def _neighbours(
+    session: AsyncSession, user_id: uuid.UUID, vectors: np.ndarray
+) -> List[List[Tuple[str, float]]]:
+    """
+    The user's nearest embedded transactions to each vector, as (category,
+    similarity) pairs. One query for the whole batch: the vectors are
+    unnested and each runs an exact kNN over the user's rows as a LATERAL
+    subquery.
+    """
+    if not len(vectors):
+        return []
+    queries = (
+        func.unnest(cast(literal([format_vector(v) for v in vectors], ARRAY(Text)), ARRAY(Text)))
+        .table_valued("vector", with_ordinality="ord")
+        .render_derived()
+    )
+    distance = TransactionEmbedding.embedding.cosine_distance(
+        cast(queries.c.vector, TransactionEmbedding.embedding.type)
+    )
+    nearest = (
+        select(Transaction.category, (1 - distance).label("similarity"))
+        .join(Transaction, Transaction.id == TransactionEmbedding.transaction_id)
+        .where(TransactionEmbedding.user_id == user_id)
+        .order_by(distance)
+        .limit(NEIGHBOURS)
+        .lateral("nearest")
+    )
+    statement = (
+        select(queries.c.ord, nearest.c.category, nearest.c.similarity)
+        .select_from(queries)
+        .join(nearest, true())
+    )
+    neighbours: List[List[Tuple[str, float]]] = [[] for _ in range(len(vectors))]
+    for ordinal, category, similarity in (await session.exec(statement)).all():
+        neighbours[ordinal - 1].append((category, similarity))
+    return neighbours
+
+
+def _vote(neighbours) -> CategorySuggestion | None:
+    """Similarity-weighted vote among close, labelled neighbours."""
+    weights: Dict[str, float] = {}
+    best: Dict[str, float] = {}
+    for category, similarity in neighbours:
+        if similarity < Config.CATEGORY_SIMILARITY_THRESHOLD or not is_labelled(category):
+            continue
+        weights[category] = weights.get(category, 0.0) + similarity
+        best[category] = max(best.get(category, 0.0), similarity)
+    if not weights:
+        return None
+    category = max(weights, key=weights.get)
+    return CategorySuggestion(category=category, similarity=round(best[category], 4), source="neighbours")
+
+
+async def _ask_llm(merchants: Sequence[str]) -> List[str] | None:
+    if not Config.OPENROUTER_API_KEY:
+        return None
+    llm = chat_model(temperature=0)
+    prompt = (
+        f"Categorize each merchant as one of: {', '.join(CATEGORIES)}.\n"
+        + "\n".join(f"{i + 1}. {merchant}" for i, merchant in enumerate(merchants))
+    )
+    try:
+        result: _LLMCategories = await llm.with_structured_output(_LLMCategories).ainvoke(prompt)
+    except Exception as e:
+        logger.warning(f"LLM categorization failed: {e}")
+        return None
+    if len(result.categories) != len(merchants):
+        return None
+    return [c if c in CATEGORIES else DEFAULT_CATEGORY for c in result.categories]
+
+
+async def suggest(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    merchants: Sequence[str],
+    vectors: np.ndarray | None = None,
+    ask_llm: bool = True,
+) -> List[CategorySuggestion]:
+    """
+    Category for each merchant string, from the closest of:
+
+    1. the user's own labelled transactions nearest in embedding space,
+    2. the known-merchant table,
+    3. one batched LLM call for whatever is left, unless ``ask_llm`` is
+       False (writes commit first and relabel in the background),
+    4. ``DEFAULT_CATEGORY``.
+    """
+    texts = [embedding_text(m) for m in merchants]
+    if vectors is None:
+        vectors = await embeddings.embed(texts)
+
+    first: Dict[str, int] = {}  # Distinct text -> its first index
+    for i, text in enumerate(texts):
+        first.setdefault(text, i)
+    neighbours = await _neighbours(session, user_id, vectors[list(first.values())])
+
+    by_text: Dict[str, CategorySuggestion] = {}
+    pending: Dict[str, int] = {}  # Unresolved text -> its first index
+    for (text, i), near in zip(first.items(), neighbours):
+        suggestion = _vote(near)
+        if suggestion is None:
+            known = normalize_merchant(merchants[i].partition(": ")[0]).category
+            if known:
+                suggestion = CategorySuggestion(category=known, similarity=0.0, source="merchant")
+        if suggestion is None:
+            pending[text] = i
+        else:
+            by_text[text] = suggestion
+
+    if pending:
+        answers = await _ask_llm([merchants[i] for i in pending.values()]) if ask_llm else None
+        for n, text in enumerate(pending):
+            if answers is not None:
+                by_text[text] = CategorySuggestion(category=answers[n], similarity=0.0, source="llm")
+            else:
+                by_text[text] = CategorySuggestion(category=DEFAULT_CATEGORY, similarity=0.0, source="default")
+
+    return [by_text[text] for text in texts]
+
+
+async def index(session: AsyncSession, user_id: uuid.UUID, transactions: Sequence[Transaction]) -> np.ndarray:
+    """
+    Embed transactions and upsert their embeddings. The transactions must
+    already be flushed; the caller commits.
+
+    :return: The embeddings, aligned with ``transactions``.
+    """
+    vectors = await embeddings.embed([embedding_text(t.merchant) for t in transactions])
+    for start in range(0, len(transactions), STORE_BATCH_SIZE):
+        statement = insert(TransactionEmbedding).values([
+            {"transaction_id": t.id, "user_id": user_id, "embedding": vector}
+            for t, vector in zip(
+                transactions[start:start + STORE_BATCH_SIZE], vectors[start:start + STORE_BATCH_SIZE]
+            )
+        ])
+        await session.exec(statement.on_conflict_do_update(
+            index_elements=[TransactionEmbedding.transaction_id],
+            set_={"embedding": statement.excluded.embedding},
+        ))
+    return vectors
+
+
+async def label(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    transactions: Sequence[Transaction],
+    vectors: np.ndarray,
+) -> List[Transaction]:
+    """
+    Fill in the category (and icon) of transactions that arrived without a
+    meaningful one, from neighbours and known merchants only, so the
+    caller's transaction never waits on the LLM. Index first, so rows of the
+    same batch can label each other.
+
+    :return: The transactions left at ``DEFAULT_CATEGORY``; hand them to
+        ``schedule_relabel`` once committed.
+    """
+    unlabelled = [i for i, t in enumerate(transactions) if not is_labelled(t.category)]
+    if not unlabelled:
+        return []
+    suggestions = await suggest(
+        session, user_id, [transactions[i].merchant for i in unlabelled], vectors[unlabelled], ask_llm=False
+    )
+    for i, suggestion in zip(unlabelled, suggestions):
+        transactions[i].category = suggestion.category
+        transactions[i].icon = icon_for(suggestion.category, transactions[i].merchant)
+    return [transactions[i] for i, suggestion in zip(unlabelled, suggestions) if suggestion.source == "default"]
+
+
+async def _relabel_batch(user_id: uuid.UUID, transactions: Sequence[Tuple[uuid.UUID, str]]) -> None:
+    merchants = list(dict.fromkeys(merchant for _, merchant in transactions))
+    answers = await _ask_llm(merchants)
+    if answers is None:
+        return
+    categories = {m: c for m, c in zip(merchants, answers) if c != DEFAULT_CATEGORY}
+    ids = [id for id, merchant in transactions if merchant in categories]
+    if not ids:
+        return
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        statement = (
+            select(Transaction)
+            .where(Transaction.id.in_(ids), Transaction.category == DEFAULT_CATEGORY)
+            .with_for_update()
+        )
+        rows = (await session.exec(statement)).all()
+        if not rows:
+            return
+        await budget.apply(session, user_id, [(t.date, t.category, t.amount) for t in rows], sign=-1)
+        for t in rows:
+            t.category = categories[t.merchant]
+            t.icon = icon_for(t.category, t.merchant)
+        await budget.apply(session, user_id, [(t.date, t.category, t.amount) for t in rows])
+        await achievements.record(session, user_id, data_version=1)
+        await session.commit()
+
+
+async def relabel(user_id: uuid.UUID, transactions: Sequence[Tuple[uuid.UUID, str]]) -> None:
+    """
+    Ask the LLM for the categories ``label`` couldn't find, ``LLM_BATCH_SIZE``
+    merchants per prompt, and store each batch's answers in a short
+    transaction of its own. Rows that were recategorized in the meantime are
+    left alone.
+
+    :param transactions: (id, merchant) of committed transactions.
+    """
+    merchants = list(dict.fromkeys(merchant for _, merchant in transactions))
+    for start in range(0, len(merchants), LLM_BATCH_SIZE):
+        batch = set(merchants[start:start + LLM_BATCH_SIZE])
+        try:
+            await _relabel_batch(user_id, [(id, m) for id, m in transactions if m in batch])
+        except Exception as e:
+            logger.warning(f"Relabelling transactions of user {user_id} failed: {e}")
+
+
+def schedule_relabel(user_id: uuid.UUID, transactions: Sequence[Transaction]) -> None:
+    """
+    Run ``relabel`` in the background once the caller has committed, so
+    neither the request nor a connection waits on the LLM. Best effort: rows
+    keep ``DEFAULT_CATEGORY`` if the worker stops first.
+    """
+    if not transactions:
+        return
+    task = asyncio.create_task(relabel(user_id, [(t.id, t.merchant) for t in transactions]))
+    _relabelling.add(task)
+    task.add_done_callback(_relabelling.discard)
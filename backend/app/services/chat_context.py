@@ -0,0 +1,199 @@
+import uuid
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.chat_fact import ChatFact
+from app.models.expense import Expense
+from app.models.goal import Goal
+from app.models.transaction import Transaction
+from app.services.analytics import data_version
+from app.services.embeddings import embeddings
+
+
+TOP_K = 12
+HISTORY_MONTHS = 12
+MERCHANT_FACTS = 100
+RECENT_TRANSACTIONS = 50
+PINNED_MONTHS = 2  # This month and last month are always in context
+TOP_CATEGORIES = 3
+
+# (key, kind, text, pinned)
+Fact = Tuple[str, str, str, bool]
+
+
+def _month_start(months_ago: int, today: date) -> date:
+    month = today.month - 1 - months_ago
+    return date(today.year + month // 12, month % 12 + 1, 1)
+
+
+def _day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+async def _month_facts(session: AsyncSession, user_id: uuid.UUID, today: date) -> List[Fact]:
+    since = _month_start(HISTORY_MONTHS - 1, today)
+    month = func.date_trunc(literal_column("'month'"), Transaction.date)
+    result = await session.exec(
+        select(
+            month,
+            Transaction.category,
+            func.sum(func.abs(Transaction.amount)),
+            func.count(),
+        )
+        .where(Transaction.user_id == user_id, Transaction.date >= since)
+        .group_by(month, Transaction.category)
+    )
+
+    months: Dict[date, Dict[str, Tuple[float, int]]] = {}
+    for bucket, category, amount, count in result.all():
+        months.setdefault(_day(bucket), {})[category] = (amount, count)
+
+    pinned = {_month_start(i, today) for i in range(PINNED_MONTHS)}
+    facts = []
+    for bucket, categories in sorted(months.items()):
+        income = categories.pop("Income", (0.0, 0))[0]
+        spent = sum(amount for amount, _ in categories.values())
+        count = sum(n for _, n in categories.values())
+        top = sorted(categories.items(), key=lambda item: item[1][0], reverse=True)[:TOP_CATEGORIES]
+        label = f"{bucket:%B %Y}"
+        if (bucket.year, bucket.month) == (today.year, today.month):
+            label += " (month to date)"
+        text = f"{label}: spent ${spent:,.2f} over {count} transactions, income ${income:,.2f}"
+        if top:
+            text += "; top categories " + ", ".join(f"{c} ${a:,.2f}" for c, (a, _) in top)
+        facts.append((f"month:{bucket:%Y-%m}", "month", text, bucket in pinned))
+    return facts
+
+
+async def _merchant_facts(session: AsyncSession, user_id: uuid.UUID) -> List[Fact]:
+    spent = func.sum(func.abs(Transaction.amount))
+    result = await session.exec(
+        select(
+            Transaction.merchant,
+            func.max(Transaction.category),
+            spent,
+            func.count(),
+            func.max(Transaction.date),
+        )
+        .where(Transaction.user_id == user_id)
+        .group_by(Transaction.merchant)
+        .order_by(spent.desc())
+        .limit(MERCHANT_FACTS)
+    )
+    return [
+        (
+            f"merchant:{merchant}",
+            "merchant",
+            f"{merchant} ({category}): {count} transactions totalling ${amount:,.2f}, "
+            f"averaging ${amount / count:,.2f}, last on {_day(last):%Y-%m-%d}",
+            False,
+        )
+        for merchant, category, amount, count, last in result.all()
+    ]
+
+
+async def _transaction_facts(session: AsyncSession, user_id: uuid.UUID) -> List[Fact]:
+    result = await session.exec(
+        select(Transaction.id, Transaction.date, Transaction.merchant, Transaction.amount, Transaction.category)
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.date.desc())
+        .limit(RECENT_TRANSACTIONS)
+    )
+    return [
+        (
+            f"transaction:{id}",
+            "transaction",
+            f"Transaction ID {id}: {_day(when):%Y-%m-%d} {merchant} ${amount:,.2f} ({category})",
+            False,
+        )
+        for id, when, merchant, amount, category in result.all()
+    ]
+
+
+async def _goal_and_expense_facts(session: AsyncSession, user_id: uuid.UUID) -> List[Fact]:
+    facts = []
+    result = await session.exec(select(Goal).where(Goal.user_id == user_id))
+    for goal in result.all():
+        progress = goal.saved_amount / goal.target_amount * 100 if goal.target_amount else 0.0
+        facts.append((
+            f"goal:{goal.id}",
+            "goal",
+            f"Goal '{goal.name}' (ID {goal.id}): saved ${goal.saved_amount:,.2f} of "
+            f"${goal.target_amount:,.2f} ({progress:.0f}%). {goal.description}",
+            False,
+        ))
+    result = await session.exec(select(Expense).where(Expense.user_id == user_id))
+    for expense in result.all():
+        facts.append((
+            f"expense:{expense.id}",
+            "expense",
+            f"Recurring {'fixed' if expense.is_fixed else 'variable'} expense '{expense.name}' "
+            f"(ID {expense.id}, {expense.category}): ${expense.amount:,.2f} per month",
+            False,
+        ))
+    return facts
+
+
+async def refresh(session: AsyncSession, user_id: uuid.UUID, version: int) -> None:
+    """Rebuild a user's facts at ``version`` for the current month and commit."""
+    today = datetime.utcnow().date()
+    month = _month_start(0, today)
+    facts = (
+        await _month_facts(session, user_id, today)
+        + await _merchant_facts(session, user_id)
+        + await _transaction_facts(session, user_id)
+        + await _goal_and_expense_facts(session, user_id)
+    )
+    if facts:
+        vectors = await embeddings.embed([text for _, _, text, _ in facts])
+        statement = insert(ChatFact).values([
+            {
+                "user_id": user_id, "key": key, "kind": kind, "text": text,
+                "pinned": pinned, "version": version, "month": month, "embedding": vector,
+            }
+            for (key, kind, text, pinned), vector in zip(facts, vectors)
+        ])
+        # Upsert, so two workers refreshing the same user can't collide.
+        await session.exec(statement.on_conflict_do_update(
+            index_elements=[ChatFact.user_id, ChatFact.key],
+            set_={
+                column: statement.excluded[column]
+                for column in ("kind", "text", "pinned", "version", "month", "embedding")
+            },
+        ))
+    await session.exec(delete(ChatFact).where(
+        ChatFact.user_id == user_id,
+        or_(ChatFact.version < version, ChatFact.month < month),
+    ))
+    await session.commit()
+
+
+async def retrieve(session: AsyncSession, user_id: uuid.UUID, question: str, k: int = TOP_K) -> List[str]:
+    """
+    Facts most relevant to ``question``, pinned ones first, for the chat
+    prompt. Rebuilds the user's facts first if they've changed since, or
+    were built last month: which months are pinned and "to date" moves on
+    with the calendar, not only with the data.
+    """
+    version = await data_version(session, user_id)
+    month = _month_start(0, datetime.utcnow().date())
+    result = await session.exec(
+        select(ChatFact.version, ChatFact.month).where(ChatFact.user_id == user_id).limit(1)
+    )
+    if tuple(result.first() or ()) != (version, month):
+        await refresh(session, user_id, version)
+
+    vector = (await embeddings.embed([question]))[0]
+    distance = ChatFact.embedding.cosine_distance(vector)
+    result = await session.exec(
+        select(ChatFact.text)
+        .where(ChatFact.user_id == user_id)
+        .order_by(ChatFact.pinned.desc(), distance)
+        .limit(k)
+    )
+    return result.all()
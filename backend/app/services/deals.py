@@ -0,0 +1,195 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from loguru import logger
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import Config
+from app.core.db import engine
+from app.models.deals import PriceCache
+
+
+SEARCH_LIMIT = 5
+MAX_DEALS = 3
+L1_MAX_ENTRIES = 2048
+UPSTREAM_TIMEOUT_SECONDS = 10.0
+# Expired PriceCache rows deleted alongside each write; bounded so a cache
+# miss never turns into a long sweep
+PURGE_BATCH = 100
+
+_PUNCTUATION = re.compile(r"[(),]")
+_FILLER_WORDS = re.compile(r"US Version|eSIM|Unlocked|Renewed", re.IGNORECASE)
+
+
+class DealsUpstreamError(Exception):
+    """Raised when the prices API fails or is unreachable."""
+
+
+def normalize_query(query: str) -> str:
+    """
+    Clean a product title the way the extension does before searching, then
+    case-fold it so equivalent titles share a cache entry.
+    """
+    cleaned = _FILLER_WORDS.sub("", _PUNCTUATION.sub("", query))
+    return " ".join(cleaned.split()[:6]).casefold()
+
+
+class DealsService:
+    """
+    Looks up cheaper offers for a product through the prices API.
+
+    Search and offer responses are cached with a TTL in two tiers: a small
+    per-worker dict in front of the shared ``PriceCache`` table, whose expired
+    rows are purged a batch at a time on each write. Concurrent
+    lookups for the same key in a worker share a single upstream call.
+    """
+
+    def __init__(
+        self,
+        base_url: str = Config.PRICES_API_URL,
+        api_key: str = Config.PRICES_API_KEY,
+        ttl_seconds: int = Config.DEALS_CACHE_TTL_SECONDS,
+        l1_max_entries: int = L1_MAX_ENTRIES,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.ttl_seconds = ttl_seconds
+        self.l1_max_entries = l1_max_entries
+        self._l1: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"x-api-key": self.api_key, "Accept": "application/json"},
+                timeout=UPSTREAM_TIMEOUT_SECONDS,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _l1_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._l1.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.monotonic():
+            del self._l1[key]
+            return None
+        self._l1.move_to_end(key)
+        return payload
+
+    def _l1_put(self, key: str, payload: Dict[str, Any], ttl_seconds: float) -> None:
+        self._l1[key] = (time.monotonic() + ttl_seconds, payload)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_max_entries:
+            self._l1.popitem(last=False)
+
+    async def _cached(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        payload = self._l1_get(key)
+        if payload is not None:
+            return payload
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller disconnecting doesn't cancel the lookup for the rest.
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        now = datetime.utcnow()  # expires_at is a naive UTC timestamp, like the rest of the schema
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            row = await session.get(PriceCache, key)
+        if row is not None and row.expires_at > now:
+            self._l1_put(key, row.payload, (row.expires_at - now).total_seconds())
+            return row.payload
+
+        # Don't hold a pooled connection while waiting on the prices API.
+        logger.debug("Prices API cache miss for {}", key)
+        payload = await fetch()
+        statement = insert(PriceCache).values(
+            key=key, payload=payload, expires_at=now + timedelta(seconds=self.ttl_seconds)
+        )
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await session.exec(
+                statement.on_conflict_do_update(
+                    index_elements=[PriceCache.key],
+                    set_={"payload": statement.excluded.payload, "expires_at": statement.excluded.expires_at},
+                )
+            )
+            # Nothing else deletes from the table. Skip rows another worker is purging.
+            expired = (
+                select(PriceCache.key)
+                .where(PriceCache.expires_at < now)
+                .limit(PURGE_BATCH)
+                .with_for_update(skip_locked=True)
+            )
+            await session.exec(delete(PriceCache).where(PriceCache.key.in_(expired)))
+            await session.commit()
+
+        self._l1_put(key, payload, self.ttl_seconds)
+        return payload
+
+    async def _get(self, path: str, **params: Any) -> Dict[str, Any]:
+        try:
+            response = await self._http().get(path, params=params or None)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise DealsUpstreamError(f"Prices API request to {path} failed: {e}") from e
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        """Search products for an already normalized query."""
+        payload = await self._cached(
+            f"search:{query}",
+            lambda: self._get("/products/search", q=query, limit=SEARCH_LIMIT),
+        )
+        return (payload.get("data") or {}).get("results") or []
+
+    async def offers(self, product_id: str) -> List[Dict[str, Any]]:
+        """All known offers for a product."""
+        payload = await self._cached(
+            f"offers:{product_id}",
+            lambda: self._get(f"/products/{product_id}/offers"),
+        )
+        return (payload.get("data") or {}).get("offers") or []
+
+    async def find_deals(self, query: str, current_price: float) -> List[Dict[str, Any]]:
+        """
+        Find the cheapest offers below ``current_price`` for the best match of ``query``.
+
+        :raises DealsUpstreamError: If the prices API fails on a cache miss.
+        """
+        normalized = normalize_query(query)
+        if not normalized:
+            return []
+
+        results = await self.search(normalized)
+        if not results:
+            return []
+
+        offers = await self.offers(str(results[0]["id"]))
+        cheaper = [
+            offer for offer in offers
+            if 0 < (offer.get("price") or 0) < current_price
+        ]
+        cheaper.sort(key=lambda offer: offer["price"])
+        return cheaper[:MAX_DEALS]
+
+
+deals_service = DealsService()
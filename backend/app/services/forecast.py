@@ -0,0 +1,253 @@
+import asyncio
+import calendar
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import and_, func, literal_column, not_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.expense import Expense
+from app.models.goal import Goal
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.analytics import data_version
+from app.utils.cache import VersionedCache
+
+
+DEFAULT_PATHS = 5000
+DEFAULT_HORIZON_MONTHS = 120
+MAX_PATHS = 5000
+MAX_HORIZON_MONTHS = 360
+# Goals forecast per request, nearest to done first; savings are split across them
+MAX_GOALS = 20
+HISTORY_MONTHS = 12
+# Below this many months of history, variable spending is drawn from a normal
+# fitted to what there is instead of resampled.
+MIN_BOOTSTRAP_MONTHS = 3
+MIN_RELATIVE_STD = 0.15
+
+
+class GoalForecast(BaseModel):
+    """Projected completion of one goal. Dates are ``None`` past the horizon."""
+    goal_id: uuid.UUID
+    name: str
+    remaining: float
+    probability: float  # Share of paths that reach the target within the horizon
+    p10: Optional[date]
+    p50: Optional[date]
+    p90: Optional[date]
+
+
+class CashFlowForecast(BaseModel):
+    version: int
+    paths: int
+    horizon_months: int
+    monthly_income: float
+    recurring_expenses: float
+    variable_spending_mean: float
+    variable_spending_std: float
+    net_monthly_mean: float
+    goals: List[GoalForecast]
+
+
+@dataclass
+class _History:
+    income: np.ndarray    # Per past month, aligned with variable
+    variable: np.ndarray  # Spending not covered by recurring expenses
+
+
+# Keyed by (user, monthly income, paths, horizon, today): dates count from today
+_cache: VersionedCache[CashFlowForecast] = VersionedCache()
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+async def _load_history(session: AsyncSession, user_id: uuid.UUID, today: date) -> _History:
+    """
+    Monthly income and variable spending over the last full months, as arrays.
+
+    Transactions at merchants the user tracks as fixed expenses are left out
+    of variable spending; they're covered by the recurring amount instead.
+    """
+    this_month = today.replace(day=1)
+    since = _add_months(this_month, -HISTORY_MONTHS)
+    fixed_names = select(Expense.name).where(Expense.user_id == user_id, Expense.is_fixed == True)
+
+    is_income = Transaction.category == "Income"
+    month = func.date_trunc(literal_column("'month'"), Transaction.date)
+    statement = (
+        select(
+            month,
+            func.coalesce(func.sum(func.abs(Transaction.amount)).filter(is_income), 0.0),
+            func.coalesce(func.sum(func.abs(Transaction.amount)).filter(
+                and_(not_(is_income), Transaction.merchant.not_in(fixed_names))
+            ), 0.0),
+        )
+        .where(Transaction.user_id == user_id, Transaction.date >= since, Transaction.date < this_month)
+        .group_by(month)
+        .order_by(month)
+    )
+    result = await session.exec(statement)
+    rows = result.all()
+    if not rows:
+        return _History(income=np.zeros(0), variable=np.zeros(0))
+
+    # Months between the first active one and now count, even if empty.
+    first = rows[0][0].date().replace(day=1) if isinstance(rows[0][0], datetime) else rows[0][0]
+    months = (this_month.year - first.year) * 12 + this_month.month - first.month
+    income = np.zeros(months)
+    variable = np.zeros(months)
+    for bucket, month_income, month_variable in rows:
+        bucket = bucket.date() if isinstance(bucket, datetime) else bucket
+        i = (bucket.year - first.year) * 12 + bucket.month - first.month
+        income[i] = month_income
+        variable[i] = month_variable
+    return _History(income=income, variable=variable)
+
+
+def _simulate(
+    history: _History,
+    monthly_income: float,
+    recurring: float,
+    remaining: np.ndarray,
+    paths: int,
+    horizon: int,
+    seed: int,
+):
+    """
+    Monte Carlo over all paths at once, one month at a time, so memory stays
+    at a few arrays of ``paths`` values however long the horizon.
+
+    :return: (completion month per path and goal, inf where not reached; mean
+        income; variable mean; variable std; mean net flow)
+    """
+    rng = np.random.default_rng(seed)
+    months = len(history.variable)
+    bootstrap = months >= MIN_BOOTSTRAP_MONTHS
+    if not bootstrap:
+        mean = float(history.variable.mean()) if months else 0.0
+        std = max(float(history.variable.std()) if months else 0.0, mean * MIN_RELATIVE_STD)
+        fallback_income = float(history.income.mean()) if months else 0.0
+
+    saved = np.zeros(paths)
+    # First month each path reaches each goal: (paths, goals).
+    completion = np.full((paths, len(remaining)), np.inf)
+    income_sum = variable_sum = variable_squares = net_sum = 0.0
+    for month in range(1, horizon + 1):
+        if bootstrap:
+            # Resample whole past months so income and spending stay paired.
+            idx = rng.integers(0, months, size=paths)
+            variable = history.variable[idx]
+            income = np.full(paths, monthly_income) if monthly_income > 0 else history.income[idx]
+        else:
+            variable = np.clip(rng.normal(mean, std, size=paths), 0.0, None)
+            income = np.full(paths, monthly_income if monthly_income > 0 else fallback_income)
+
+        net = income - recurring - variable
+        # Savings are split evenly across open goals.
+        saved += np.maximum(net, 0.0) / max(len(remaining), 1)
+        reached = (saved[:, None] >= remaining[None, :]) & np.isinf(completion)
+        completion[reached] = month
+
+        income_sum += float(income.sum())
+        variable_sum += float(variable.sum())
+        variable_squares += float(np.square(variable).sum())
+        net_sum += float(net.sum())
+
+    cells = paths * horizon
+    variable_mean = variable_sum / cells
+    variable_std = max(variable_squares / cells - variable_mean ** 2, 0.0) ** 0.5
+    return completion, income_sum / cells, variable_mean, variable_std, net_sum / cells
+
+
+def _month_to_date(today: date, months: float) -> Optional[date]:
+    if not np.isfinite(months):
+        return None
+    return _add_months(today, int(np.ceil(months)))
+
+
+async def forecast_goals(
+    session: AsyncSession,
+    user: User,
+    paths: int = DEFAULT_PATHS,
+    horizon_months: int = DEFAULT_HORIZON_MONTHS,
+) -> CashFlowForecast:
+    """
+    Project when each of the user's goals will be reached.
+
+    Net monthly cash flow is income minus fixed expenses minus variable
+    spending, with variable spending resampled from the user's own monthly
+    history. Covers at most ``MAX_GOALS`` open goals, nearest to done first.
+    Results are cached until the user's next write, or the next day.
+    """
+    paths = min(paths, MAX_PATHS)
+    horizon_months = min(horizon_months, MAX_HORIZON_MONTHS)
+    today = datetime.utcnow().date()
+    version = await data_version(session, user.id)
+    key = (user.id, user.monthly_income, paths, horizon_months, today)
+    cached = _cache.get(key, version)
+    if cached is not None:
+        return cached
+
+    history = await _load_history(session, user.id, today)
+    result = await session.exec(
+        select(func.coalesce(func.sum(Expense.amount), 0.0))
+        .where(Expense.user_id == user.id, Expense.is_fixed == True)
+    )
+    recurring = float(result.one())
+    result = await session.exec(select(Goal).where(Goal.user_id == user.id))
+    goals = result.all()
+
+    open_goals = sorted(
+        (g for g in goals if g.target_amount > g.saved_amount), key=lambda g: g.target_amount - g.saved_amount
+    )[:MAX_GOALS]
+    remaining = np.array([g.target_amount - g.saved_amount for g in open_goals], dtype=float)
+    seed = (user.id.int ^ version) & 0xFFFFFFFF
+
+    # NumPy releases the GIL for the heavy lifting; keep it off the event loop.
+    completion, income, variable_mean, variable_std, net_mean = await asyncio.to_thread(
+        _simulate, history, user.monthly_income, recurring, remaining, paths, horizon_months, seed
+    )
+
+    forecasts = []
+    for i, goal in enumerate(open_goals):
+        p10, p50, p90 = np.percentile(completion[:, i], [10, 50, 90], method="inverted_cdf")
+        forecasts.append(GoalForecast(
+            goal_id=goal.id,
+            name=goal.name,
+            remaining=round(float(remaining[i]), 2),
+            probability=round(float(np.isfinite(completion[:, i]).mean()), 4),
+            p10=_month_to_date(today, p10),
+            p50=_month_to_date(today, p50),
+            p90=_month_to_date(today, p90),
+        ))
+    for goal in goals:
+        if goal.target_amount <= goal.saved_amount:
+            forecasts.append(GoalForecast(
+                goal_id=goal.id, name=goal.name, remaining=0.0, probability=1.0,
+                p10=today, p50=today, p90=today,
+            ))
+
+    forecast = CashFlowForecast(
+        version=version,
+        paths=paths,
+        horizon_months=horizon_months,
+        monthly_income=round(income, 2),
+        recurring_expenses=round(recurring, 2),
+        variable_spending_mean=round(variable_mean, 2),
+        variable_spending_std=round(variable_std, 2),
+        net_monthly_mean=round(net_mean, 2),
+        goals=forecasts,
+    )
+    _cache.put(key, version, forecast)
+    return forecast
@@ -0,0 +1,123 @@
+import asyncio
+import importlib
+import time
+from functools import lru_cache
+
+from loguru import logger
+
+from app.core import metrics
+from app.core.config import Config
+from app.services.llm_gateway import gateway
+
+
+DEFAULT_MODEL = "google/gemini-2.5-flash"
+
+# The LangChain stack takes over a second to import and most requests never
+# touch it, so nothing imports these at module level. They load on first use,
+# or ahead of it through ``warm_up``.
+LLM_MODULES = (
+    "langchain_openai",
+    "langchain_core.messages",
+    "langchain_core.prompts",
+    "langchain_core.tools",
+    "langchain_classic.agents",
+)
+
+
+def chat_model(**kwargs):
+    """
+    OpenRouter-backed ``ChatOpenAI`` with the app's defaults; keyword
+    arguments override or extend them (``max_tokens``, ``temperature``...).
+    Calls go through the LLM gateway, which owns retries and timeouts.
+    """
+    options = {
+        "model": DEFAULT_MODEL,
+        "api_key": Config.OPENROUTER_API_KEY,
+        "base_url": Config.LLM_BASE_URL,
+        "max_retries": 0,
+        "timeout": Config.LLM_DEADLINE_SECONDS,
+        "default_headers": {
+            "HTTP-Referer": "https://penny.app",
+            "X-Title": "Penny AI",
+        },
+    }
+    if Config.METRICS_ENABLED:
+        options["callbacks"] = [_metrics_handler()]
+    options.update(kwargs)
+    return _gateway_model()(**options)
+
+
+@lru_cache(maxsize=1)
+def _gateway_model():
+    """``ChatOpenAI`` with each generation (plain or streamed) run through the gateway."""
+    from langchain_openai import ChatOpenAI
+
+    class GatewayChatOpenAI(ChatOpenAI):
+        async def _agenerate(self, *args, **kwargs):
+            return await gateway.call(lambda: super(GatewayChatOpenAI, self)._agenerate(*args, **kwargs))
+
+        async def _astream(self, *args, **kwargs):
+            async for chunk in gateway.stream(lambda: super(GatewayChatOpenAI, self)._astream(*args, **kwargs)):
+                yield chunk
+
+    return GatewayChatOpenAI
+
+
+@lru_cache(maxsize=1)
+def _metrics_handler():
+    """
+    Callback timing every model call under the ``llm`` span and counting the
+    tokens the provider reports. Built on first use, like the rest of
+    LangChain.
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class LLMMetrics(BaseCallbackHandler):
+        run_inline = True  # Cheap bookkeeping; no need for an executor hop
+
+        def __init__(self):
+            self.started = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self.started[run_id] = time.perf_counter()
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self.started[run_id] = time.perf_counter()
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            self._finish(run_id, "ok")
+            output = response.llm_output or {}
+            model = output.get("model_name") or DEFAULT_MODEL
+            for kind, count in (output.get("token_usage") or {}).items():
+                if kind in ("prompt_tokens", "completion_tokens") and count:
+                    metrics.LLM_TOKENS.inc(count, model=model, type=kind.removesuffix("_tokens"))
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._finish(run_id, "error")
+
+        def _finish(self, run_id, status: str) -> None:
+            started = self.started.pop(run_id, None)
+            if started is not None:
+                metrics.SPAN_DURATION.observe(time.perf_counter() - started, span="llm", status=status)
+
+    return LLMMetrics()
+
+
+def _import_modules() -> None:
+    for name in LLM_MODULES:
+        importlib.import_module(name)
+
+
+async def warm_up() -> None:
+    """
+    Import the LLM stack in a thread, so the first chat or receipt request
+    doesn't pay for it. Meant to run as a background task once the worker
+    is already serving.
+    """
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(_import_modules)
+    except Exception as e:
+        logger.warning(f"LLM warm-up failed, modules will load on first use: {e}")
+        return
+    logger.info(f"LLM stack loaded in {time.perf_counter() - started:.2f}s.")
@@ -0,0 +1,313 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, Deque, Optional, TypeVar
+
+import httpx
+from loguru import logger
+
+from app.core import metrics
+from app.core.config import Config
+from app.core.ratelimit import current_client
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+OVERLOAD_STATUS = {429, 503}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+DECREASE_FACTOR = 0.75
+
+GATEWAY_EVENTS = metrics.registry.counter(
+    "llm_gateway_events_total", "LLM gateway retries, shed calls, timeouts and breaker trips.", ("event",)
+)
+
+
+class LLMUnavailable(Exception):
+    """The call was not attempted, or gave up: circuit open, overloaded, or past its deadline."""
+
+    def __init__(self, reason: str, retry_after: float = 0.0):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Worth another attempt: rate limits, provider 5xx, timeouts and dropped connections."""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # openai's connection errors don't carry a status and wrap the httpx error
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _is_overload(error: BaseException) -> bool:
+    return isinstance(error, asyncio.TimeoutError) or getattr(error, "status_code", None) in OVERLOAD_STATUS
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that adapts to the provider (AIMD): each call finishing
+    under ``target_latency`` while the limit is in use raises it by
+    ``1/limit`` (about one per round trip); a slow or overloaded call cuts it
+    by a quarter, at most once per ``target_latency``.
+
+    Waiters queue per client and freed slots go round-robin across clients,
+    so a user with many calls queued waits behind everyone else's next call
+    rather than ahead of it.
+    """
+
+    def __init__(
+        self, initial: int, minimum: int, maximum: int, target_latency: float,
+        max_waiting: int, max_waiting_per_client: int,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.max_waiting = max_waiting
+        self.max_waiting_per_client = max_waiting_per_client
+        self.in_flight = 0
+        self.waiting = 0
+        # Clients in the order their turn comes up, each with its own FIFO
+        self._queues: "OrderedDict[Optional[str], Deque[asyncio.Future]]" = OrderedDict()
+        self._last_decrease = 0.0
+
+    async def acquire(self, timeout: float, client: Optional[str] = None) -> None:
+        if self.in_flight < int(self.limit) and not self.waiting:
+            self.in_flight += 1
+            return
+        queue = self._queues.get(client)
+        if self.waiting >= self.max_waiting or (queue and len(queue) >= self.max_waiting_per_client):
+            GATEWAY_EVENTS.inc(event="shed")
+            raise LLMUnavailable("Too many LLM calls waiting", retry_after=self.target_latency)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(client, deque()).append(waiter)
+        self.waiting += 1
+        try:
+            await asyncio.wait({waiter}, timeout=max(0.0, timeout))
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.in_flight -= 1  # Handed a slot just as the caller went away
+                self._wake()
+            else:
+                waiter.cancel()
+                self._forget(client, waiter)
+            raise
+        if not waiter.done():
+            waiter.cancel()
+            self._forget(client, waiter)
+            GATEWAY_EVENTS.inc(event="queue_timeout")
+            raise LLMUnavailable("Timed out waiting for an LLM slot", retry_after=self.target_latency)
+
+    def release(self, latency: float, overloaded: bool) -> None:
+        now = time.monotonic()
+        if overloaded or latency > self.target_latency:
+            if now - self._last_decrease > self.target_latency:
+                self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+                self._last_decrease = now
+                logger.info("LLM concurrency limit lowered to {:.1f}", self.limit)
+        elif self.in_flight >= int(self.limit):
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self.in_flight -= 1
+        self._wake()
+
+    def _forget(self, client: Optional[str], waiter: asyncio.Future) -> None:
+        queue = self._queues[client]
+        queue.remove(waiter)
+        self.waiting -= 1
+        if not queue:
+            del self._queues[client]
+
+    def _wake(self) -> None:
+        while self._queues and self.in_flight < int(self.limit):
+            client, queue = self._queues.popitem(last=False)
+            waiter = queue.popleft()
+            self.waiting -= 1
+            if queue:
+                self._queues[client] = queue  # Back of the line
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failures`` provider failures in a row and fails calls fast
+    for ``cooldown`` seconds; then lets one probe through (half-open), whose
+    outcome closes or reopens it.
+    """
+
+    def __init__(self, failures: int, cooldown: float):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.consecutive = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    def allow(self) -> None:
+        if self.opened_at is None:
+            return
+        remaining = self.opened_at + self.cooldown - time.monotonic()
+        if remaining > 0 or self._probing:
+            GATEWAY_EVENTS.inc(event="fail_fast")
+            raise LLMUnavailable("LLM provider unavailable", retry_after=max(remaining, 1.0))
+        self._probing = True
+
+    def success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("LLM circuit closed.")
+        self.consecutive = 0
+        self.opened_at = None
+        self._probing = False
+
+    def cancelled(self) -> None:
+        self._probing = False
+
+    def failure(self) -> None:
+        self.consecutive += 1
+        self._probing = False
+        if self.opened_at is not None or self.consecutive >= self.failures:
+            if self.opened_at is None:
+                logger.warning("LLM circuit opened after {} failures in a row.", self.consecutive)
+                GATEWAY_EVENTS.inc(event="circuit_open")
+            self.opened_at = time.monotonic()
+
+
+# Absolute deadline (monotonic) shared by every LLM call in the current task
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+class LLMGateway:
+    """
+    Every LLM call in the worker goes through here (``chat_model`` wires it
+    in): a circuit breaker, an adaptive concurrency limit queued fairly per
+    user, a deadline and jittered retries of retryable errors.
+    """
+
+    def __init__(self):
+        self.limiter = AdaptiveLimiter(
+            initial=Config.LLM_CONCURRENCY_INITIAL,
+            minimum=Config.LLM_CONCURRENCY_MIN,
+            maximum=Config.LLM_CONCURRENCY_MAX,
+            target_latency=Config.LLM_TARGET_LATENCY_SECONDS,
+            max_waiting=Config.LLM_MAX_WAITING,
+            max_waiting_per_client=Config.LLM_MAX_WAITING_PER_USER,
+        )
+        self.breaker = CircuitBreaker(Config.LLM_BREAKER_FAILURES, Config.LLM_BREAKER_COOLDOWN_SECONDS)
+
+    @contextmanager
+    def deadline(self, seconds: float):
+        """Bound every LLM call inside the block (an agent run, say) by one overall deadline."""
+        at = time.monotonic() + seconds
+        current = _deadline.get()
+        token = _deadline.set(at if current is None else min(at, current))
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+    def _deadline_at(self) -> float:
+        at = time.monotonic() + Config.LLM_DEADLINE_SECONDS
+        shared = _deadline.get()
+        return at if shared is None else min(at, shared)
+
+    @asynccontextmanager
+    async def _attempt(self, deadline_at: float) -> AsyncIterator[None]:
+        """One attempt: breaker check, a limiter slot, and the outcome fed back to both."""
+        self.breaker.allow()
+        try:
+            await self.limiter.acquire(deadline_at - time.monotonic(), current_client.get())
+        except BaseException:
+            self.breaker.cancelled()
+            raise
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.limiter.release(time.monotonic() - started, overloaded=_is_overload(e))
+            if is_retryable(e):
+                self.breaker.failure()
+            else:
+                self.breaker.success()  # The provider answered; the request itself was the problem
+            raise
+        except BaseException:
+            # The caller went away (cancelled, or stopped reading a stream:
+            # GeneratorExit); that says nothing about the provider
+            self.limiter.release(time.monotonic() - started, overloaded=False)
+            self.breaker.cancelled()
+            raise
+        else:
+            self.limiter.release(time.monotonic() - started, overloaded=False)
+            self.breaker.success()
+
+    async def _backoff(self, attempt: int, error: Exception, deadline_at: float) -> None:
+        """Sleep before the next attempt (full jitter), or re-raise if it wouldn't fit the deadline."""
+        delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+        if attempt >= Config.LLM_MAX_RETRIES or not is_retryable(error) or time.monotonic() + delay >= deadline_at:
+            if isinstance(error, asyncio.TimeoutError):
+                GATEWAY_EVENTS.inc(event="timeout")
+                raise LLMUnavailable("LLM call timed out", retry_after=Config.LLM_TARGET_LATENCY_SECONDS) from error
+            raise error
+        GATEWAY_EVENTS.inc(event="retry")
+        logger.warning("LLM call failed ({}), retry {} in {:.2f}s", error, attempt + 1, delay)
+        await asyncio.sleep(delay)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` (a fresh awaitable per attempt) under the gateway's policies."""
+        deadline_at = self._deadline_at()
+        attempt = 0
+        while True:
+            try:
+                async with self._attempt(deadline_at):
+                    return await asyncio.wait_for(fn(), deadline_at - time.monotonic())
+            except LLMUnavailable:
+                raise
+            except Exception as e:
+                await self._backoff(attempt, e, deadline_at)
+                attempt += 1
+
+    async def stream(self, open_stream: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        ``call`` for streamed responses. Retries only happen before the first
+        chunk; the slot is held until the stream ends.
+        """
+        deadline_at = self._deadline_at()
+        attempt = 0
+        while True:
+            yielded = False
+            try:
+                async with self._attempt(deadline_at):
+                    chunks = open_stream().__aiter__()
+                    try:
+                        try:
+                            first = await asyncio.wait_for(chunks.__anext__(), deadline_at - time.monotonic())
+                        except StopAsyncIteration:
+                            return
+                        yielded = True
+                        yield first
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), deadline_at - time.monotonic())
+                            except StopAsyncIteration:
+                                return
+                            yield chunk
+                    finally:
+                        # Hang up on the provider before the slot is given back
+                        if hasattr(chunks, "aclose"):
+                            await chunks.aclose()
+            except LLMUnavailable:
+                raise
+            except Exception as e:
+                if yielded:
+                    raise
+                await self._backoff(attempt, e, deadline_at)
+                attempt += 1
+
+
+gateway = LLMGateway()
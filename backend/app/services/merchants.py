@@ -0,0 +1,181 @@
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+NORMALIZE_CACHE_SIZE = 65536
+
+
+class Automaton(Generic[T]):
+    """
+    Aho-Corasick matcher over lowercase patterns.
+
+    Built once; ``matches`` finds every occurrence of every pattern in a
+    single pass over the text, so cost is O(len(text) + matches) no matter
+    how many patterns there are.
+    """
+
+    def __init__(self, patterns: Dict[str, T]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, T]]] = [[]]  # (pattern length, payload)
+
+        for pattern, payload in patterns.items():
+            node = 0
+            for char in pattern.lower():
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._out[node].append((len(pattern), payload))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def matches(self, text: str) -> Iterator[Tuple[int, int, T]]:
+        """Yield ``(start, end, payload)`` for every pattern occurrence in ``text``."""
+        node = 0
+        for index, char in enumerate(text.lower()):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, payload in self._out[node]:
+                yield index + 1 - length, index + 1, payload
+
+
+# Canonical merchant -> (lowercase aliases as they appear on statements, default category)
+MERCHANTS: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "Amazon": (("amazon", "amzn", "amzn mktp", "amazon.com", "prime video"), "Shopping"),
+    "Apple": (("apple.com/bill", "itunes", "apple storage", "icloud"), "Subscriptions"),
+    "Starbucks": (("starbucks", "sbux"), "Food & Drink"),
+    "Chipotle": (("chipotle",), "Food & Drink"),
+    "McDonald's": (("mcdonald's", "mcdonalds"), "Food & Drink"),
+    "DoorDash": (("doordash",), "Food & Drink"),
+    "Uber Eats": (("uber eats", "ubereats"), "Food & Drink"),
+    "Uber": (("uber", "uber trip", "uber *trip"), "Transportation"),
+    "Lyft": (("lyft",), "Transportation"),
+    "Shell": (("shell oil", "shell gas", "shell service"), "Transportation"),
+    "Netflix": (("netflix",), "Subscriptions"),
+    "Spotify": (("spotify",), "Subscriptions"),
+    "HBO Max": (("hbo max", "hbomax", "max.com"), "Subscriptions"),
+    "Hulu": (("hulu",), "Subscriptions"),
+    "Whole Foods": (("whole foods", "wholefds", "wfm"), "Groceries"),
+    "Trader Joe's": (("trader joe's", "trader joes"), "Groceries"),
+    "Costco": (("costco",), "Groceries"),
+    "Walmart": (("walmart", "wal-mart", "wm supercenter"), "Shopping"),
+    "Target": (("target",), "Shopping"),
+    "Best Buy": (("best buy", "bestbuy"), "Shopping"),
+    "CVS": (("cvs",), "Health"),
+    "Walgreens": (("walgreens",), "Health"),
+    "Steam": (("steam games", "steampowered", "steam purchase"), "Entertainment"),
+    "AMC Theatres": (("amc theater", "amc theatre"), "Entertainment"),
+}
+
+# Keyword -> icon, checked against the category first and then the merchant.
+# Earlier rules win when several keywords match. Keywords are stems in the
+# category ("sub" for Subscriptions) but whole words in the merchant, so
+# "Subway" isn't a subscription.
+ICON_RULES: Tuple[Tuple[str, str], ...] = (
+    ("food", "Pizza"), ("dining", "Pizza"), ("chipotle", "Pizza"), ("starbucks", "Pizza"),
+    ("rent", "Home"), ("housing", "Home"),
+    ("transport", "Car"), ("uber", "Car"), ("gas", "Car"),
+    ("sub", "RefreshCw"), ("netflix", "RefreshCw"), ("spotify", "RefreshCw"),
+    ("shop", "ShoppingBag"), ("amazon", "ShoppingBag"), ("grocer", "ShoppingBag"),
+    ("utilit", "Zap"), ("electric", "Zap"),
+    ("income", "Coins"), ("payroll", "Coins"),
+)
+
+DEFAULT_CATEGORY = "Other"
+
+_merchant_matcher: Automaton[str] = Automaton({
+    alias: name for name, (aliases, _) in MERCHANTS.items() for alias in aliases
+})
+_icon_matcher: Automaton[Tuple[int, str]] = Automaton({
+    keyword: (priority, icon) for priority, (keyword, icon) in enumerate(ICON_RULES)
+})
+
+# Card-processor prefixes and trailing reference codes / store numbers.
+_PROCESSOR_PREFIX = re.compile(r"^(?:sq|tst|pp|paypal|sp|pos|dd)\s*\*\s*", re.IGNORECASE)
+_REFERENCE_SUFFIX = re.compile(r"(?:\s*\*\s*[a-z0-9]+|\s+#?\d{3,})+\s*$", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class NormalizedMerchant:
+    name: str
+    category: Optional[str]  # Default category for a known merchant
+
+
+def _is_word(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not after.isalnum()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_merchant(raw: str) -> NormalizedMerchant:
+    """
+    Map a raw statement descriptor (e.g. ``"AMZN Mktp US*2K3"``) to a
+    canonical merchant name.
+
+    Known aliases win, longest match first. Otherwise processor prefixes and
+    reference codes are stripped and shouting is title-cased.
+    """
+    text = _WHITESPACE.sub(" ", raw or "").strip()
+    if not text:
+        return NormalizedMerchant(name="Unknown", category=None)
+
+    best: Optional[Tuple[int, int, str]] = None
+    for start, end, name in _merchant_matcher.matches(text):
+        if not _is_word(text, start, end):
+            continue
+        if best is None or (end - start, -start) > (best[1] - best[0], -best[0]):
+            best = (start, end, name)
+    if best is not None:
+        name = best[2]
+        return NormalizedMerchant(name=name, category=MERCHANTS[name][1])
+
+    cleaned = _REFERENCE_SUFFIX.sub("", _PROCESSOR_PREFIX.sub("", text)).strip() or text
+    if cleaned.isupper():
+        cleaned = cleaned.title()
+    return NormalizedMerchant(name=cleaned, category=None)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def icon_for(category: str, merchant: str = "") -> str:
+    """Icon name for a transaction, falling back to the category itself."""
+    for text, whole_words in ((category, False), (merchant, True)):
+        if not text:
+            continue
+        hits = [
+            payload for start, end, payload in _icon_matcher.matches(text)
+            if not whole_words or _is_word(text, start, end)
+        ]
+        if hits:
+            return min(hits)[1]
+    return category
+
+
+def normalize(merchant: str, category: Optional[str] = None) -> Tuple[str, str, str]:
+    """
+    Normalize one incoming transaction.
+
+    :return: (canonical merchant, category, icon). A missing category falls
+        back to the merchant's default, then to ``DEFAULT_CATEGORY``.
+    """
+    normalized = normalize_merchant(merchant)
+    category = (category or "").strip() or normalized.category or DEFAULT_CATEGORY
+    return normalized.name, category, icon_for(category, normalized.name)
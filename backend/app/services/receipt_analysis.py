@@ -3,11 +3,12 @@ import json
 from typing import List, Optional
 from datetime import datetime
 
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage
+from loguru import logger
 from pydantic import BaseModel, Field
 
 from app.core.config import Config
+from app.services.llm import chat_model
+from app.services.merchants import normalize_merchant
 
 class ReceiptItem(BaseModel):
     merchant: str = Field(description="The name of the store or merchant")
@@ -38,15 +39,9 @@ async def analyze_receipt_image(image_bytes: bytes) -> ReceiptAnalysisResponse:
     # Encode image to base64
     base64_image = base64.b64encode(image_bytes).decode('utf-8')
 
-    llm = ChatOpenAI(
-        model="google/gemini-2.5-flash",
-        api_key=Config.OPENROUTER_API_KEY,
-        base_url="https://openrouter.ai/api/v1",
-        default_headers={
-            "HTTP-Referer": "https://penny.app", 
-            "X-Title": "Penny AI", 
-        }
-    )
+    from langchain_core.messages import HumanMessage
+
+    llm = chat_model()
 
     structured_llm = llm.with_structured_output(ReceiptAnalysisResult)
 
@@ -78,6 +73,8 @@ async def analyze_receipt_image(image_bytes: bytes) -> ReceiptAnalysisResponse:
         # returns the Pydantic object directly
         result: ReceiptAnalysisResult = await structured_llm.ainvoke([message])
         items = result.items
+        for item in items:
+            item.merchant = normalize_merchant(item.merchant).name
         
         if not items:
             return ReceiptAnalysisResponse(
@@ -114,5 +111,5 @@ async def analyze_receipt_image(image_bytes: bytes) -> ReceiptAnalysisResponse:
         )
         
     except Exception as e:
-        print(f"Error analyzing receipt: {e}")
+        logger.error("Error analyzing receipt: {}", e)
         raise e
\ No newline at end of file
@@ -0,0 +1,78 @@
+import uuid
+from typing import List, Optional, Tuple
+
+from sqlalchemy import ColumnElement, Integer, cast, func, literal, or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.transaction import Transaction
+
+
+DEFAULT_LIMIT = 20
+MAX_QUERY_LENGTH = 100
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _match(column, term: str) -> Tuple[ColumnElement[bool], ColumnElement[float]]:
+    """
+    Condition and score for matching ``term`` against a text column.
+
+    Substrings match through ILIKE; misspellings and abbreviations through
+    word similarity (``term <% column``). Both use the trigram GIN indexes.
+    A substring hit always outranks a fuzzy one.
+    """
+    term = term.strip()[:MAX_QUERY_LENGTH]
+    substring = column.ilike(f"%{_escape_like(term)}%", escape="\\")
+    fuzzy = column.op("%>")(term)
+    score = func.word_similarity(literal(term), column) + cast(substring, Integer)
+    return or_(substring, fuzzy), score
+
+
+async def search_transactions(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    *,
+    q: Optional[str] = None,
+    merchant: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+) -> List[Tuple[Transaction, float]]:
+    """
+    Ranked fuzzy search over a user's transactions.
+
+    :param session: The database session.
+    :param user_id: Whose transactions to search.
+    :param q: Free text matched against merchant or category.
+    :param merchant: Matched against merchant only.
+    :param category: Matched against category only.
+    :param limit: Maximum number of results.
+    :return: Transactions with their relevance, best first, newest first on ties.
+    """
+    conditions = []
+    scores = []
+    if q and q.strip():
+        merchant_match, merchant_score = _match(Transaction.merchant, q)
+        category_match, category_score = _match(Transaction.category, q)
+        conditions.append(or_(merchant_match, category_match))
+        scores.append(func.greatest(merchant_score, category_score))
+    if merchant and merchant.strip():
+        match, score = _match(Transaction.merchant, merchant)
+        conditions.append(match)
+        scores.append(score)
+    if category and category.strip():
+        match, score = _match(Transaction.category, category)
+        conditions.append(match)
+        scores.append(score)
+
+    score = (sum(scores[1:], scores[0]) if scores else literal(0.0)).label("score")
+    statement = (
+        select(Transaction, score)
+        .where(Transaction.user_id == user_id, *conditions)
+        .order_by(score.desc(), Transaction.date.desc())
+        .limit(limit)
+    )
+    result = await session.exec(statement)
+    return [(transaction, float(score)) for transaction, score in result.all()]
@@ -0,0 +1,237 @@
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import bindparam, case, exists, func, literal, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.gamification import ShopItem, UserActivity, UserItem, UserStats
+from app.models.user import User
+from app.services import achievements
+
+
+# Days each streak shop item can bridge. Unknown items in the "streak"
+# category count as a single freeze.
+STREAK_FREEZE_CHARGES: Dict[str, int] = {
+    "Streak Freeze x1": 1,
+    "Streak Freeze x3": 3,
+}
+
+# How far back the batch recompute looks. Runs reaching the window edge keep
+# the incrementally maintained value if it is larger.
+LOOKBACK_DAYS = 400
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _today() -> date:
+    return datetime.utcnow().date()
+
+
+def _freezes_available(user_id_column):
+    """Correlated expression: freezes owned minus freezes already consumed."""
+    charges = case(STREAK_FREEZE_CHARGES, value=ShopItem.name, else_=1)
+    owned = (
+        select(func.coalesce(func.sum(charges), 0))
+        .select_from(UserItem)
+        .join(ShopItem, ShopItem.id == UserItem.item_id)
+        .where(UserItem.user_id == user_id_column, ShopItem.category == "streak")
+        .scalar_subquery()
+    )
+    used = (
+        select(func.count())
+        .select_from(UserActivity)
+        .where(UserActivity.user_id == user_id_column, UserActivity.frozen == True)
+        .scalar_subquery()
+    )
+    return owned - used
+
+
+def _active_on(user_id_column, day: date):
+    return exists().where(UserActivity.user_id == user_id_column, UserActivity.day == day)
+
+
+async def _apply_freezes(session: AsyncSession, user_ids: Sequence[uuid.UUID], day: date) -> int:
+    """
+    Bridge ``day`` with a freeze for users whose running streak would otherwise
+    break on it, as long as they have a freeze left.
+
+    :return: Number of freezes consumed.
+    """
+    candidates = select(User.id, literal(day), literal(True)).where(
+        User.id.in_(user_ids),
+        User.streak > 0,
+        ~_active_on(User.id, day),
+        _active_on(User.id, day - timedelta(days=1)),
+        _freezes_available(User.id) > 0,
+    )
+    result = await session.exec(
+        insert(UserActivity)
+        .from_select(["user_id", "day", "frozen"], candidates)
+        .on_conflict_do_nothing()
+        .returning(UserActivity.user_id)
+    )
+    return len(result.all())
+
+
+async def record_activity(session: AsyncSession, user_id: uuid.UUID, today: Optional[date] = None) -> None:
+    """
+    Mark the user active today and advance their streak.
+
+    Only the first activity of the day does any work beyond a single no-op
+    insert. Runs inside the caller's transaction; the caller commits.
+
+    :param session: The database session.
+    :param user_id: The active user.
+    :param today: Override for the current UTC day.
+    """
+    today = today or _today()
+    yesterday = today - timedelta(days=1)
+
+    result = await session.exec(
+        insert(UserActivity)
+        .values(user_id=user_id, day=today, frozen=False)
+        .on_conflict_do_nothing()
+        .returning(UserActivity.user_id)
+    )
+    if result.first() is None:
+        return
+
+    # The nightly run may not have covered yesterday yet.
+    await _apply_freezes(session, [user_id], yesterday)
+
+    result = await session.exec(
+        update(User)
+        .where(User.id == user_id)
+        .values(streak=case((_active_on(User.id, yesterday), User.streak + 1), else_=1))
+        .returning(User.streak)
+    )
+    streak = result.scalar_one()
+    await achievements.evaluate(session, user_id, {"streak": streak})
+
+
+_RECOMPUTE_SQL = text("""
+WITH days AS (
+    SELECT user_id, day, bool_and(frozen) AS frozen
+    FROM (
+        SELECT user_id, day, frozen
+        FROM useractivity
+        WHERE user_id = ANY(:user_ids) AND day >= :since AND day <= :today
+        UNION ALL
+        SELECT user_id, "date"::date, false
+        FROM transaction
+        WHERE user_id = ANY(:user_ids) AND "date" >= :since AND "date" < :tomorrow
+    ) AS events
+    GROUP BY user_id, day
+),
+islands AS (
+    SELECT user_id, day, frozen,
+           day - (row_number() OVER (PARTITION BY user_id ORDER BY day))::int AS grp
+    FROM days
+),
+runs AS (
+    SELECT user_id,
+           min(day) AS first_day,
+           max(day) AS last_day,
+           count(*) FILTER (WHERE NOT frozen) AS length
+    FROM islands
+    GROUP BY user_id, grp
+),
+latest AS (
+    SELECT DISTINCT ON (user_id) user_id, first_day, last_day, length
+    FROM runs
+    ORDER BY user_id, last_day DESC
+)
+UPDATE "user" AS u
+SET streak = CASE
+    WHEN latest.last_day IS NULL OR latest.last_day < :yesterday THEN 0
+    WHEN latest.first_day <= :since THEN GREATEST(u.streak, latest.length)
+    ELSE latest.length
+END
+FROM unnest(:user_ids) AS batch(id)
+LEFT JOIN latest ON latest.user_id = batch.id
+WHERE u.id = batch.id
+""").bindparams(bindparam("user_ids", type_=ARRAY(UUID(as_uuid=True))))
+
+
+async def recompute(session: AsyncSession, user_ids: Sequence[uuid.UUID], today: Optional[date] = None) -> None:
+    """
+    Recompute streaks for a batch of users with one windowed query.
+
+    Days come from recorded activity (including freezes) and transaction
+    dates. Streaks are written back in the same statement.
+
+    :param session: The database session.
+    :param user_ids: The batch of users to recompute.
+    :param today: Override for the current UTC day.
+    """
+    today = today or _today()
+    await session.exec(
+        _RECOMPUTE_SQL,
+        params={
+            "user_ids": list(user_ids),
+            "since": today - timedelta(days=LOOKBACK_DAYS),
+            "today": today,
+            "tomorrow": today + timedelta(days=1),
+            "yesterday": today - timedelta(days=1),
+        },
+    )
+
+
+async def run_batch(session: AsyncSession, user_ids: Sequence[uuid.UUID], today: Optional[date] = None) -> None:
+    """
+    Nightly pass over one batch: spend freezes on yesterday where needed,
+    recompute streaks, then evaluate streak achievements in bulk.
+    """
+    today = today or _today()
+    await _apply_freezes(session, user_ids, today - timedelta(days=1))
+    await recompute(session, user_ids, today=today)
+
+    await session.exec(
+        insert(UserStats)
+        .from_select(["user_id"], select(User.id).where(User.id.in_(user_ids)))
+        .on_conflict_do_nothing()
+    )
+    await achievements.evaluate_bulk(session, user_ids, counters=["streak"])
+
+
+async def run_all(session: AsyncSession, batch_size: int = DEFAULT_BATCH_SIZE, today: Optional[date] = None) -> int:
+    """
+    Run the nightly streak update over every user with a live streak or
+    recent activity, in keyset-paginated batches committed one at a time.
+
+    :return: Number of users processed.
+    """
+    today = today or _today()
+    recently_active = (
+        select(UserActivity.user_id)
+        .where(UserActivity.day >= today - timedelta(days=1))
+    )
+    last_id = None
+    processed = 0
+    while True:
+        statement = (
+            select(User.id)
+            .where((User.streak > 0) | User.id.in_(recently_active))
+            .order_by(User.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            statement = statement.where(User.id > last_id)
+        result = await session.exec(statement)
+        user_ids = result.all()
+        if not user_ids:
+            break
+
+        await run_batch(session, user_ids, today=today)
+        await session.commit()
+
+        processed += len(user_ids)
+        last_id = user_ids[-1]
+        logger.debug("Streak update processed {} users", processed)
+
+    logger.info("Streak update complete for {} users", processed)
+    return processed
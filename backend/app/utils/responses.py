@@ -0,0 +1,35 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain rows (dicts of str, numbers, datetimes and UUIDs) as compact JSON."""
+    if orjson is not None:
+        # asyncpg returns its own uuid.UUID subclass, which orjson hands to ``default``
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def _default(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for rows that are already plain data.
+
+    Returning one of these skips response-model validation, so only use it
+    with rows built to match the declared response model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,52 @@
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Float, Text, cast
+from sqlalchemy.types import UserDefinedType
+
+
+def format_vector(values: Sequence[float]) -> str:
+    """pgvector's text form, e.g. ``[0.1,0.2]``."""
+    return "[" + ",".join(f"{float(v):.6g}" for v in values) + "]"
+
+
+def parse_vector(text: str) -> np.ndarray:
+    return np.array(text[1:-1].split(","), dtype=np.float32) if len(text) > 2 else np.zeros(0, np.float32)
+
+
+class Vector(UserDefinedType):
+    """
+    pgvector ``vector(dim)`` column.
+
+    Values travel as text and are cast on the server, so no driver-level
+    codec is needed; they come back as float32 NumPy arrays.
+    """
+
+    cache_ok = True
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim
+
+    def get_col_spec(self, **kw) -> str:
+        return "vector" if self.dim is None else f"vector({self.dim})"
+
+    def bind_processor(self, dialect):
+        def process(value):
+            return None if value is None else format_vector(value)
+        return process
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            return None if value is None else parse_vector(value)
+        return process
+
+    def bind_expression(self, bindvalue):
+        return cast(cast(bindvalue, Text), self)
+
+    def column_expression(self, column):
+        return cast(column, Text)
+
+    class comparator_factory(UserDefinedType.Comparator):
+        def cosine_distance(self, other):
+            """``<=>``: 0 for identical direction, 2 for opposite."""
+            return self.op("<=>", return_type=Float)(other)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Script to recompute achievement counters and unlock achievements for existing users"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import select
+from app.core.db import get_session
+from app.models.user import User
+from app.services import achievements
+
+BATCH_SIZE = 5000
+
+async def backfill_achievements():
+    async for session in get_session():
+        last_id = None
+        total_users = 0
+        total_unlocked = 0
+
+        while True:
+            statement = select(User.id).order_by(User.id).limit(BATCH_SIZE)
+            if last_id is not None:
+                statement = statement.where(User.id > last_id)
+            result = await session.exec(statement)
+            user_ids = result.all()
+            if not user_ids:
+                break
+
+            total_unlocked += await achievements.backfill(session, user_ids=user_ids)
+            await session.commit()
+
+            total_users += len(user_ids)
+            last_id = user_ids[-1]
+            print(f"Processed {total_users} users")
+
+        print(f"Unlocked {total_unlocked} achievements")
+        print("Backfill complete!")
+
+if __name__ == "__main__":
+    asyncio.run(backfill_achievements())
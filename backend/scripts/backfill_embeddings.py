@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Script to embed existing transactions for nearest-neighbour categorization"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import select
+from app.core.db import get_session
+from app.models.embedding import TransactionEmbedding
+from app.models.transaction import Transaction
+from app.services import categorize
+from app.services.embeddings import embeddings
+
+BATCH_SIZE = 5000
+
+async def backfill_embeddings():
+    async for session in get_session():
+        last_id = None
+        total = 0
+
+        while True:
+            statement = (
+                select(Transaction)
+                .outerjoin(TransactionEmbedding, TransactionEmbedding.transaction_id == Transaction.id)
+                .where(TransactionEmbedding.transaction_id == None)
+                .order_by(Transaction.id)
+                .limit(BATCH_SIZE)
+            )
+            if last_id is not None:
+                statement = statement.where(Transaction.id > last_id)
+            result = await session.exec(statement)
+            transactions = result.all()
+            if not transactions:
+                break
+
+            by_user = {}
+            for transaction in transactions:
+                by_user.setdefault(transaction.user_id, []).append(transaction)
+            for user_id, user_transactions in by_user.items():
+                await categorize.index(session, user_id, user_transactions)
+            await session.commit()
+
+            total += len(transactions)
+            last_id = transactions[-1].id
+            print(f"Embedded {total} transactions")
+
+        print("Backfill complete!")
+    embeddings.close()
+
+if __name__ == "__main__":
+    asyncio.run(backfill_embeddings())
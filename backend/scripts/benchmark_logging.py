@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Script to compare requests/sec with request logging on versus off
+
+Drives the real app in-process (httpx ASGITransport, no server, no database)
+against a route that takes a session from ``get_session`` like every API
+route does. Each mode runs in a fresh interpreter, since logging is
+configured at import:
+  - debug:   LOG_LEVEL=DEBUG, every request logged
+  - default: LOG_LEVEL=INFO, the route sampled at REQUEST_LOG_SAMPLE_RATE
+  - off:     LOG_LEVEL=ERROR, nothing written
+Log output goes to /dev/null, so what's measured is the cost in the app.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+MODES = {
+    "debug": {"LOG_LEVEL": "DEBUG", "REQUEST_LOG_SAMPLED_PATHS": ""},
+    "default": {"LOG_LEVEL": "INFO", "REQUEST_LOG_SAMPLED_PATHS": "/bench", "REQUEST_LOG_SAMPLE_RATE": "0.1"},
+    "off": {"LOG_LEVEL": "ERROR"},
+}
+
+
+async def run(requests: int, concurrency: int) -> float:
+    sys.path.insert(0, str(BACKEND_DIR))
+    import httpx
+    from fastapi import Depends
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app import app
+    from app.core.db import get_session
+
+    @app.get("/bench")
+    async def bench(session: AsyncSession = Depends(get_session)):
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(n: int):
+            for _ in range(n):
+                await client.get("/bench")
+
+        await worker(200)  # Warm up
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best one counts")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)  # Child process
+    args = parser.parse_args()
+
+    if args.mode:
+        print(f"{asyncio.run(run(args.requests, args.concurrency)):.0f}")
+        return
+
+    results = {mode: 0.0 for mode in MODES}
+    # Interleave the modes so drift in machine load hits them all alike.
+    for _ in range(args.repeat):
+        for mode, env in MODES.items():
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode,
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+                env={**os.environ, **env}, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True,
+            ).stdout
+            results[mode] = max(results[mode], float(output.strip().splitlines()[-1]))
+    for mode, rate in results.items():
+        print(f"{mode:>8}: {rate:8.0f} req/s")
+    print(f"debug logging costs {1 - results['debug'] / results['off']:.0%} of throughput, "
+          f"default {1 - results['default'] / results['off']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
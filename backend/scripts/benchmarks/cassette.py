@@ -0,0 +1,101 @@
+"""Recorded LLM exchanges for stub_llm.py, keyed so reruns of the same request find them.
+
+A cassette is a JSON-lines file, one exchange per line:
+``{"key": ..., "model": ..., "message": {...}, "usage": {...}, "latency_ms": ...}``.
+"""
+import base64
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?\b")
+_UUID = re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE)
+_CALL_ID = re.compile(r"\bcall_[A-Za-z0-9]+\b")
+_SPACE = re.compile(r"\s+")
+
+
+def _text(value: str) -> str:
+    """Erase what changes between otherwise identical runs: dates, ids, spacing."""
+    value = _DATE.sub("<date>", value)
+    value = _UUID.sub("<id>", value)
+    value = _CALL_ID.sub("<call>", value)
+    return _SPACE.sub(" ", value).strip()
+
+
+def _image(url: str) -> str:
+    """Data URLs by the hash of their bytes, so the key doesn't carry the image."""
+    if url.startswith("data:"):
+        payload = url.partition(",")[2]
+        try:
+            data = base64.b64decode(payload)
+        except ValueError:
+            data = payload.encode()
+        return "sha256:" + hashlib.sha256(data).hexdigest()
+    return url
+
+
+def _content(content: Any) -> Any:
+    if isinstance(content, str):
+        return _text(content)
+    if isinstance(content, list):
+        parts = []
+        for part in content:
+            if part.get("type") == "image_url":
+                parts.append({"image": _image(part["image_url"]["url"])})
+            elif part.get("type") == "text":
+                parts.append({"text": _text(part["text"])})
+            else:
+                parts.append(part)
+        return parts
+    return content
+
+
+def request_key(body: Dict[str, Any]) -> str:
+    """
+    Hash of what determines the answer: model, normalized messages, tools,
+    forced tool and response schema. Sampling and streaming options are
+    left out, so a streamed replay matches a non-streamed recording.
+    """
+    messages = []
+    for message in body.get("messages", []):
+        normalized = {"role": message.get("role"), "content": _content(message.get("content"))}
+        if message.get("tool_calls"):
+            normalized["tool_calls"] = [
+                {"name": c["function"]["name"], "arguments": _text(c["function"]["arguments"])}
+                for c in message["tool_calls"]
+            ]
+        messages.append(normalized)
+    canonical = {
+        "model": body.get("model"),
+        "messages": messages,
+        "tools": sorted(t["function"]["name"] for t in body.get("tools") or [] if "function" in t),
+        "tool_choice": body.get("tool_choice"),
+        "response_format": body.get("response_format"),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+class Cassette:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.exchanges: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        exchange = json.loads(line)
+                        self.exchanges[exchange["key"]] = exchange
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.exchanges.get(key)
+
+    def add(self, key: str, model: str, message: Dict[str, Any], usage: Dict[str, Any], latency_ms: float) -> None:
+        exchange = {"key": key, "model": model, "message": message, "usage": usage, "latency_ms": round(latency_ms, 1)}
+        self.exchanges[key] = exchange
+        with open(self.path, "a") as f:
+            f.write(json.dumps(exchange) + "\n")
@@ -0,0 +1,10 @@
+"""Settings shared by the benchmark scripts (no app imports, so the load driver stays light)."""
+from pathlib import Path
+
+SAMPLE_CSV = Path(__file__).parent.parent.parent.parent / "sample_statements.csv"
+PASSWORD = "benchmark"
+EMAIL_DOMAIN = "bench.local"
+
+
+def email_for(prefix: str, n: int) -> str:
+    return f"{prefix}{n}@{EMAIL_DOMAIN}"
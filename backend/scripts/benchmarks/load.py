@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Script to load-test a running API and report latency percentiles and throughput
+
+Logs in the users created by seed.py, then keeps ``--concurrency`` requests
+in flight for ``--duration`` seconds, picking scenarios by weight from
+``--mix``. Reports p50/p95/p99 latency and requests/s per scenario, and can
+save the report (``--out``) and compare against a saved one (``--baseline``).
+
+Scenarios:
+  auth      POST /auth/jwt/login
+  list      GET  /transactions/?limit=100
+  create    POST /transactions/
+  cart      POST /transactions/confirm-cart (5 items)
+  purchase  POST /gamification/shop/{id}/purchase (run scripts/reseed_shop.py first)
+  upload    POST /uploads/csv with sample_statements.csv (replaces the user's data)
+  chat      POST /chat/                      -+
+  receipt   POST /transactions/analyze        | need an LLM: run stub_llm.py and
+  analyze   POST /transactions/analyze-cart  -+ the API with LLM_BASE_URL pointing at it
+
+chat, receipt, analyze and upload are rate limited per user; run the API with
+RATE_LIMIT_ENABLED=false to measure them rather than the 429s.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import struct
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from common import PASSWORD, SAMPLE_CSV, email_for
+
+API = "/api/v1"
+DEFAULT_MIX = "list=10,create=3,cart=2,purchase=1,auth=1"
+
+
+def _png(width: int = 64, height: int = 64) -> bytes:
+    """A blank PNG, enough for the upload endpoints (the stub never looks at it)."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + b"\xff" * (width * 3) for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+IMAGE = _png()
+
+
+@dataclass
+class VirtualUser:
+    email: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    rng: random.Random
+    shop_items: List[str]
+
+
+async def _auth(ctx: Context, user: VirtualUser) -> httpx.Response:
+    return await ctx.client.post(f"{API}/auth/jwt/login", data={"username": user.email, "password": PASSWORD})
+
+
+async def _list(ctx: Context, user: VirtualUser) -> httpx.Response:
+    return await ctx.client.get(f"{API}/transactions/", params={"limit": 100}, headers=user.headers)
+
+
+async def _create(ctx: Context, user: VirtualUser) -> httpx.Response:
+    body = {
+        "merchant": ctx.rng.choice(["Starbucks", "Uber", "Whole Foods", "Shell", "Amazon"]),
+        "category": "",
+        "amount": -round(ctx.rng.uniform(3, 120), 2),
+        "date": datetime.utcnow().isoformat(),
+        "icon": "DollarSign",
+    }
+    return await ctx.client.post(f"{API}/transactions/", json=body, headers=user.headers)
+
+
+async def _cart(ctx: Context, user: VirtualUser) -> httpx.Response:
+    body = {
+        "date": datetime.utcnow().strftime("%Y-%m-%d"),
+        "items": [
+            {"merchant": "Target", "category": "Shopping", "amount": round(ctx.rng.uniform(2, 40), 2), "item_name": f"Item {i}"}
+            for i in range(5)
+        ],
+    }
+    return await ctx.client.post(f"{API}/transactions/confirm-cart", json=body, headers=user.headers)
+
+
+async def _purchase(ctx: Context, user: VirtualUser) -> httpx.Response:
+    item = ctx.rng.choice(ctx.shop_items)
+    return await ctx.client.post(f"{API}/gamification/shop/{item}/purchase", headers=user.headers)
+
+
+async def _upload(ctx: Context, user: VirtualUser) -> httpx.Response:
+    files = {"file": ("statements.csv", SAMPLE_CSV.read_bytes(), "text/csv")}
+    return await ctx.client.post(f"{API}/uploads/csv", files=files, headers=user.headers)
+
+
+async def _chat(ctx: Context, user: VirtualUser) -> httpx.Response:
+    body = {"message": "How much did I spend on coffee last month?", "history": []}
+    return await ctx.client.post(f"{API}/chat/", json=body, headers=user.headers)
+
+
+async def _receipt(ctx: Context, user: VirtualUser) -> httpx.Response:
+    files = {"file": ("receipt.png", IMAGE, "image/png")}
+    return await ctx.client.post(f"{API}/transactions/analyze", files=files, headers=user.headers)
+
+
+async def _analyze(ctx: Context, user: VirtualUser) -> httpx.Response:
+    files = {"file": ("cart.png", IMAGE, "image/png")}
+    return await ctx.client.post(f"{API}/transactions/analyze-cart", files=files, headers=user.headers)
+
+
+SCENARIOS: Dict[str, Callable[[Context, VirtualUser], Awaitable[httpx.Response]]] = {
+    "auth": _auth, "list": _list, "create": _create, "cart": _cart, "purchase": _purchase,
+    "upload": _upload, "chat": _chat, "receipt": _receipt, "analyze": _analyze,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'; pick from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: Dict[str, List[float]], statuses: Dict[str, Dict[str, int]], elapsed: float) -> Dict[str, dict]:
+    report = {}
+    for name in sorted(latencies):
+        values = sorted(latencies[name])
+        report[name] = {
+            "requests": len(values),
+            "errors": statuses[name].get("error", 0),
+            "statuses": dict(statuses[name]),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+        }
+    return report
+
+
+def print_report(report: Dict[str, dict], baseline: Optional[Dict[str, dict]]) -> None:
+    print(f"\n{'scenario':<10} {'reqs':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, row in report.items():
+        line = (
+            f"{name:<10} {row['requests']:>6} {row['errors']:>6} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+        old = (baseline or {}).get(name)
+        if old and old["p95_ms"]:
+            line += f"   p95 {100 * (row['p95_ms'] - old['p95_ms']) / old['p95_ms']:+.0f}% vs baseline"
+        print(line)
+    total = sum(row["requests"] for row in report.values())
+    print(f"\n{total} requests, {sum(row['rps'] for row in report.values()):.1f} req/s overall")
+    odd = {name: row["statuses"] for name, row in report.items() if set(row["statuses"]) - {"2xx"}}
+    if odd:
+        print(f"Non-2xx responses: {json.dumps(odd)}")
+
+
+async def login(client: httpx.AsyncClient, prefix: str, users: int) -> List[VirtualUser]:
+    logged_in = []
+    for n in range(users):
+        user = VirtualUser(email=email_for(prefix, n))
+        response = await client.post(f"{API}/auth/jwt/login", data={"username": user.email, "password": PASSWORD})
+        if response.status_code != 200:
+            raise SystemExit(f"Can't log in {user.email} ({response.status_code}); run seed.py --users {users} first")
+        user.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        logged_in.append(user)
+    return logged_in
+
+
+async def run(args) -> None:
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        users = await login(client, args.prefix, args.users)
+        shop = (await client.get(f"{API}/gamification/shop")).json()
+        if "purchase" in mix and not shop:
+            raise SystemExit("The shop is empty; run scripts/reseed_shop.py first")
+        ctx = Context(client=client, rng=random.Random(args.seed), shop_items=[item["id"] for item in shop])
+
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        deadline = time.perf_counter() + args.warmup + args.duration
+        measuring_from = time.perf_counter() + args.warmup
+
+        async def worker(n: int) -> None:
+            while time.perf_counter() < deadline:
+                name = ctx.rng.choices(names, weights)[0]
+                user = users[(n + ctx.rng.randrange(len(users))) % len(users)]
+                started = time.perf_counter()
+                try:
+                    response = await SCENARIOS[name](ctx, user)
+                    outcome = "error" if response.status_code >= 500 else f"{response.status_code // 100}xx"
+                except httpx.HTTPError:
+                    outcome = "error"
+                if started >= measuring_from:
+                    latencies[name].append(time.perf_counter() - started)
+                    statuses[name][outcome] += 1
+
+        print(f"{args.concurrency} workers, {len(users)} users, {args.warmup}s warm-up + {args.duration}s: {args.mix}")
+        await asyncio.gather(*(worker(n) for n in range(args.concurrency)))
+
+    report = summarize(latencies, statuses, args.duration)
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    print_report(report, baseline)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"Saved to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0], epilog=__doc__.split("\n\n", 2)[2],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20, help="Seeded users to spread requests over")
+    parser.add_argument("--prefix", default="bench", help="Email prefix given to seed.py")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds first")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. list=10,chat=1")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None, help="Seed scenario choice for repeatable runs")
+    parser.add_argument("--out", help="Save the report as JSON")
+    parser.add_argument("--baseline", help="A saved report to compare p95 against")
+    asyncio.run(run(parser.parse_args()))
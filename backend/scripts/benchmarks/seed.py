@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Script to seed the database with synthetic benchmark users and their history
+
+Each user gets ``--years`` of transactions generated from the patterns in
+sample_statements.csv: merchants that recur on a fixed day (payroll, rent)
+recur monthly on that day, the rest keep their monthly frequency and amount
+range. Accounts, achievements, budget counters and embeddings are built as
+the CSV import would. Users are ``<prefix><n>@bench.local`` with the
+password ``benchmark``; existing ones are left alone, so rerunning is cheap.
+"""
+import argparse
+import asyncio
+import csv
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi_users.password import PasswordHelper
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine, init_db
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services import achievements, budget, categorize, merchants
+
+from common import PASSWORD, SAMPLE_CSV, email_for
+
+INSERT_BATCH_SIZE = 2000
+
+
+@dataclass
+class Pattern:
+    merchant: str
+    category: str
+    icon: str
+    account: str
+    income: bool
+    amounts: List[float] = field(default_factory=list)
+    days: List[int] = field(default_factory=list)
+    per_month: float = 0.0
+    schedule: List[int] = field(default_factory=list)  # Fixed days of the month, if any
+
+
+def load_patterns(path: Path) -> List[Pattern]:
+    patterns: Dict[str, Pattern] = {}
+    months = set()
+    seen_in: Dict[str, set] = defaultdict(set)
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            day = datetime.strptime(row["Date"], "%Y-%m-%d")
+            months.add((day.year, day.month))
+            seen_in[row["Merchant"]].add((day.year, day.month))
+            pattern = patterns.get(row["Merchant"])
+            if pattern is None:
+                name, category, icon = merchants.normalize(row["Merchant"], row["Category"])
+                pattern = patterns[row["Merchant"]] = Pattern(
+                    merchant=name, category=category, icon=icon,
+                    account=row.get("Account") or "Default",
+                    income=row.get("Type", "expense").lower() == "income",
+                )
+            pattern.amounts.append(abs(float(row["Amount"])))
+            pattern.days.append(day.day)
+    for key, pattern in patterns.items():
+        pattern.per_month = len(pattern.days) / len(months)
+        # Every month, on one or two set days: a bill or a paycheck
+        if len(seen_in[key]) == len(months) and len(set(pattern.days)) <= 2:
+            pattern.schedule = sorted(set(pattern.days))
+    return list(patterns.values())
+
+
+def generate(user_id: uuid.UUID, patterns: List[Pattern], years: int, rng: random.Random) -> List[Transaction]:
+    end = datetime.utcnow()
+    month = datetime(end.year - years, end.month, 1)
+    transactions = []
+    while month <= end:
+        for pattern in patterns:
+            if pattern.schedule:
+                days = [min(day, 28) for day in pattern.schedule]
+            else:
+                count = int(pattern.per_month) + (rng.random() < pattern.per_month % 1)
+                days = [rng.randint(1, 28) for _ in range(count)]
+            for day in days:
+                when = month.replace(day=day) + timedelta(minutes=rng.randint(8 * 60, 22 * 60))
+                if when > end:
+                    continue
+                amount = round(rng.choice(pattern.amounts) * rng.uniform(0.85, 1.15), 2)
+                transactions.append(Transaction(
+                    user_id=user_id,
+                    merchant=pattern.merchant,
+                    category=pattern.category,
+                    amount=amount if pattern.income else -amount,
+                    date=when,
+                    icon=pattern.icon,
+                ))
+        month = (month + timedelta(days=32)).replace(day=1)
+    return transactions
+
+
+async def seed_user(session, email: str, hashed_password: str, patterns: List[Pattern], years: int, embed: bool) -> int:
+    user = User(email=email, hashed_password=hashed_password, is_verified=True, coins=1_000_000, annual_salary=60000.0)
+    session.add(user)
+    await session.flush()
+
+    transactions = generate(user.id, patterns, years, random.Random(email))
+    rows = [t.model_dump() for t in transactions]
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        await session.exec(insert(Transaction).values(rows[start:start + INSERT_BATCH_SIZE]))
+
+    account_of = {p.merchant: p.account for p in patterns}
+    balances: Dict[str, float] = defaultdict(float)
+    for t in transactions:
+        balances[account_of[t.merchant]] += t.amount
+    for name, balance in balances.items():
+        session.add(Account(
+            user_id=user.id, name=name, type="checking", balance=round(balance, 2),
+            color="bg-blue-500", initial=name[0].upper(),
+        ))
+
+    if embed:
+        await categorize.index(session, user.id, transactions)
+    await achievements.backfill(session, user_ids=[user.id])
+    await budget.rebuild(session, user_ids=[user.id])
+    await achievements.record(session, user.id, data_version=1)
+    await session.commit()
+    return len(transactions)
+
+
+async def seed(users: int, years: int, prefix: str, embed: bool) -> None:
+    await init_db()
+    patterns = load_patterns(SAMPLE_CSV)
+    hashed_password = PasswordHelper().hash(PASSWORD)  # Hashing is slow; every user shares it
+    emails = [email_for(prefix, n) for n in range(users)]
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        result = await session.exec(select(User.email).where(User.email.in_(emails)))
+        existing = set(result.all())
+
+    started = time.perf_counter()
+    total = 0
+    for email in emails:
+        if email in existing:
+            continue
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            total += await seed_user(session, email, hashed_password, patterns, years, embed)
+        print(f"Seeded {email}")
+
+    await engine.dispose()
+    print(
+        f"{users - len(existing)} users and {total} transactions in {time.perf_counter() - started:.1f}s "
+        f"({len(existing)} already there)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--prefix", default="bench", help="Email prefix of the benchmark users")
+    parser.add_argument("--no-embed", action="store_true", help="Skip transaction embeddings (faster)")
+    args = parser.parse_args()
+    asyncio.run(seed(args.users, args.years, args.prefix, not args.no_embed))
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Script to serve a local OpenAI-compatible stub for benchmarking LLM-bound endpoints
+
+Answers ``POST /v1/chat/completions`` after an injected delay, shaped like
+what the app asks for:
+  - structured output (``response_format`` json_schema, or a forced tool
+    call): a minimal object valid for the schema
+  - the chat agent (tools offered, none forced): ``--tool-rounds`` calls to
+    ``--agent-tool`` first, then a short text answer
+  - anything else: a short text answer
+Answers are deterministic for a given request; only the delay is random,
+and ``--seed`` fixes that too.
+
+Record/replay instead of synthetic answers:
+  --record FILE   forward to --upstream (OpenRouter by default) with the
+                  caller's API key, and append each exchange to FILE
+  --replay FILE   answer from FILE, keyed by normalized prompt and image
+                  hash (see cassette.py); misses fall back to synthetic
+                  answers, or fail with --strict
+
+``--latency-ms`` is the delay before the first byte (default 800ms, or the
+recorded upstream latency when replaying). ``--tokens-per-second`` then
+paces streamed chunks, and adds generation time to non-streamed answers.
+
+Run the API against it with LLM_BASE_URL=http://127.0.0.1:<port>/v1 and any
+OPENROUTER_API_KEY (the real one when recording).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from cassette import Cassette, request_key
+
+ANSWER = "Here's a quick summary: your spending is on track this month. Keep it up!"
+DEFAULT_LATENCY_MS = 800.0
+OPENROUTER_URL = "https://openrouter.ai/api/v1"
+
+
+def fake_value(schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """Smallest reasonable instance of a JSON schema."""
+    if "$ref" in schema:
+        return fake_value(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return fake_value(options[0], defs)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object" or "properties" in schema:
+        return {name: fake_value(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [fake_value(schema.get("items", {}), defs)]
+    if kind == "number":
+        return 9.99
+    if kind == "integer":
+        return 1
+    if kind == "boolean":
+        return False
+    if kind == "null":
+        return None
+    if schema.get("format") == "date-time":
+        return "2026-01-15T12:00:00"
+    if schema.get("format") == "date":
+        return "2026-01-15"
+    return "Stub"
+
+
+def _schema_instance(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    return fake_value(parameters, parameters.get("$defs", parameters.get("definitions", {})))
+
+
+def _tool_call(function: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+    # Derived from the conversation so far, so reruns produce the same ids
+    seed = json.dumps(body.get("messages", []), sort_keys=True) + function["name"]
+    return {
+        "id": f"call_{hashlib.sha256(seed.encode()).hexdigest()[:12]}",
+        "type": "function",
+        "function": {
+            "name": function["name"],
+            "arguments": json.dumps(_schema_instance(function.get("parameters", {}))),
+        },
+    }
+
+
+def respond(body: Dict[str, Any], tool_rounds: int, agent_tool: str) -> Dict[str, Any]:
+    """The assistant message for a chat completion request."""
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"].get("schema", {})
+        return {"role": "assistant", "content": json.dumps(_schema_instance(schema))}
+
+    tools = [t["function"] for t in body.get("tools") or [] if t.get("type") == "function"]
+    tool_choice = body.get("tool_choice")
+    if tools and isinstance(tool_choice, dict):
+        forced = tool_choice.get("function", {}).get("name")
+        function = next((t for t in tools if t["name"] == forced), tools[0])
+        return {"role": "assistant", "content": None, "tool_calls": [_tool_call(function, body)]}
+
+    rounds_done = sum(1 for m in body.get("messages", []) if m.get("role") == "tool")
+    if tools and tool_choice != "none" and rounds_done < tool_rounds:
+        function = next((t for t in tools if t["name"] == agent_tool), tools[0])
+        return {"role": "assistant", "content": None, "tool_calls": [_tool_call(function, body)]}
+
+    return {"role": "assistant", "content": ANSWER}
+
+
+def _usage(body: Dict[str, Any], message: Dict[str, Any]) -> Dict[str, int]:
+    prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+    completion_tokens = len(json.dumps(message)) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _finish_reason(message: Dict[str, Any]) -> str:
+    return "tool_calls" if message.get("tool_calls") else "stop"
+
+
+def completion(body: Dict[str, Any], message: Dict[str, Any], usage: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": message, "finish_reason": _finish_reason(message)}],
+        "usage": usage,
+    }
+
+
+def _deltas(message: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The message split the way providers stream it: word by word, tool calls whole."""
+    if message.get("tool_calls"):
+        return [{"role": "assistant", "content": None, "tool_calls": [
+            {"index": i, **call} for i, call in enumerate(message["tool_calls"])
+        ]}]
+    words = re.findall(r"\S+\s*", message["content"] or "") or [""]
+    return [{"role": "assistant", "content": words[0]}] + [{"content": word} for word in words[1:]]
+
+
+def _tokens(delta: Dict[str, Any]) -> float:
+    text = delta.get("content") or json.dumps(delta.get("tool_calls") or "")
+    return max(1.0, len(text) / 4)
+
+
+async def completion_chunks(
+    body: Dict[str, Any], message: Dict[str, Any], usage: Dict[str, int], tokens_per_second: float
+) -> AsyncIterator[str]:
+    """``completion`` as server-sent events, for ``stream: true`` requests."""
+    base = {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+    }
+    for delta in _deltas(message):
+        if tokens_per_second:
+            await asyncio.sleep(_tokens(delta) / tokens_per_second)
+        yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]})}\n\n"
+    final = {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": _finish_reason(message)}]}
+    yield f"data: {json.dumps(final)}\n\n"
+    if (body.get("stream_options") or {}).get("include_usage"):
+        yield f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@dataclass
+class StubOptions:
+    latency_ms: Optional[float] = None  # None: DEFAULT_LATENCY_MS, or the recorded latency when replaying
+    jitter_ms: float = 200.0
+    tokens_per_second: float = 0.0  # 0: no pacing
+    tool_rounds: int = 1
+    agent_tool: str = "get_spending_summary"
+    seed: Optional[int] = None
+    record: Optional[str] = None
+    replay: Optional[str] = None
+    upstream: str = OPENROUTER_URL
+    strict: bool = False
+
+
+def make_app(options: StubOptions) -> FastAPI:
+    rng = random.Random(options.seed)
+    cassette = Cassette(options.record or options.replay) if options.record or options.replay else None
+    upstream = httpx.AsyncClient(base_url=options.upstream, timeout=120.0) if options.record else None
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        if upstream is not None:
+            await upstream.aclose()
+
+    app = FastAPI(title="LLM stub", lifespan=lifespan)
+    stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+    async def forward(request: Request, body: Dict[str, Any], key: str):
+        """Ask the real provider (non-streamed; the stub streams it back itself) and keep the answer."""
+        body = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+        headers = {
+            name: value for name, value in request.headers.items()
+            if name.lower() in ("authorization", "http-referer", "x-title")
+        }
+        started = time.perf_counter()
+        response = await upstream.post("/chat/completions", json=body, headers=headers)
+        latency_ms = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
+        data = response.json()
+        message = data["choices"][0]["message"]
+        usage = data.get("usage") or _usage(body, message)
+        cassette.add(key, body.get("model", ""), message, usage, latency_ms)
+        stats["recorded"] += 1
+        return message, usage
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        latency_ms = options.latency_ms if options.latency_ms is not None else DEFAULT_LATENCY_MS
+        if options.record:
+            message, usage = await forward(request, body, request_key(body))
+        else:
+            exchange = cassette.get(request_key(body)) if cassette else None
+            if exchange is not None:
+                stats["hits"] += 1
+                message, usage = exchange["message"], exchange["usage"]
+                if options.latency_ms is None:
+                    latency_ms = exchange["latency_ms"]
+            elif cassette and options.strict:
+                stats["misses"] += 1
+                raise HTTPException(status_code=404, detail="No recorded exchange for this request")
+            else:
+                stats["misses"] += bool(cassette)
+                message = respond(body, options.tool_rounds, options.agent_tool)
+                usage = _usage(body, message)
+            await asyncio.sleep(max(0.0, latency_ms + rng.uniform(-options.jitter_ms, options.jitter_ms)) / 1000)
+
+        if body.get("stream"):
+            return StreamingResponse(
+                completion_chunks(body, message, usage, options.tokens_per_second), media_type="text/event-stream"
+            )
+        if options.tokens_per_second and not options.record:
+            await asyncio.sleep(usage.get("completion_tokens", 0) / options.tokens_per_second)
+        return completion(body, message, usage)
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "cassette": len(cassette) if cassette else 0}
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0], epilog=__doc__.split("\n\n", 1)[1],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=None, help="Delay before the first byte")
+    parser.add_argument("--jitter-ms", type=float, default=200.0, help="Uniform +/- jitter on the delay")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Generation speed; 0 answers at once")
+    parser.add_argument("--tool-rounds", type=int, default=1, help="Tool calls the chat agent makes before answering")
+    parser.add_argument("--agent-tool", default="get_spending_summary", help="Tool the chat agent calls")
+    parser.add_argument("--seed", type=int, default=None, help="Seed the jitter for repeatable runs")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="FILE", help="Forward to --upstream and record exchanges")
+    mode.add_argument("--replay", metavar="FILE", help="Answer from recorded exchanges")
+    parser.add_argument("--upstream", default=OPENROUTER_URL, help="Provider to record from")
+    parser.add_argument("--strict", action="store_true", help="Fail replay misses instead of answering synthetically")
+    args = parser.parse_args()
+    options = StubOptions(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, tokens_per_second=args.tokens_per_second,
+        tool_rounds=args.tool_rounds, agent_tool=args.agent_tool, seed=args.seed,
+        record=args.record, replay=args.replay, upstream=args.upstream, strict=args.strict,
+    )
+    uvicorn.run(make_app(options), host=args.host, port=args.port, log_level="warning")
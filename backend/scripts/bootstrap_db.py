@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""Script to bootstrap the database schema once, before starting the workers"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.db import bootstrap_db, engine
+
+async def main():
+    try:
+        await bootstrap_db()
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
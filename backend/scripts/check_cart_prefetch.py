@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Script to check that a checkout after a cart prefetch reuses the prefetched analysis
+
+Starts the benchmark LLM stub in-process and points the API at it, registers
+a throwaway user, prefetches a cart screenshot, then checks out with only the
+returned cart key, the way the extension does. Fails unless the checkout is
+answered from the prefetch: no second LLM call and no second token from the
+cart rate limit. Also checks that an unknown key answers 404 (the extension's
+cue to upload a screenshot) and that such an upload is charged. Needs a
+database; the real LLM is never called.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import uuid
+from pathlib import Path
+from typing import List
+
+# Add parent directory (and the benchmarks, for the stub) to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent / "benchmarks"))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+STUB_PORT = _free_port()
+# Config reads these at import, so they have to be set before the app is imported
+os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}/v1"
+os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+os.environ["RATE_LIMIT_ENABLED"] = "true"
+os.environ["RATE_LIMIT_BACKEND"] = "memory"
+
+import httpx
+import uvicorn
+
+from app import app
+from app.core.db import engine, init_db
+from stub_llm import StubOptions, make_app
+
+
+class Calls:
+    """ASGI wrapper counting the requests the stub answers, i.e. LLM calls made."""
+
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.count += 1
+        await self.app(scope, receive, send)
+
+
+def screenshot(label: str) -> dict:
+    return {"file": ("cart_screenshot.png", f"not really a png: {label}".encode(), "image/png")}
+
+
+async def check_cart_prefetch(latency_ms: float) -> int:
+    await init_db()
+    llm = Calls(make_app(StubOptions(latency_ms=latency_ms, jitter_ms=0)))
+    stub = uvicorn.Server(uvicorn.Config(llm, host="127.0.0.1", port=STUB_PORT, log_level="warning"))
+    stub_task = asyncio.create_task(stub.serve())
+    while not stub.started:
+        await asyncio.sleep(0.05)
+
+    failures: List[str] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cart", timeout=120.0) as client:
+        email, password = f"cart-{uuid.uuid4().hex[:8]}@example.com", "cart-check-password"
+        (await client.post("/api/v1/auth/register", json={"email": email, "password": password})).raise_for_status()
+        login = await client.post("/api/v1/auth/jwt/login", data={"username": email, "password": password})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        prefetch = await client.post("/api/v1/transactions/analyze-cart/prefetch", files=screenshot("prefetch"))
+        prefetch.raise_for_status()
+        remaining = int(prefetch.headers["RateLimit-Remaining"])
+        checkout = await client.post("/api/v1/transactions/checkout", data={"cart_key": prefetch.json()["cart_key"]})
+        calls_after_checkout = llm.count
+
+        if checkout.status_code != 200:
+            failures.append(f"checkout with the prefetched key returned {checkout.status_code}: {checkout.text[:200]}")
+        if calls_after_checkout != 1:
+            failures.append(f"{calls_after_checkout} LLM calls for a prefetch and a checkout, expected 1")
+
+        missing = await client.post("/api/v1/transactions/checkout", data={"cart_key": "0" * 64})
+        if missing.status_code != 404:
+            failures.append(f"checkout with an unknown key returned {missing.status_code}, expected 404")
+
+        fallback = await client.post("/api/v1/transactions/checkout", files=screenshot("fallback"))
+        if fallback.status_code != 200:
+            failures.append(f"checkout with a screenshot returned {fallback.status_code}: {fallback.text[:200]}")
+        elif int(fallback.headers["RateLimit-Remaining"]) != remaining - 1:
+            failures.append(
+                f"{remaining - int(fallback.headers['RateLimit-Remaining'])} cart tokens taken between the"
+                " prefetch and the screenshot checkout, expected 1 (the screenshot checkout itself)"
+            )
+
+    stub.should_exit = True
+    await stub_task
+    await engine.dispose()
+
+    print(f"Prefetch then checkout by key: {checkout.status_code}, {calls_after_checkout} LLM call(s)")
+    print(f"Unknown key: {missing.status_code}; screenshot fallback: {fallback.status_code}, {llm.count} LLM call(s) in all")
+    for failure in failures:
+        print(f"FAIL  {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Stub LLM latency per call")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(check_cart_prefetch(args.latency_ms)))
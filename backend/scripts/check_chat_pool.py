@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Script to check that chats waiting on the LLM don't hold database connections
+
+Starts the benchmark LLM stub in-process and points the API at it, registers
+a throwaway user, then starts ``--chats`` chat requests over ``--ramp``
+seconds. Each runs ``--tool-rounds`` database tools with a slow LLM call
+between them. Samples the engine's connection pool while they run and fails
+if, while LLM calls were in flight, more than ``--max-checked-out``
+connections were checked out at the same time. Needs a database; the real
+LLM is never called.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List, Tuple
+
+# Add parent directory (and the benchmarks, for the stub) to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent / "benchmarks"))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+STUB_PORT = _free_port()
+# Config reads these at import, so they have to be set before the app is imported
+os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}/v1"
+os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")  # One user sends every chat
+
+import httpx
+import uvicorn
+
+from app import app
+from app.core.db import engine, init_db
+from stub_llm import StubOptions, make_app
+
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+
+class InFlight:
+    """ASGI wrapper counting the requests the stub is answering, i.e. LLM calls being waited on."""
+
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        self.count += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.count -= 1
+
+
+async def sample_pool(llm: InFlight, samples: List[Tuple[int, int]], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        samples.append((llm.count, engine.pool.checkedout()))
+        await asyncio.sleep(SAMPLE_INTERVAL_SECONDS)
+
+
+async def check_chat_pool(chats: int, ramp: float, tool_rounds: int, latency_ms: float, max_checked_out: int) -> int:
+    await init_db()
+    llm = InFlight(make_app(StubOptions(latency_ms=latency_ms, jitter_ms=0, tool_rounds=tool_rounds)))
+    stub = uvicorn.Server(uvicorn.Config(llm, host="127.0.0.1", port=STUB_PORT, log_level="warning"))
+    stub_task = asyncio.create_task(stub.serve())
+    while not stub.started:
+        await asyncio.sleep(0.05)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://pool", timeout=300.0) as client:
+        email, password = f"pool-{uuid.uuid4().hex[:8]}@example.com", "pool-check-password"
+        (await client.post("/api/v1/auth/register", json={"email": email, "password": password})).raise_for_status()
+        login = await client.post("/api/v1/auth/jwt/login", data={"username": email, "password": password})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        async def ask(n: int) -> httpx.Response:
+            await asyncio.sleep(ramp * n / chats)
+            return await client.post("/api/v1/chat/", json={"message": "How much did I spend last month?", "history": []})
+
+        samples: List[Tuple[int, int]] = []
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_pool(llm, samples, stop))
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(ask(n) for n in range(chats)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+
+    stub.should_exit = True
+    await stub_task
+    await engine.dispose()
+
+    failed = [r for r in responses if r.status_code != 200 or "error" in r.json()["response"]]
+    waiting = [out for calls, out in samples if calls]
+    peak = max(waiting, default=0)
+    mean = sum(waiting) / len(waiting) if waiting else 0.0
+    print(f"{chats} chats with {tool_rounds} tool round(s) and {latency_ms:.0f}ms LLM calls in {elapsed:.1f}s")
+    print(f"Most LLM calls in flight at once: {max((calls for calls, _ in samples), default=0)}")
+    print(f"Connections checked out meanwhile: peak {peak}, mean {mean:.2f} (limit {max_checked_out})")
+    if failed:
+        print(f"FAIL  {len(failed)} chats failed (statuses {sorted({r.status_code for r in failed})})")
+    if peak > max_checked_out:
+        print(f"FAIL  pool occupancy peaked at {peak} connections")
+    return 1 if failed or peak > max_checked_out else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=40, help="Chat requests to send")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which to start them")
+    parser.add_argument("--tool-rounds", type=int, default=2, help="Tool calls per chat, each between LLM calls")
+    parser.add_argument("--latency-ms", type=float, default=1000.0, help="Stub LLM latency per call")
+    parser.add_argument("--max-checked-out", type=int, default=5, help="Most connections allowed out at once")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(check_chat_pool(args.chats, args.ramp, args.tool_rounds, args.latency_ms, args.max_checked_out)))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Script to check the deals cache against a local stub of the prices API
+
+Starts a stub prices API on localhost, then looks up the same product many
+times (concurrently and sequentially) and checks the stub only saw one search
+and one offers call, and that each cache write purged a batch of expired
+rows. Needs the database from docker-compose to be running.
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import uvicorn
+from fastapi import FastAPI
+from sqlmodel import delete, func, select
+
+from app.core.db import engine, init_db
+from app.models.deals import PriceCache
+from app.services.deals import PURGE_BATCH, DealsService, normalize_query
+
+upstream_calls = Counter()
+stub = FastAPI()
+
+
+def _product_id(q: str) -> str:
+    return f"p-{uuid.uuid5(uuid.NAMESPACE_URL, q)}"
+
+
+@stub.get("/products/search")
+async def search(q: str, limit: int = 5):
+    upstream_calls["search"] += 1
+    await asyncio.sleep(0.05)
+    return {"data": {"results": [{"id": _product_id(q), "title": q}][:limit]}}
+
+
+@stub.get("/products/{product_id}/offers")
+async def offers(product_id: str):
+    upstream_calls["offers"] += 1
+    await asyncio.sleep(0.05)
+    return {"data": {"offers": [
+        {"seller": "Store A", "price": 899.0, "url": "https://a.example/item"},
+        {"seller": "Store B", "price": 949.0, "url": "https://b.example/item"},
+        {"seller": "Store C", "price": 1099.0, "url": "https://c.example/item"},
+    ]}}
+
+
+async def _expired_rows() -> int:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(func.count()).select_from(PriceCache).where(PriceCache.expires_at < datetime.utcnow())
+        )
+        return result.scalar_one()
+
+
+async def check_deals_cache(port: int, lookups: int):
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    await init_db()
+    query = f"Acme Phone 15 Pro (128GB, Unlocked) {uuid.uuid4().hex[:8]}"
+    # More expired rows than the two writes below may purge
+    stale = [f"check:{uuid.uuid4().hex}" for _ in range(2 * PURGE_BATCH + 1)]
+    async with engine.begin() as conn:
+        await conn.execute(PriceCache.__table__.insert(), [
+            {"key": key, "payload": {}, "expires_at": datetime.utcnow() - timedelta(days=1)} for key in stale
+        ])
+    expired_before = await _expired_rows()
+    service = DealsService(base_url=f"http://127.0.0.1:{port}", api_key="stub", ttl_seconds=60)
+    try:
+        # Variants of the same title normalize to one cache key
+        titles = [query, query.upper(), f"  {query}, Renewed"]
+        results = await asyncio.gather(*(
+            service.find_deals(titles[i % len(titles)], current_price=999.0) for i in range(lookups)
+        ))
+        results.append(await service.find_deals(query, current_price=999.0))
+
+        # A fresh worker misses its local tier but hits the shared one
+        other_worker = DealsService(base_url=f"http://127.0.0.1:{port}", api_key="stub", ttl_seconds=60)
+        results.append(await other_worker.find_deals(query, current_price=999.0))
+        await other_worker.close()
+
+        assert all(r == results[0] for r in results), "lookups disagree"
+        assert [o["price"] for o in results[0]] == [899.0, 949.0], results[0]
+        assert upstream_calls == {"search": 1, "offers": 1}, dict(upstream_calls)
+        purged = expired_before - await _expired_rows()
+        assert purged == 2 * PURGE_BATCH, f"{purged} expired rows purged by two writes"
+        print(f"{len(results)} lookups, upstream calls: {dict(upstream_calls)}, expired rows purged: {purged}")
+        print("Deals cache check passed!")
+    finally:
+        await service.close()
+        async with engine.begin() as conn:
+            normalized = normalize_query(query)
+            await conn.execute(delete(PriceCache).where(PriceCache.key.in_([
+                f"search:{normalized}", f"offers:{_product_id(normalized)}", *stale
+            ])))
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--lookups", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(check_deals_cache(args.port, args.lookups))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Import-time regression check for worker cold starts.
+
+Imports ``app`` in a fresh interpreter under ``-X importtime`` and fails if
+the cumulative import time exceeds the budget, or if any of the LLM modules
+were loaded eagerly instead of on first use.
+
+    python scripts/check_import_time.py [--budget-ms 2000] [--runs 3]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+DEFAULT_BUDGET_MS = 2000
+
+PROBE = (
+    "import sys, json, app\n"
+    "from app.services.llm import LLM_MODULES\n"
+    "print(json.dumps([m for m in LLM_MODULES if m in sys.modules]))\n"
+)
+_APP_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| app$", re.MULTILINE)
+
+
+def measure():
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR), "LOGURU_LEVEL": "WARNING"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    match = _APP_LINE.search(result.stderr)
+    if match is None:
+        raise RuntimeError("No import time reported for 'app'")
+    return int(match.group(1)) / 1000, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    # Best of several runs: the first one also pays for cold disk caches.
+    samples = [measure() for _ in range(args.runs)]
+    best = min(ms for ms, _ in samples)
+    eager = samples[-1][1]
+    print(f"import app: best {best:.0f} ms of {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if eager:
+        print(f"FAIL: LLM modules imported eagerly: {', '.join(eager)}")
+        failed = True
+    if best > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Script to check the number of queries the main endpoints run (CI guard against N+1s)
+
+Registers a throwaway user against the configured database, seeds it with
+transactions, then calls each endpoint in CASES in-process and fails when:
+  - it runs more statements than its budget,
+  - one statement shape repeats N_PLUS_ONE_THRESHOLD times or more, or
+  - (for cases sized by item count) the count grows with the payload.
+
+Budgets are today's counts with a little headroom; lower them as queries go
+away. Needs a database; the LLM is never called.
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from app import app
+from app.core import queries
+from app.core.config import Config
+from app.core.db import engine, init_db
+
+SEED_TRANSACTIONS = 200
+SMALL, LARGE = 1, 20
+
+
+def cart(n: int) -> dict:
+    return {
+        "date": datetime.utcnow().strftime("%Y-%m-%d"),
+        "items": [
+            {"merchant": "Target", "category": "Shopping", "amount": 4.99 + i, "item_name": f"Item {i}"}
+            for i in range(n)
+        ],
+    }
+
+
+def uncategorized_cart(n: int) -> dict:
+    # Distinct unknown stores, so every item goes through the neighbour lookup
+    return {
+        "date": datetime.utcnow().strftime("%Y-%m-%d"),
+        "items": [
+            {"merchant": f"Corner Store {i}", "category": "Other", "amount": 2.5 + i, "item_name": f"Item {i}"}
+            for i in range(n)
+        ],
+    }
+
+
+def transaction(n: int) -> dict:
+    return {
+        "merchant": "Starbucks", "category": "Food & Drink", "amount": -5.75,
+        "date": datetime.utcnow().isoformat(), "icon": "Coffee",
+    }
+
+
+# (method, path, body for a given size or None, budget, sized)
+CASES: List[Tuple[str, str, Optional[Callable[[int], Any]], int, bool]] = [
+    ("GET", "/api/v1/users/me", None, 4, False),
+    ("GET", "/api/v1/transactions/?limit=100", None, 2, False),
+    ("GET", "/api/v1/accounts/", None, 2, False),
+    ("GET", "/api/v1/expenses/", None, 2, False),
+    ("GET", "/api/v1/goals/", None, 2, False),
+    ("GET", "/api/v1/gamification/shop", None, 1, False),
+    ("GET", "/api/v1/dashboard/", None, 10, False),
+    ("GET", "/api/v1/budget/status", None, 4, False),
+    ("GET", "/api/v1/analytics/spending", None, 4, False),
+    ("POST", "/api/v1/transactions/", transaction, 15, False),
+    ("POST", "/api/v1/transactions/confirm-cart", cart, 15, True),
+    ("POST", "/api/v1/transactions/confirm-cart", uncategorized_cart, 15, True),
+]
+
+
+async def measure(client: httpx.AsyncClient, method: str, path: str, body: Any) -> queries.QueryLog:
+    with queries.track_queries() as log:
+        response = await client.request(method, path, json=body)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{method} {path} returned {response.status_code}: {response.text[:200]}")
+    return log
+
+
+async def check_query_budgets(verbose: bool) -> int:
+    await init_db()
+    queries.instrument_engine(engine)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://budget") as client:
+        email, password = f"budget-{uuid.uuid4().hex[:8]}@example.com", "budget-check-password"
+        (await client.post("/api/v1/auth/register", json={"email": email, "password": password})).raise_for_status()
+        login = await client.post("/api/v1/auth/jwt/login", data={"username": email, "password": password})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        await measure(client, "POST", "/api/v1/transactions/confirm-cart", cart(SEED_TRANSACTIONS))
+
+        failures = 0
+        for method, path, body, budget, sized in CASES:
+            # The first call warms connections and caches; count the second.
+            await measure(client, method, path, body(SMALL) if body else None)
+            log = await measure(client, method, path, body(SMALL) if body else None)
+            problems = []
+            if log.count > budget:
+                problems.append(f"{log.count} queries, budget is {budget}")
+            for statement, count in log.repeated(Config.N_PLUS_ONE_THRESHOLD):
+                problems.append(f"{count}x {statement[:120]}")
+            if sized:
+                large = await measure(client, method, path, body(LARGE))
+                if large.count != log.count:
+                    problems.append(f"{log.count} queries for {SMALL} item(s) but {large.count} for {LARGE}")
+
+            status = "FAIL" if problems else "ok"
+            print(f"{status:<5} {log.count:>3}/{budget:<3} {method} {path}")
+            for problem in problems:
+                print(f"        {problem}")
+            if verbose:
+                print("\n".join(f"        {line}" for line in log.report().splitlines()[1:]))
+            failures += bool(problems)
+
+    await engine.dispose()
+    print(f"\n{len(CASES) - failures}/{len(CASES)} endpoints within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="List repeated statements for every endpoint")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(check_query_budgets(args.verbose)))
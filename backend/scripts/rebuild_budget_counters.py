@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Script to rebuild the monthly budget counters from existing transactions"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import select
+from app.core.db import get_session
+from app.models.user import User
+from app.services import budget
+
+BATCH_SIZE = 5000
+
+async def rebuild_budget_counters():
+    async for session in get_session():
+        last_id = None
+        total_users = 0
+
+        while True:
+            statement = select(User.id).order_by(User.id).limit(BATCH_SIZE)
+            if last_id is not None:
+                statement = statement.where(User.id > last_id)
+            result = await session.exec(statement)
+            user_ids = result.all()
+            if not user_ids:
+                break
+
+            await budget.rebuild(session, user_ids=user_ids)
+            await session.commit()
+
+            total_users += len(user_ids)
+            last_id = user_ids[-1]
+            print(f"Processed {total_users} users")
+
+        print("Rebuild complete!")
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_budget_counters())
@@ -7,20 +7,15 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlmodel import select
+from sqlmodel import delete
 from app.core.db import async_session_maker
 from app.models.gamification import ShopItem
 
 async def reseed_shop():
     async with async_session_maker() as session:
         # Clear all existing items
-        existing_items_result = await session.exec(select(ShopItem))
-        existing_items = existing_items_result.all()
-        count = len(existing_items)
-        
-        for item in existing_items:
-            await session.delete(item)
-        
+        result = await session.exec(delete(ShopItem))
+        count = result.rowcount
         await session.commit()
         print(f"Deleted {count} existing shop items")
         
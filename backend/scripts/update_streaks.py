@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Script to run the nightly streak update. Schedule it shortly after midnight UTC, e.g. from cron."""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.db import get_session
+from app.services import streaks
+
+async def update_streaks(batch_size: int):
+    async for session in get_session():
+        processed = await streaks.run_all(session, batch_size=batch_size)
+        print(f"Updated streaks for {processed} users")
+        print("Streak update complete!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=streaks.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(update_streaks(args.batch_size))
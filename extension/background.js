@@ -1,6 +1,4 @@
 const API_URL = "http://127.0.0.1:8000/api/v1";
-const DEALS_API_KEY = 'pricesapi_fJmNeIJLtihZv48pEuX78M1CZRcluaM';
-const DEALS_BASE_URL = 'https://api.pricesapi.io/api/v1';
 
 chrome.runtime.onInstalled.addListener(() => {
   console.log('Penny Companion Extension installed');
@@ -21,15 +19,22 @@ chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
     return true;
   }
   
+  if (request.type === 'PREFETCH_CART') {
+    handlePrefetchCart(sender.tab.id)
+      .then(cartKey => sendResponse({ success: true, cartKey }))
+      .catch(error => sendResponse({ success: false, error: error.message }));
+    return true;
+  }
+  
   if (request.type === 'ANALYZE_CART') {
-    handleAnalyzeCart(request.imageData)
+    handleAnalyzeCart(request.imageData, request.cartKey)
       .then(result => sendResponse({ success: true, result }))
       .catch(error => sendResponse({ success: false, error: error.message }));
     return true;
   }
   
   if (request.type === 'CONFIRM_CART') {
-    handleConfirmCart(request.items, request.date)
+    handleConfirmCart(request.confirmationToken)
       .then(transactions => sendResponse({ success: true, transactions }))
       .catch(error => sendResponse({ success: false, error: error.message }));
     return true;
@@ -48,24 +53,59 @@ async function handleCaptureScreenshot(tabId) {
   return dataUrl;
 }
 
-async function handleAnalyzeCart(imageDataUrl) {
-  console.log("Penny Background: Analyzing cart screenshot");
+async function handlePrefetchCart(tabId) {
+  console.log("Penny Background: Prefetching cart analysis for tab", tabId);
   
   const { token } = await chrome.storage.local.get('token');
   if (!token) {
     throw new Error("Not logged in");
   }
   
-  // Convert data URL to blob
-  const response = await fetch(imageDataUrl);
-  const blob = await response.blob();
+  const dataUrl = await handleCaptureScreenshot(tabId);
+  const blob = await (await fetch(dataUrl)).blob();
   
-  // Create form data
   const formData = new FormData();
   formData.append('file', blob, 'cart_screenshot.png');
   
-  // Send to backend
-  const result = await fetch(`${API_URL}/transactions/analyze-cart`, {
+  // Starts analysis in the background; checkout attaches to it via the cart key
+  const result = await fetch(`${API_URL}/transactions/analyze-cart/prefetch`, {
+    method: 'POST',
+    headers: {
+      'Authorization': `Bearer ${token}`
+    },
+    body: formData
+  });
+  
+  if (!result.ok) {
+    const error = await result.text();
+    throw new Error(`Prefetch failed: ${error}`);
+  }
+  
+  const data = await result.json();
+  return data.cart_key;
+}
+
+async function handleAnalyzeCart(imageDataUrl, cartKey) {
+  console.log("Penny Background: Analyzing cart", cartKey ? "from its pre-analysis" : "screenshot");
+  
+  const { token } = await chrome.storage.local.get('token');
+  if (!token) {
+    throw new Error("Not logged in");
+  }
+  
+  // Either the key of a prefetched analysis or a screenshot to analyze now
+  const formData = new FormData();
+  if (cartKey) {
+    formData.append('cart_key', cartKey);
+  } else {
+    // Convert data URL to blob
+    const response = await fetch(imageDataUrl);
+    const blob = await response.blob();
+    formData.append('file', blob, 'cart_screenshot.png');
+  }
+  
+  // Send to backend; the response carries a token used to confirm without re-uploading
+  const result = await fetch(`${API_URL}/transactions/checkout`, {
     method: 'POST',
     headers: {
       'Authorization': `Bearer ${token}`
@@ -83,21 +123,21 @@ async function handleAnalyzeCart(imageDataUrl) {
   return data;
 }
 
-async function handleConfirmCart(items, date) {
-  console.log("Penny Background: Confirming cart purchase", items);
+async function handleConfirmCart(confirmationToken) {
+  console.log("Penny Background: Confirming cart purchase");
   
   const { token } = await chrome.storage.local.get('token');
   if (!token) {
     throw new Error("Not logged in");
   }
   
-  const result = await fetch(`${API_URL}/transactions/confirm-cart`, {
+  const result = await fetch(`${API_URL}/transactions/checkout/confirm`, {
     method: 'POST',
     headers: {
       'Authorization': `Bearer ${token}`,
       'Content-Type': 'application/json'
     },
-    body: JSON.stringify({ items, date })
+    body: JSON.stringify({ confirmation_token: confirmationToken })
   });
   
   if (!result.ok) {
@@ -111,49 +151,25 @@ async function handleConfirmCart(items, date) {
 }
 
 async function handleFetchDeals(query, currentPrice) {
-  // Clean the query: remove special chars and extra details that might confuse search
-  const cleanQuery = query
-    .replace(/[(),]/g, '') // Remove parentheses and commas
-    .replace(/US Version|eSIM|Unlocked|Renewed/gi, '') // Remove common filler words
-    .split(' ').slice(0, 6).join(' ') // Take first few words
-    .trim();
+  const { token } = await chrome.storage.local.get('token');
+  if (!token) {
+    throw new Error("Not logged in");
+  }
 
-  console.log(`Penny Background: Cleaned query from "${query}" to "${cleanQuery}"`);
+  // The backend cleans the query, caches lookups and filters for better deals
+  const params = new URLSearchParams({ q: query, current_price: currentPrice });
+  console.log(`Penny Background: Fetching deals for "${query}"`);
 
-  // 1. Search for products
-  const url = `${DEALS_BASE_URL}/products/search?q=${encodeURIComponent(cleanQuery)}&limit=5`;
-  console.log("Penny Background: Fetching", url);
-  
-  const searchResponse = await fetch(url, {
-    method: 'GET',
-    headers: { 
-      'x-api-key': DEALS_API_KEY,
+  const response = await fetch(`${API_URL}/deals/?${params}`, {
+    headers: {
+      'Authorization': `Bearer ${token}`,
       'Accept': 'application/json'
     }
   }).catch(err => {
     console.error("Penny Background: Fetch caught error", err);
-    throw new Error(`Network error on search: ${err.message}`);
+    throw new Error(`Network error on deals lookup: ${err.message}`);
   });
-  
-  if (!searchResponse.ok) throw new Error(`Search failed: ${searchResponse.status}`);
-  const searchData = await searchResponse.json();
-  
-  if (!searchData.data || searchData.data.results.length === 0) return [];
-
-  // 2. Get offers for the top product result
-  const productId = searchData.data.results[0].id;
-  const offersResponse = await fetch(`${DEALS_BASE_URL}/products/${productId}/offers`, {
-    headers: { 'x-api-key': DEALS_API_KEY }
-  });
-  
-  if (!offersResponse.ok) throw new Error(`Offers failed: ${offersResponse.status}`);
-  const offersData = await offersResponse.json();
-  
-  if (!offersData.data || !offersData.data.offers) return [];
 
-  // 3. Filter for better deals
-  return offersData.data.offers
-    .filter(offer => offer.price > 0 && offer.price < currentPrice)
-    .sort((a, b) => a.price - b.price)
-    .slice(0, 3);
+  if (!response.ok) throw new Error(`Deals lookup failed: ${response.status}`);
+  return response.json();
 }
\ No newline at end of file
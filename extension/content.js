@@ -2,6 +2,7 @@ let isWarningShown = false;
 let userData = null;
 let checkoutButton = null;
 let currentCartData = null;
+let prefetchedCartKey = null;
 
 // Expanded checkout keywords for universal detection
 const CHECKOUT_KEYWORDS = [
@@ -44,6 +45,22 @@ async function init() {
     console.log("Penny: Potential shopping page detected");
     findCheckoutButton();
     observeMutations();
+    if (/cart|basket/i.test(window.location.pathname)) {
+      prefetchCartAnalysis();
+    }
+  }
+}
+
+async function prefetchCartAnalysis() {
+  // Start the cart analysis speculatively so it is ready by the time checkout is clicked
+  try {
+    const response = await chrome.runtime.sendMessage({ type: 'PREFETCH_CART' });
+    if (response.success) {
+      prefetchedCartKey = response.cartKey;
+      console.log("Penny: Cart pre-analysis started");
+    }
+  } catch (error) {
+    console.log("Penny: Cart pre-analysis unavailable", error);
   }
 }
 
@@ -153,20 +170,38 @@ function showAnalyzingModal() {
 
 async function captureAndAnalyze() {
   try {
-    // Request screenshot from background
-    const screenshotResponse = await chrome.runtime.sendMessage({ type: 'CAPTURE_SCREENSHOT' });
-
-    if (!screenshotResponse.success) {
-      throw new Error(screenshotResponse.error || 'Screenshot failed');
+    let analysisResponse = null;
+
+    // Attach to the pre-analysis by its key alone; a new screenshot (taken
+    // with the overlay showing) would never match the prefetched one
+    if (prefetchedCartKey) {
+      analysisResponse = await chrome.runtime.sendMessage({
+        type: 'ANALYZE_CART',
+        cartKey: prefetchedCartKey
+      });
+      if (!analysisResponse.success) {
+        console.log("Penny: Pre-analysis unavailable, analyzing a screenshot", analysisResponse.error);
+        analysisResponse = null;
+      }
+      prefetchedCartKey = null;
     }
 
-    console.log("Penny: Screenshot captured, analyzing...");
+    if (!analysisResponse) {
+      // Request screenshot from background
+      const screenshotResponse = await chrome.runtime.sendMessage({ type: 'CAPTURE_SCREENSHOT' });
 
-    // Send to backend for analysis
-    const analysisResponse = await chrome.runtime.sendMessage({
-      type: 'ANALYZE_CART',
-      imageData: screenshotResponse.dataUrl
-    });
+      if (!screenshotResponse.success) {
+        throw new Error(screenshotResponse.error || 'Screenshot failed');
+      }
+
+      console.log("Penny: Screenshot captured, analyzing...");
+
+      // Send to backend for analysis
+      analysisResponse = await chrome.runtime.sendMessage({
+        type: 'ANALYZE_CART',
+        imageData: screenshotResponse.dataUrl
+      });
+    }
 
     if (!analysisResponse.success) {
       throw new Error(analysisResponse.error || 'Analysis failed');
@@ -310,18 +345,10 @@ async function confirmAndTrack() {
   `;
 
   try {
-    // Send to backend to confirm tracking
-    const items = currentCartData.raw_items.map(item => ({
-      merchant: item.merchant,
-      category: item.category,
-      amount: item.amount,
-      item_name: item.item_name
-    }));
-
+    // Confirm with the token from the analysis; the backend replays the analyzed items
     const response = await chrome.runtime.sendMessage({
       type: 'CONFIRM_CART',
-      items: items,
-      date: currentCartData.date
+      confirmationToken: currentCartData.confirmation_token
     });
 
     if (!response.success) {
@@ -1,4 +1,4 @@
-import { createContext, useContext, ReactNode, useEffect, useMemo, useState } from 'react';
+import { createContext, useContext, ReactNode, useEffect, useMemo, useRef, useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { LucideIcon } from 'lucide-react';
 import { getIcon } from '@/lib/icons';
@@ -153,40 +153,65 @@ export function FinanceProvider({ children }: { children: ReactNode }) {
   };
 
   // --- Queries ---
+  // One bootstrap request fills every section's cache; the per-section
+  // queries below only fetch on their own after invalidation.
+  const sectionETags = useRef<Record<string, string>>({});
+  const dashboardQuery = useQuery({
+      queryKey: ['dashboard'],
+      queryFn: async () => {
+          const { sections } = await api.fetchDashboard(sectionETags.current);
+          for (const [name, section] of Object.entries<any>(sections)) {
+              sectionETags.current[name] = section.etag;
+              if ('data' in section) queryClient.setQueryData([name], section.data);
+          }
+          return sections;
+      },
+      enabled: isAuthenticated,
+      staleTime: Infinity,
+  });
+  const bootstrapped = isAuthenticated && !dashboardQuery.isPending;
+
   const userQuery = useQuery({ 
       queryKey: ['user'], 
       queryFn: api.fetchUser,
-      enabled: isAuthenticated 
+      enabled: bootstrapped,
+      staleTime: 30_000,
   });
   const expensesQuery = useQuery({ 
       queryKey: ['expenses'], 
       queryFn: api.fetchExpenses,
-      enabled: isAuthenticated 
+      enabled: bootstrapped,
+      staleTime: 30_000,
   });
   const goalsQuery = useQuery({ 
       queryKey: ['goals'], 
       queryFn: api.fetchGoals,
-      enabled: isAuthenticated 
+      enabled: bootstrapped,
+      staleTime: 30_000,
   });
   const accountsQuery = useQuery({ 
       queryKey: ['accounts'], 
       queryFn: api.fetchAccounts,
-      enabled: isAuthenticated 
+      enabled: bootstrapped,
+      staleTime: 30_000,
   });
   const transactionsQuery = useQuery({ 
       queryKey: ['transactions'], 
       queryFn: api.fetchTransactions,
-      enabled: isAuthenticated 
+      enabled: bootstrapped,
+      staleTime: 30_000,
   });
   const achievementsQuery = useQuery({ 
       queryKey: ['achievements'], 
       queryFn: api.fetchAchievements,
-      enabled: isAuthenticated 
+      enabled: bootstrapped,
+      staleTime: 30_000,
   });
   const shopQuery = useQuery({ 
       queryKey: ['shop'], 
       queryFn: api.fetchShopItems,
-      enabled: isAuthenticated 
+      enabled: bootstrapped,
+      staleTime: 30_000,
   });
   
   // Seed if empty (One time check or handled by backend? Handled here for simplicity)
@@ -254,6 +279,7 @@ export function FinanceProvider({ children }: { children: ReactNode }) {
       queryClient.invalidateQueries({ queryKey: ['goals'] });
       queryClient.invalidateQueries({ queryKey: ['accounts'] });
       queryClient.invalidateQueries({ queryKey: ['transactions'] });
+      queryClient.invalidateQueries({ queryKey: ['budgetStatus'] });
     }
   });
 
@@ -529,6 +555,7 @@ export function FinanceProvider({ children }: { children: ReactNode }) {
           const result = await createTransactionMutation.mutateAsync(data);
           await Promise.all([
              queryClient.invalidateQueries({ queryKey: ['transactions'] }),
+             queryClient.invalidateQueries({ queryKey: ['budgetStatus'] }),
              queryClient.invalidateQueries({ queryKey: ['user'] })
           ]);
           return result;
@@ -74,6 +74,19 @@ export async function fetchUser() {
   return res.json();
 }
 
+export async function fetchDashboard(etags: Record<string, string> = {}) {
+  // Send back known section ETags so the server can skip unchanged sections
+  const etagHeader = Object.entries(etags).map(([name, etag]) => `${name}="${etag}"`).join(", ");
+  const res = await fetch(`${API_URL}/dashboard/`, {
+    headers: { ...getAuthHeader(), ...(etagHeader ? { "X-Section-ETags": etagHeader } : {}) },
+  });
+  if (res.status === 401) {
+    throw new Error("Unauthorized");
+  }
+  if (!res.ok) throw new Error("Failed to fetch dashboard");
+  return res.json();
+}
+
 export async function uploadCSV(file: File) {
   const formData = new FormData();
   formData.append("file", file);
@@ -151,6 +164,14 @@ export async function fetchGoals() {
   return res.json();
 }
 
+export async function fetchGoalForecast() {
+  const res = await fetch(`${API_URL}/goals/forecast`, {
+    headers: { ...getAuthHeader() },
+  });
+  if (!res.ok) throw new Error("Failed to fetch goal forecast");
+  return res.json();
+}
+
 export async function createGoal(data: any) {
   const res = await fetch(`${API_URL}/goals/`, {
     method: "POST",
@@ -194,6 +215,48 @@ export async function fetchTransactions() {
   return res.json();
 }
 
+export async function fetchSpendingSeries(params: { interval?: 'day' | 'week' | 'month', since?: string, until?: string, merchantLimit?: number } = {}) {
+  // Pre-aggregated, zero-filled series: one small request instead of every transaction
+  const query = new URLSearchParams();
+  if (params.interval) query.set("interval", params.interval);
+  if (params.since) query.set("since", params.since);
+  if (params.until) query.set("until", params.until);
+  if (params.merchantLimit) query.set("merchant_limit", String(params.merchantLimit));
+  const res = await fetch(`${API_URL}/analytics/spending?${query}`, {
+    headers: { ...getAuthHeader() },
+  });
+  if (!res.ok) throw new Error("Failed to fetch spending series");
+  return res.json();
+}
+
+export async function searchTransactions(q: string, limit = 20) {
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  const res = await fetch(`${API_URL}/transactions/search?${params}`, {
+    headers: { ...getAuthHeader() },
+  });
+  if (!res.ok) throw new Error("Failed to search transactions");
+  return res.json();
+}
+
+export async function suggestCategories(merchants: string[]) {
+  const res = await fetch(`${API_URL}/transactions/categorize`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", ...getAuthHeader() },
+    body: JSON.stringify({ merchants }),
+  });
+  if (!res.ok) throw new Error("Failed to categorize merchants");
+  return res.json();
+}
+
+export async function fetchBudgetStatus() {
+  // Month-to-date spent vs planned per category, computed server-side
+  const res = await fetch(`${API_URL}/budget/status`, {
+    headers: { ...getAuthHeader() },
+  });
+  if (!res.ok) throw new Error("Failed to fetch budget status");
+  return res.json();
+}
+
 export async function fetchAccounts() {
   const res = await fetch(`${API_URL}/accounts/`, {
     headers: { ...getAuthHeader() },
@@ -3,8 +3,10 @@ import {
   TrendingUp, AlertTriangle, Check,
   Utensils, Plus
 } from 'lucide-react';
+import { useQuery } from '@tanstack/react-query';
 import { Button } from '@/components/ui/button';
 import { useFinance } from '@/contexts/FinanceContext';
+import { fetchBudgetStatus } from '@/lib/api';
 
 interface Budget {
   id: string;
@@ -18,17 +20,12 @@ interface Budget {
 export default function Budgets() {
   const { data } = useFinance();
   
-  // Calculate budgets based on expenses (allocation) and transactions (spending)
-  const currentMonth = new Date().getMonth();
-  const currentYear = new Date().getFullYear();
+  // Allocation comes from expenses; month-to-date spending per category from the server
+  const { data: budgetStatus } = useQuery({ queryKey: ['budgetStatus'], queryFn: fetchBudgetStatus });
 
   const spendingByCategory: Record<string, number> = {};
-  data.transactions.forEach(t => {
-      const d = new Date(t.date);
-      if (d.getUTCMonth() === currentMonth && d.getUTCFullYear() === currentYear && t.type === 'expense') {
-          const currentTotal = spendingByCategory[t.category] || 0;
-          spendingByCategory[t.category] = Math.round((currentTotal + Math.abs(t.amount)) * 100) / 100; // Round to 2 decimal places
-      }
+  budgetStatus?.categories.forEach((c: { category: string; spent: number }) => {
+      spendingByCategory[c.category] = c.spent;
   });
 
   const budgets: Budget[] = data.expenses